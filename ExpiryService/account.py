@@ -0,0 +1,48 @@
+class Account:
+    """ class Account to hold the database state of one registered provider account
+
+    USAGE:
+            account = Account.from_row(row)
+            account.provider, account.username
+
+    """
+    __slots__ = ('provider', 'username', 'password', 'min_balance', 'usage', 'notifyer', 'last_reminder',
+                 'reminder_delay')
+
+    # column order of the select statement, matches the slots
+    columns = __slots__
+
+    def __init__(self, provider, username, password, min_balance=None, usage=None, notifyer=None,
+                 last_reminder=None, reminder_delay=None):
+        self.provider = provider
+        self.username = username
+        self.password = password
+        self.min_balance = min_balance
+        self.usage = usage
+        self.notifyer = notifyer
+        self.last_reminder = last_reminder
+        self.reminder_delay = reminder_delay
+
+    def __repr__(self):
+        """ string representation without the password
+
+        :return: str
+        """
+        return "Account(provider={}, username={})".format(self.provider, self.username)
+
+    @property
+    def key(self):
+        """ key of the account
+
+        :return: tuple of provider and username
+        """
+        return self.provider, self.username
+
+    @classmethod
+    def from_row(cls, row):
+        """ creates an account from a database row selected with the columns
+
+        :param row: tuple from the database table
+        :return: Account
+        """
+        return cls(*row)
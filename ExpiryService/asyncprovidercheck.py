@@ -0,0 +1,125 @@
+import asyncio
+import logging
+
+from ExpiryService.providers import AsyncAldiTalk, AsyncNetzclub, AsyncCongstar
+from ExpiryService.providers.async_provider import is_aiohttp_importable
+from ExpiryService.exceptions import ProviderInstanceError, ProviderLoginError, ProviderTimeoutError
+try:
+    import aiohttp
+except ImportError:
+    pass
+
+
+class AsyncProviderCheck:
+    """ class AsyncProviderCheck to fetch the data of many provider accounts on a single event loop
+
+    USAGE:
+            check = AsyncProviderCheck(concurrency=500)
+            results = check.run(accounts=[('alditalk', username, password)], usage=False)
+
+    """
+    providers = {
+        'alditalk': AsyncAldiTalk,
+        'netzclub': AsyncNetzclub,
+        'congstar': AsyncCongstar,
+    }
+
+    def __init__(self, concurrency=100, urls=None, account_timeout=None):
+        self.logger = logging.getLogger('ExpiryService')
+        self.logger.info('Create class AsyncProviderCheck')
+
+        if not is_aiohttp_importable:
+            raise ImportError("aiohttp is required for the asyncio provider engine")
+
+        # maximum number of accounts in flight on the event loop
+        self.concurrency = concurrency
+
+        # seconds one account may take for login and fetch, None for no limit
+        self.account_timeout = account_timeout
+
+        # optional mapping of provider name to base url, e.g. a local stand-in server
+        self.urls = dict()
+        if urls is not None:
+            self.urls.update(urls)
+
+    def __create_provider_instance(self, provider, connector):
+        """ creates async provider instance
+
+        :return: instance of type AsyncProvider
+        """
+        if provider not in self.providers:
+            raise ProviderInstanceError("Could not create the provider instance")
+
+        if provider in self.urls:
+            return self.providers[provider](connector=connector, url=self.urls[provider])
+        else:
+            return self.providers[provider](connector=connector)
+
+    async def check_account(self, provider, username, password, connector, usage=False):
+        """ logs in to the provider web page and fetches the data of one account
+
+        :param provider: provider name
+        :param username: username
+        :param password: password
+        :param connector: shared aiohttp connector
+        :param usage: also fetch the data usage overview
+        :return: tuple of Consumption record and data usage dict or None
+        """
+        async with self.__create_provider_instance(provider=provider, connector=connector) as provider_instance:
+            if not await provider_instance.login(username=username, password=password):
+                raise ProviderLoginError("Failed to login to provider {}".format(provider_instance))
+
+            consumption = await provider_instance.current_consumption()
+
+            if usage:
+                data_usage = await provider_instance.data_usage_overview()
+            else:
+                data_usage = None
+
+            return consumption, data_usage
+
+    async def check(self, accounts, usage=False, cycle_timeout=None):
+        """ checks all given accounts concurrently
+
+        :param accounts: list of (provider, username, password) tuples
+        :param usage: also fetch the data usage overview
+        :param cycle_timeout: seconds all accounts may take, None for no limit
+        :return: list with a result tuple or the raised exception for every account
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # the host limiters hold at most max_in_flight requests per portal, the connector never opens more
+        limit_per_host = max(provider.sync_provider.max_in_flight for provider in self.providers.values())
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=limit_per_host)
+        loop = asyncio.get_running_loop()
+        cycle_deadline = loop.time() + cycle_timeout if cycle_timeout is not None else None
+
+        async def bounded(provider, username, password):
+            async with semaphore:
+                timeout = self.account_timeout
+                if cycle_deadline is not None:
+                    remaining = cycle_deadline - loop.time()
+                    if remaining <= 0:
+                        raise ProviderTimeoutError("Check for provider {} and username {} aborted, the cycle "
+                                                   "deadline is exceeded".format(provider, username))
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+                try:
+                    return await asyncio.wait_for(self.check_account(provider=provider, username=username,
+                                                                     password=password, connector=connector,
+                                                                     usage=usage), timeout=timeout)
+                except asyncio.TimeoutError:
+                    raise ProviderTimeoutError("Check for provider {} and username {} exceeded its deadline"
+                                               .format(provider, username))
+        try:
+            return await asyncio.gather(*(bounded(*account) for account in accounts), return_exceptions=True)
+        finally:
+            await connector.close()
+
+    def run(self, accounts, usage=False, cycle_timeout=None):
+        """ runs the check of all given accounts on a new event loop
+
+        :param accounts: list of (provider, username, password) tuples
+        :param usage: also fetch the data usage overview
+        :param cycle_timeout: seconds all accounts may take, None for no limit
+        :return: list with a result tuple or the raised exception for every account
+        """
+        return asyncio.run(self.check(accounts=accounts, usage=usage, cycle_timeout=cycle_timeout))
@@ -0,0 +1,112 @@
+import zlib
+import logging
+from time import time
+from datetime import datetime
+
+
+class CheckInterval:
+    """ class CheckInterval to compute the time until the next check of an account from its last consumption
+
+    Accounts close to their minimum balance, their end date or the end of their data volume are checked every
+    min_interval seconds, accounts far away from all thresholds up to every max_interval seconds.
+
+    USAGE:
+            interval = CheckInterval(min_interval=600, max_interval=21600)
+            interval.next(consumption=consumption, min_balance=5.0)
+
+    """
+    def __init__(self, min_interval=600, max_interval=21600, seconds_per_euro=3600, expiry_checks=4):
+        self.logger = logging.getLogger('ExpiryService')
+        self.logger.info('Create class CheckInterval')
+
+        if min_interval > max_interval:
+            raise ValueError("'min_interval' must not be greater than 'max_interval'")
+
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+        # assumed worst case spending, every euro above the minimum balance buys this many seconds
+        self.seconds_per_euro = seconds_per_euro
+
+        # number of checks between now and the end date
+        self.expiry_checks = expiry_checks
+
+    def next(self, consumption, min_balance=None, now=None):
+        """ computes the seconds until the next check of the account
+
+        :param consumption: Consumption record
+        :param min_balance: minimum balance of the account in euro
+        :param now: current datetime
+        :return: seconds until the next check
+        """
+        if now is None:
+            now = datetime.now()
+
+        intervals = [self.max_interval]
+
+        if consumption.balance_cents is None:
+            intervals.append(self.min_interval)
+        elif min_balance is not None:
+            intervals.append((consumption.balance_cents / 100 - min_balance) * self.seconds_per_euro)
+
+        if consumption.expiry_date is not None:
+            remaining_seconds = (datetime.combine(consumption.expiry_date, datetime.min.time()) - now).total_seconds()
+            intervals.append(remaining_seconds / self.expiry_checks)
+
+        if consumption.remaining_bytes is not None and consumption.total_bytes:
+            intervals.append(self.max_interval * consumption.remaining_bytes / consumption.total_bytes)
+
+        return max(self.min_interval, min(intervals))
+
+
+class CheckSlots:
+    """ class CheckSlots to spread the account checks evenly over the check interval
+
+    The interval is divided into slots time slices and every account is assigned to one slice by the crc32 hash of
+    its key, so the assignment is stable across restarts and does not move when other accounts are added or deleted.
+
+    USAGE:
+            check_slots = CheckSlots(interval=600, slots=60)
+            check_slots.slot(provider='alditalk', username='0176123456')
+            check_slots.due_slots()
+
+    """
+    def __init__(self, interval=600, slots=60):
+        self.logger = logging.getLogger('ExpiryService')
+        self.logger.info('Create class CheckSlots')
+
+        if slots < 1:
+            raise ValueError("'slots' must be a positive number")
+
+        self.slots = slots
+        self.slot_interval = interval / slots
+        self._last_tick = None
+
+    def slot(self, provider, username):
+        """ get the slot of the account
+
+        :param provider: provider name
+        :param username: username
+        :return: slot number between 0 and slots - 1
+        """
+        return zlib.crc32("{}:{}".format(provider, username).encode('utf-8')) % self.slots
+
+    def due_slots(self, now=None):
+        """ get the slots which are due since the last call, a delayed tick catches up on the skipped slots
+
+        :param now: current unix timestamp
+        :return: list with slot numbers
+        """
+        if now is None:
+            now = time()
+
+        tick = int(now // self.slot_interval)
+        if tick == self._last_tick:
+            return []
+        if self._last_tick is None or not self._last_tick < tick <= self._last_tick + self.slots:
+            ticks = [tick]
+        else:
+            ticks = range(self._last_tick + 1, tick + 1)
+        self._last_tick = tick
+
+        return [t % self.slots for t in ticks]
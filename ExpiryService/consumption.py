@@ -0,0 +1,135 @@
+import re
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+
+
+class Consumption:
+    """ class Consumption to hold the current consumption of one account, parsed once per fetch
+
+    The strings of the provider page are kept for the mails, the numeric fields are parsed from them when the
+    record is created: the balance in cents, the volumes in bytes and the end date as date. A field which can not
+    be parsed is None. Reading a record like the former consumption dict returns the strings.
+
+    USAGE:
+            consumption = Consumption(creditbalance='12,34 €', remaining_volume='1,5 GB', end_date='01.11.2026')
+            consumption.balance_cents, consumption['creditbalance']
+
+    """
+    __slots__ = ('name', 'number', 'creditbalance', 'remaining_volume', 'total_volume', 'end_date',
+                 'balance_cents', 'remaining_bytes', 'total_bytes', 'expiry_date')
+
+    # string fields of the provider page, the keys of the former consumption dict
+    keys = __slots__[:6]
+
+    units = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'TB': 1024 ** 4}
+
+    def __init__(self, name='', number='', creditbalance='', remaining_volume='', total_volume='', end_date='',
+                 balance_cents=None, remaining_bytes=None, total_bytes=None, expiry_date=None):
+        self.name = name
+        self.number = number
+        self.creditbalance = creditbalance
+        self.remaining_volume = remaining_volume
+        self.total_volume = total_volume
+        self.end_date = end_date
+
+        # numeric fields which are not given by the provider are parsed from the strings
+        self.balance_cents = balance_cents if balance_cents is not None else self.parse_amount(creditbalance)
+        self.remaining_bytes = remaining_bytes if remaining_bytes is not None else self.parse_volume(remaining_volume)
+        self.total_bytes = total_bytes if total_bytes is not None else self.parse_volume(total_volume)
+        self.expiry_date = expiry_date if expiry_date is not None else self.parse_date(end_date)
+
+    def __repr__(self):
+        """ string representation
+
+        :return: str
+        """
+        return "Consumption(number={}, balance_cents={}, remaining_bytes={}, total_bytes={}, expiry_date={})"\
+            .format(self.number, self.balance_cents, self.remaining_bytes, self.total_bytes, self.expiry_date)
+
+    def __getitem__(self, key):
+        """ get a string field like from the former consumption dict
+
+        :param key: key of the string field
+        :return: str
+        """
+        if key not in self.keys:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __eq__(self, other):
+        """ compares the string fields with another record or a consumption dict
+
+        :return: bool
+        """
+        if isinstance(other, Consumption):
+            other = other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def get(self, key, default=None):
+        """ get a string field like from the former consumption dict
+
+        :param key: key of the string field
+        :param default: value for unknown keys
+        :return: str
+        """
+        if key not in self.keys:
+            return default
+        return getattr(self, key)
+
+    def to_dict(self):
+        """ get the string fields as dict
+
+        :return: dict
+        """
+        return {key: getattr(self, key) for key in self.keys}
+
+    @staticmethod
+    def parse_amount(amount):
+        """ parses an amount string like '12,34 €'
+
+        :param amount: amount string
+        :return: cents as int or None
+        """
+        match = re.search(r'-?\d[\d.]*(?:,\d+)?', amount or '')
+        if match is None:
+            return None
+
+        number = match.group()
+        if ',' in number:
+            # german notation with thousands separator '.' and decimal separator ','
+            number = number.replace('.', '').replace(',', '.')
+        return int((Decimal(number) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+    @classmethod
+    def parse_volume(cls, volume):
+        """ parses a volume string like '1,5 GB' or 'von 200 MB'
+
+        :param volume: volume string
+        :return: bytes as int or None
+        """
+        match = re.search(r'(\d+(?:[.,]\d+)?)\s*([KMGT]?B)\b', volume or '', re.IGNORECASE)
+        if match is None:
+            return None
+        return int(Decimal(match.group(1).replace(',', '.')) * cls.units[match.group(2).upper()])
+
+    @staticmethod
+    def parse_date(date_str):
+        """ parses the first date like '01.11.2026' in the given string
+
+        :param date_str: string with a date
+        :return: date or None
+        """
+        match = re.search(r'(\d{1,2})\.(\d{1,2})\.(\d{2,4})', date_str or '')
+        if match is None:
+            return None
+        day, month, year = (int(group) for group in match.groups())
+        if year < 100:
+            year += 2000
+        try:
+            return date(year, month, day)
+        except ValueError:
+            return None
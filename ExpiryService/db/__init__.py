@@ -3,3 +3,5 @@ from ExpiryService.db.connector import DBConnector, Error
 from ExpiryService.db.creator import DBCreator, Schema, Table, Column
 from ExpiryService.db.fetcher import DBFetcher
 from ExpiryService.db.inserter import DBInserter
+from ExpiryService.db.jobstore import DBJobStore
+from ExpiryService.db.cookiestore import DBCookieStore
@@ -1,3 +1,4 @@
+import threading
 
 
 class PostgresqlCursorContextManager:
@@ -86,6 +87,9 @@ class SQLiteCursorContextManager:
             SQLiteCursorContextManager(conn=SQLite.connection)
 
     """
+    # the sqlite connection is shared between threads, so only one cursor may be used at a time
+    lock = threading.RLock()
+
     def __init__(self, conn):
         self.conn = conn
 
@@ -94,6 +98,7 @@ class SQLiteCursorContextManager:
 
         :return: cursor object
         """
+        self.lock.acquire()
         return self.conn.cursor()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -103,7 +108,10 @@ class SQLiteCursorContextManager:
         :param exc_val: exception value
         :param exc_tb: exception traceback
         """
-        self.conn.commit()
+        try:
+            self.conn.commit()
+        finally:
+            self.lock.release()
 
 
 class SQLiteConnectionContextManager:
@@ -0,0 +1,135 @@
+import json
+import logging
+from time import time
+
+from ExpiryService.db.fetcher import DBFetcher
+from ExpiryService.db.inserter import DBInserter
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+    is_cryptography_importable = True
+except ImportError:
+    is_cryptography_importable = False
+
+
+class DBCookieStore:
+    """ class DBCookieStore to persist the encrypted cookies of logged in provider sessions in a database table
+
+    The cookies of an account are encrypted with the Fernet key, the provider and username are part of the
+    encrypted data, so a stored row only decrypts for its own account. Rows which can not be decrypted, e.g.
+    after a key change, are ignored.
+
+    USAGE:
+            cookiestore = DBCookieStore(key=DBCookieStore.generate_key(), table="ExpiryServiceCookies")
+            cookiestore.save(provider="netzclub", username=username, cookies=session.dump_cookies())
+            cookies = cookiestore.load(provider="netzclub", username=username)
+
+    """
+    def __init__(self, key, table="ExpiryServiceCookies", max_age=None):
+        self.logger = logging.getLogger('ExpiryService')
+        self.logger.info('Create class DBCookieStore')
+
+        if not is_cryptography_importable:
+            raise ImportError("cryptography is required for the cookie store")
+
+        self.table = table
+        self.fernet = Fernet(key)
+
+        # seconds after which stored cookies are not restored anymore, None for no limit
+        self.max_age = max_age
+
+        self.dbfetcher = DBFetcher()
+        self.dbinserter = DBInserter()
+
+    @staticmethod
+    def generate_key():
+        """ generates a new Fernet key
+
+        :return: url-safe base64 encoded key string
+        """
+        return Fernet.generate_key().decode()
+
+    @staticmethod
+    def get_session_key(provider, username):
+        """ get the primary key of the account
+
+        :param provider: provider name
+        :param username: username
+        :return: key string
+        """
+        return "{}:{}".format(provider, username)
+
+    def __decrypt(self, provider, username, token):
+        """ decrypts the stored cookies of the account
+
+        :param provider: provider name
+        :param username: username
+        :param token: encrypted cookies
+        :return: list of cookie dicts or None
+        """
+        try:
+            data = json.loads(self.fernet.decrypt(token.encode(), ttl=self.max_age))
+        except (InvalidToken, ValueError):
+            self.logger.debug("Could not decrypt the stored cookies of provider {} and username {}"
+                              .format(provider, username))
+            return None
+
+        if data.get('provider') != provider or data.get('username') != username:
+            self.logger.error("Stored cookies of provider {} and username {} belong to another account"
+                              .format(provider, username))
+            return None
+        return data.get('cookies')
+
+    def load(self, provider, username):
+        """ loads the cookies of the account
+
+        :param provider: provider name
+        :param username: username
+        :return: list of cookie dicts or None
+        """
+        sql = "select cookies from {} where session_key = %s".format(self.table)
+
+        row = self.dbfetcher.one(sql=sql, data=(self.get_session_key(provider=provider, username=username),))
+        if row is None:
+            return None
+        return self.__decrypt(provider=provider, username=username, token=row[0])
+
+    def load_all(self):
+        """ loads the cookies of all stored accounts
+
+        :return: dict with (provider, username) as key and the list of cookie dicts as value
+        """
+        sql = "select provider, username, cookies from {}".format(self.table)
+
+        sessions = dict()
+        for provider, username, token in self.dbfetcher.all(sql=sql):
+            cookies = self.__decrypt(provider=provider, username=username, token=token)
+            if cookies is not None:
+                sessions[(provider, username)] = cookies
+        return sessions
+
+    def save(self, provider, username, cookies):
+        """ saves the encrypted cookies of the account
+
+        :param provider: provider name
+        :param username: username
+        :param cookies: list of cookie dicts
+        """
+        data = json.dumps({'provider': provider, 'username': username, 'cookies': cookies})
+        token = self.fernet.encrypt(data.encode()).decode()
+
+        sql = "insert into {} (session_key, provider, username, cookies, saved) values (%s, %s, %s, %s, %s) " \
+              "on conflict (session_key) do update set cookies = excluded.cookies, saved = excluded.saved"\
+            .format(self.table)
+
+        self.dbinserter.row(sql=sql, data=(self.get_session_key(provider=provider, username=username), provider,
+                                           username, token, time()))
+
+    def delete(self, provider, username):
+        """ deletes the cookies of the account
+
+        :param provider: provider name
+        :param username: username
+        """
+        sql = "delete from {} where session_key = %s".format(self.table)
+
+        self.dbinserter.row(sql=sql, data=(self.get_session_key(provider=provider, username=username),))
@@ -0,0 +1,55 @@
+import logging
+
+from ExpiryService.db.fetcher import DBFetcher
+from ExpiryService.db.inserter import DBInserter
+
+
+class DBJobStore:
+    """ class DBJobStore to persist the next run time of scheduler jobs in a database table
+
+    USAGE:
+            jobstore = DBJobStore(table="ExpiryServiceJobs")
+            jobstore.save(job_id="providercheck", next_run=time() + 600)
+            jobstore.load(job_id="providercheck")
+
+    """
+    def __init__(self, table="ExpiryServiceJobs"):
+        self.logger = logging.getLogger('ExpiryService')
+        self.logger.info('Create class DBJobStore')
+
+        self.table = table
+        self.dbfetcher = DBFetcher()
+        self.dbinserter = DBInserter()
+
+    def load(self, job_id):
+        """ loads the next run time of the job
+
+        :param job_id: unique job id
+        :return: next run as unix timestamp or None
+        """
+        sql = "select next_run from {} where job_id = %s".format(self.table)
+
+        row = self.dbfetcher.one(sql=sql, data=(job_id,))
+        if row is None:
+            return None
+        return row[0]
+
+    def save(self, job_id, next_run):
+        """ saves the next run time of the job
+
+        :param job_id: unique job id
+        :param next_run: next run as unix timestamp
+        """
+        sql = "insert into {} (job_id, next_run) values (%s, %s) " \
+              "on conflict (job_id) do update set next_run = excluded.next_run".format(self.table)
+
+        self.dbinserter.row(sql=sql, data=(job_id, next_run))
+
+    def delete(self, job_id):
+        """ deletes the job from the table
+
+        :param job_id: unique job id
+        """
+        sql = "delete from {} where job_id = %s".format(self.table)
+
+        self.dbinserter.row(sql=sql, data=(job_id,))
@@ -18,6 +18,8 @@ class DBHandler:
         self.logger.info('Create class DBHandler')
 
         self.database_table = "ExpiryService"
+        self.jobs_table = "ExpiryServiceJobs"
+        self.cookies_table = "ExpiryServiceCookies"
 
         # check db params
         if (('host' and 'port' and 'username' and 'password' and 'dbname') in dbparams.keys()) and \
@@ -46,7 +48,7 @@ class DBHandler:
                 self.logger.error("DBHandler could not connect to the postgres database")
                 raise DBConnectorError("DBHandler could not connect to the postgres database")
         else:
-            path = '/var/log/ExpiryService/ExpiryService.db'
+            path = dbparams.get('path') or '/var/log/ExpiryService/ExpiryService.db'
 
             if DBConnector.connect_sqlite(path=path):
 
@@ -83,3 +85,18 @@ class DBHandler:
                                                             Column(name="last_reminder", type="text"),
                                                             Column(name="reminder_delay", type="text"),
                                        schema=self.expiryservice_schema))
+
+        # create table for the scheduler job store
+        self.logger.info("create Table {}".format(self.jobs_table))
+        self.dbcreator.build(obj=Table(self.jobs_table, Column(name="job_id", type="text", prim_key=True),
+                                                        Column(name="next_run", type="real"),
+                                       schema=self.expiryservice_schema))
+
+        # create table for the encrypted cookies of the provider sessions
+        self.logger.info("create Table {}".format(self.cookies_table))
+        self.dbcreator.build(obj=Table(self.cookies_table, Column(name="session_key", type="text", prim_key=True),
+                                                           Column(name="provider", type="text"),
+                                                           Column(name="username", type="text"),
+                                                           Column(name="cookies", type="text"),
+                                                           Column(name="saved", type="real"),
+                                       schema=self.expiryservice_schema))
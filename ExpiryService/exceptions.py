@@ -30,6 +30,26 @@ class ProviderLoginError(Exception):
     pass
 
 
+class ProviderTimeoutError(Exception):
+    """ProviderTimeoutError"""
+    pass
+
+
+class ProviderQueueTimeoutError(ProviderTimeoutError):
+    """ProviderQueueTimeoutError"""
+    pass
+
+
+class ProviderSessionError(Exception):
+    """ProviderSessionError"""
+    pass
+
+
+class ProviderUnavailableError(Exception):
+    """ProviderUnavailableError"""
+    pass
+
+
 class MailMessageError(Exception):
     """MailMessageError"""
     pass
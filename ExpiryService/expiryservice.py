@@ -1,3 +1,5 @@
+import sys
+import signal
 import logging
 import argparse
 
@@ -88,7 +90,11 @@ class ExpiryService:
         :param debug: debug mode true or false
         """
         self.providercheck.start()
-        self.router.run(host=host, port=port, debug=debug)
+        try:
+            self.router.run(host=host, port=port, debug=debug)
+        finally:
+            # saves the provider sessions for the next start
+            self.providercheck.stop()
 
 
 def main():
@@ -124,6 +130,25 @@ def main():
     parser.add_argument('-T', '--token',        type=str, help='Provide the telegram token')
     parser.add_argument('-C', '--chatid',        type=int, help='Telegram chat id')
 
+    # arguments for the provider check
+    parser.add_argument('-W', '--workers',      type=int, help='Number of worker threads for the provider check')
+    parser.add_argument('-E', '--engine',       type=str, choices=['threads', 'asyncio'],
+                        help='Fetch engine for the provider check')
+    parser.add_argument('-CO', '--concurrency', type=int, help='Accounts in flight for the asyncio engine')
+    parser.add_argument('-MIN', '--min-interval', type=int, help='Minimum seconds between two checks of an account')
+    parser.add_argument('-MAX', '--max-interval', type=int, help='Maximum seconds between two checks of an account')
+    parser.add_argument('-D', '--digest-interval', type=int, help='Seconds between two consumption overview mails')
+    parser.add_argument('-S', '--check-slots',  type=int, help='Number of time slots the accounts are spread over')
+    parser.add_argument('-AT', '--account-timeout', type=int, help='Seconds the check of one account may take')
+    parser.add_argument('-CT', '--cycle-timeout', type=int, help='Seconds the check of all due accounts may take')
+    parser.add_argument('-BT', '--breaker-threshold', type=int, help='Failures until the checks of a provider pause')
+    parser.add_argument('-BTO', '--breaker-timeout', type=int, help='Seconds the checks of a failing provider pause')
+    parser.add_argument('-PA', '--parser',      type=str, choices=['html.parser', 'lxml'],
+                        help='Parser backend for the provider pages')
+    parser.add_argument('-PP', '--parse-processes', type=int, help='Worker processes for the page parsing')
+    parser.add_argument('-CK', '--cookie-key',  type=str,
+                        help='Fernet key to store the provider sessions encrypted in the database')
+
     # argument for the logging folder
     parser.add_argument('-L', '--log-folder',   type=str, help='Log folder for the application')
 
@@ -157,10 +182,23 @@ def main():
     # set mail params
     params.setdefault('mail', {'smtp': args.msmtp, 'port': args.mport, 'sender': args.msender, 'password': args.mpassword})
 
+    # set provider check params
+    params.setdefault('providercheck', {'workers': args.workers, 'engine': args.engine,
+                                        'concurrency': args.concurrency, 'min_interval': args.min_interval,
+                                        'max_interval': args.max_interval, 'digest_interval': args.digest_interval,
+                                        'check_slots': args.check_slots, 'account_timeout': args.account_timeout,
+                                        'cycle_timeout': args.cycle_timeout,
+                                        'breaker_threshold': args.breaker_threshold,
+                                        'breaker_timeout': args.breaker_timeout, 'parser': args.parser,
+                                        'parse_processes': args.parse_processes, 'cookie_key': args.cookie_key})
+
     # set up logger instance
     logger = Logger(name='ExpiryService', level='info', log_folder=log_folder)
     logger.info("Start Application ExpiryService")
 
+    # a terminated service shuts down like an interrupted one
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
     # create application instance
     expiryservice = ExpiryService(name="ExpiryService", token=args.token, chatid=args.chatid, frontend=False, **params)
 
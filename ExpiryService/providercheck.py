@@ -1,22 +1,45 @@
 import logging
-from threading import Thread
-from time import sleep, time
+import requests
+from threading import Thread, Lock
+from time import time, monotonic
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from ExpiryService.dbhandler import DBHandler
+from ExpiryService.account import Account
+from ExpiryService.checkinterval import CheckInterval, CheckSlots
 from ExpiryService.notification import Mail
-from ExpiryService.providers import Provider, AldiTalk, Netzclub
-from ExpiryService.exceptions import ProviderInstanceError, ProviderLoginError
+from ExpiryService.providers import Provider, AldiTalk, Netzclub, Congstar
+from ExpiryService.providers.sessioncache import ProviderSessionCache
+from ExpiryService.providers.limiter import HostLimiter
+from ExpiryService.providers.circuitbreaker import CircuitBreaker
+from ExpiryService.providers.parser import PageParser
+from ExpiryService.providers.parsepool import ParsePool
+from ExpiryService.asyncprovidercheck import AsyncProviderCheck
+from ExpiryService.exceptions import ProviderInstanceError, ProviderLoginError, ProviderSessionError, \
+    ProviderTimeoutError, ProviderQueueTimeoutError, ProviderUnavailableError
 from ExpiryService.scheduler import Scheduler
+from ExpiryService.db import DBJobStore, DBCookieStore
 
 
 class ProviderCheck(DBHandler, Thread):
     """ class ProviderCheck to check data from registered providers
 
+    All checks run in one scheduler job which ticks once per time slot of the provider_check_interval. Every
+    tick only checks the due accounts of the current slot, so the load spreads evenly over the interval. When the
+    digest cadence has requested a consumption overview, every slot checks all of its accounts once and sends the
+    mails.
+
     USAGE:
             providercheck = ProviderCheck(**params)
             providercheck.start()
 
     """
+    providers = {
+        'netzclub': Netzclub,
+        'alditalk': AldiTalk,
+        'congstar': Congstar,
+    }
+
     def __init__(self, **params):
         self.logger = logging.getLogger('ExpiryService')
         self.logger.info('Create class ProviderCheck')
@@ -26,13 +49,13 @@ class ProviderCheck(DBHandler, Thread):
         self.dbparams.update(params['database'])
         self.mailparams = dict()
         self.mailparams.update(params['mail'])
+        self.checkparams = dict()
+        self.checkparams.update(params.get('providercheck', dict()))
 
         # init base classes
         DBHandler.__init__(self, **self.dbparams)
         Thread.__init__(self)
 
-        self._running = True
-
         if ('smtp' and 'port' and 'sender' and 'password') in self.mailparams.keys():
             if (self.mailparams['smtp'] and self.mailparams['port'] and self.mailparams['sender'] and self.mailparams['password']) is not None:
                 self.logger.info("Create mail server")
@@ -46,32 +69,299 @@ class ProviderCheck(DBHandler, Thread):
         else:
             self.logger.error("No mail params provided")
 
-        # create scheduler instance
-        self.scheduler = Scheduler()
-
-        # providers weekly check
-        self.scheduler.periodic(3600, self.check_data_from_providers, False)
+        # provider data check interval, 10min default, accounts far away from their thresholds are checked less often
+        self.provider_check_interval = int(self.checkparams.get('min_interval') or 600)
+        self.check_interval = CheckInterval(min_interval=self.provider_check_interval,
+                                            max_interval=int(self.checkparams.get('max_interval') or 21600))
+
+        # the interval is divided into time slices, each account is checked in the slice of its key hash
+        self.check_slots = CheckSlots(interval=self.provider_check_interval,
+                                      slots=int(self.checkparams.get('check_slots') or 60))
+
+        # seconds one account may take for login and fetch, and seconds all accounts of one check may take
+        self.account_timeout = int(self.checkparams.get('account_timeout') or 120)
+        self.cycle_timeout = int(self.checkparams.get('cycle_timeout') or self.provider_check_interval)
+
+        # the accounts of a provider are skipped while the circuit breaker of the provider is open
+        self.breaker_threshold = int(self.checkparams.get('breaker_threshold') or 5)
+        self.breaker_timeout = int(self.checkparams.get('breaker_timeout') or 300)
+        self._breakers_lock = Lock()
+        self.circuit_breakers = dict()
+
+        # monotonic timestamp of the next check per account key
+        self._next_check = dict()
+
+        # registered accounts grouped by slot, loaded once per check interval and reused by all slots
+        self._slot_accounts = dict()
+        self._accounts_loaded = None
+
+        # seconds between two consumption overview mails, None disables the mails
+        self.digest_interval = self.checkparams.get('digest_interval')
+        self._digest_lock = Lock()
+        self._digest_slots = set()
+
+        # keys of the accounts which are currently checked, an account is never checked twice at the same time
+        self._accounts_lock = Lock()
+        self._accounts_in_check = set()
+
+        # number of worker threads for parallel provider checks, 1 disables the parallel mode
+        self.workers = int(self.checkparams.get('workers') or 1)
+        if self.workers < 1:
+            raise ValueError("'workers' must be a positive number")
+
+        if self.workers > 1:
+            self.logger.info("Create check executor with {} workers".format(self.workers))
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ProviderCheck')
+        else:
+            self.executor = None
+
+        # logged in provider instances are kept across check cycles, a size of 0 disables the cache
+        session_cache_size = self.checkparams.get('session_cache_size')
+        if session_cache_size is None:
+            session_cache_size = 1000
+        if session_cache_size > 0:
+            self.session_cache = ProviderSessionCache(maxsize=session_cache_size,
+                                                      ttl=self.checkparams.get('session_ttl') or 3600)
+        else:
+            self.session_cache = None
 
-        # provider data check interval, 10min default
-        self.provider_check_interval = 600
+        # the cookies of the logged in sessions are stored encrypted, so a restart needs no new logins
+        if self.checkparams.get('cookie_key') is not None:
+            self.cookie_store = DBCookieStore(key=self.checkparams['cookie_key'], table=self.cookies_table,
+                                              max_age=self.checkparams.get('session_ttl') or 3600)
+        else:
+            self.cookie_store = None
+
+        # last saved cookies per account key, unchanged cookies are not written again
+        self._saved_cookies = dict()
+
+        # base url per provider, e.g. a local stand-in server, unknown providers use their web page
+        self.provider_urls = dict(self.checkparams.get('provider_urls') or dict())
+        for provider in self.provider_urls:
+            if provider not in self.providers:
+                raise ValueError("Unknown provider {} in 'provider_urls'".format(provider))
+
+        # provider fetch engine, 'threads' uses the requests based providers, 'asyncio' the event loop engine
+        self.engine = self.checkparams.get('engine') or 'threads'
+        if self.engine == 'asyncio':
+            self.async_check = AsyncProviderCheck(concurrency=int(self.checkparams.get('concurrency') or 100),
+                                                  urls=self.provider_urls, account_timeout=self.account_timeout)
+        elif self.engine != 'threads':
+            raise ValueError("Unknown provider check engine {}".format(self.engine))
+
+        # parser backend of the provider pages, the default is lxml if it is installed
+        if self.checkparams.get('parser') is not None:
+            PageParser.set_backend(backend=self.checkparams.get('parser'))
+
+        # page fragments per provider which are loaded instead of the full pages
+        for provider, fragment_urls in (self.checkparams.get('fragment_urls') or dict()).items():
+            if provider not in self.providers:
+                raise ValueError("Unknown provider {} in 'fragment_urls'".format(provider))
+            self.providers[provider].fragment_urls = dict(fragment_urls)
+
+        # worker processes for the page parsing of the threads engine, 0 parses in the fetch threads
+        self.parse_processes = int(self.checkparams.get('parse_processes') or 0)
+        if self.parse_processes > 0:
+            ParsePool.start(processes=self.parse_processes)
+
+        # the mail instance holds the current message, so only one worker may send at a time
+        self._mail_lock = Lock()
+
+        # create scheduler instance, the stored job times continue the cadence after a restart
+        self.scheduler = Scheduler(jobstore=DBJobStore(table=self.jobs_table))
+        self.check_job = None
+        self.digest_job = None
 
     def run(self) -> None:
-        """ run thread for beagent
+        """ registers the provider check jobs on the scheduler
+
+        """
+        self.restore_sessions()
+
+        self.check_job = self.scheduler.periodic(self.check_slots.slot_interval, self.check_cycle)
+        if self.digest_interval is not None:
+            self.digest_job = self.scheduler.periodic(self.digest_interval, self.request_digest,
+                                                      job_id='providercheck_digest')
+
+    def stop(self):
+        """ stops the scheduler, the check workers and the parse pool and saves the cookies of the cached sessions
+
+        """
+        self.scheduler.stop_periodic()
+
+        # unchanged cookies are saved as well, so the age of the stored sessions starts at the shutdown
+        if self.cookie_store is not None and self.session_cache is not None:
+            for provider, username, instance in self.session_cache.items():
+                self.__save_session(provider=provider, username=username, instance=instance, force=True)
+            self.logger.info("Saved the cookies of {} provider sessions".format(len(self.session_cache)))
+
+        self.scheduler.shutdown(wait=False)
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        ParsePool.shutdown(wait=False)
+
+    def restore_sessions(self):
+        """ restores the stored cookies of the registered accounts into the session cache, an expired session is
+        detected at its first page load and leads to a new login
 
         """
+        if self.cookie_store is None or self.session_cache is None:
+            return
+
+        try:
+            sessions = self.cookie_store.load_all()
+        except Exception as e:
+            self.logger.error("Could not load the stored provider sessions: {}".format(e))
+            return
 
-        while self._running:
+        restored = 0
+        for account in self.__get_registered_providers():
+            cookies = sessions.get((account.provider, account.username))
+            if cookies is None or account.provider not in self.providers:
+                continue
 
-            sleep(self.provider_check_interval)
-            self.check_data_from_providers(notify=False)
+            instance = self.__create_provider_instance(provider=account.provider)
+            instance.session.load_cookies(cookies=cookies)
+            self._saved_cookies[(account.provider, account.username)] = cookies
+            self.session_cache.put(provider=account.provider, username=account.username, password=account.password,
+                                   instance=instance)
+            restored += 1
+
+        self.logger.info("Restored {} stored provider sessions".format(restored))
+
+    def __save_session(self, provider, username, instance, force=False):
+        """ saves the cookies of the logged in provider instance if they changed since the last save
+
+        :param provider: provider name
+        :param username: username
+        :param instance: logged in provider instance
+        :param force: save unchanged cookies too
+        """
+        cookies = instance.session.dump_cookies()
+        if not force and self._saved_cookies.get((provider, username)) == cookies:
+            return
+
+        try:
+            self.cookie_store.save(provider=provider, username=username, cookies=cookies)
+            self._saved_cookies[(provider, username)] = cookies
+        except Exception as e:
+            self.logger.error("Could not store the session of provider {} and username {}: {}"
+                              .format(provider, username, e))
+
+    def __forget_session(self, provider, username):
+        """ removes the cached instance and the stored cookies of the account
+
+        :param provider: provider name
+        :param username: username
+        """
+        if self.session_cache is not None:
+            self.session_cache.invalidate(provider=provider, username=username)
+
+        self._saved_cookies.pop((provider, username), None)
+        if self.cookie_store is not None:
+            try:
+                self.cookie_store.delete(provider=provider, username=username)
+            except Exception as e:
+                self.logger.error("Could not delete the stored session of provider {} and username {}: {}"
+                                  .format(provider, username, e))
+
+    def request_digest(self):
+        """ requests the consumption overview mails, every slot sends them with its next check
+
+        """
+        self.logger.info("Consumption overview requested for the next check interval")
+        with self._digest_lock:
+            self._digest_slots = set(range(self.check_slots.slots))
+
+    def check_cycle(self):
+        """ runs one tick, checks the due accounts of the current slots and sends requested digests
+
+        """
+        slots = self.check_slots.due_slots()
+        if not slots:
+            return
+
+        # the account set is loaded once per interval, so added and deleted accounts take effect with the next one
+        if self._accounts_loaded is None or monotonic() - self._accounts_loaded >= self.provider_check_interval:
+            self.__load_slot_accounts()
+        if not self._slot_accounts:
+            self.logger.error("Registered provider list from database is empty!")
+            return
+
+        for slot in slots:
+            with self._digest_lock:
+                notify = slot in self._digest_slots
+                self._digest_slots.discard(slot)
+
+            slot_accounts = [account for account in self._slot_accounts.get(slot, [])
+                             if notify or self.is_check_due(account=account)]
+            if slot_accounts:
+                self.logger.info("Check {} accounts in slot {}".format(len(slot_accounts), slot))
+                self.check_accounts(accounts=slot_accounts, notify=notify)
+
+    def __load_slot_accounts(self):
+        """ loads the registered accounts and groups them by their slot
+
+        """
+        registered_provider_list = self.__get_registered_providers()
+
+        self._slot_accounts = dict()
+        for account in registered_provider_list:
+            slot = self.check_slots.slot(provider=account.provider, username=account.username)
+            self._slot_accounts.setdefault(slot, []).append(account)
+
+        # an empty or failed load is repeated with the next tick
+        if registered_provider_list:
+            self._accounts_loaded = monotonic()
+            self.__forget_removed_accounts(accounts=registered_provider_list)
+
+    def get_circuit_breaker(self, provider):
+        """ get the circuit breaker of the provider, creates it on the first request
+
+        :param provider: provider name
+        :return: CircuitBreaker
+        """
+        with self._breakers_lock:
+            breaker = self.circuit_breakers.get(provider)
+            if breaker is None:
+                breaker = self.circuit_breakers[provider] = CircuitBreaker(name=provider,
+                                                                           failure_threshold=self.breaker_threshold,
+                                                                           recovery_timeout=self.breaker_timeout)
+            return breaker
+
+    def __acquire_accounts(self, accounts):
+        """ marks the accounts as in check
+
+        :param accounts: list of Account records
+        :return: list of the accounts which were not already in check
+        """
+        acquired = list()
+        with self._accounts_lock:
+            for account in accounts:
+                if account.key in self._accounts_in_check:
+                    self.logger.info("Provider {} and username {} is already in check"
+                                     .format(account.provider, account.username))
+                else:
+                    self._accounts_in_check.add(account.key)
+                    acquired.append(account)
+        return acquired
+
+    def __release_accounts(self, accounts):
+        """ removes the in check mark of the accounts
+
+        :param accounts: list of Account records
+        """
+        with self._accounts_lock:
+            for account in accounts:
+                self._accounts_in_check.discard(account.key)
 
     def __get_registered_providers(self):
-        """ get all registered providers in database table
+        """ get all registered providers in database table with one query
 
-        :return: list of registered providers
+        :return: list of Account records
         """
 
-        sql = "select * from {}".format(self.database_table)
+        sql = "select {} from {}".format(", ".join(Account.columns), self.database_table)
 
         try:
             providers = self.dbfetcher.all(sql=sql)
@@ -79,17 +369,17 @@ class ProviderCheck(DBHandler, Thread):
             self.logger.error("Internal Database Error. {}".format(e))
             return []
 
-        return providers
+        return [Account.from_row(row) for row in providers]
 
     def __create_provider_instance(self, provider):
         """ creates provider instance
 
         :return: instance of type provider
         """
-        if provider == 'netzclub':
-            return Netzclub()
-        elif provider == 'alditalk':
-            return AldiTalk()
+        if provider in self.provider_urls:
+            return self.providers[provider](url=self.provider_urls[provider])
+        elif provider in self.providers:
+            return self.providers[provider]()
         else:
             raise ProviderInstanceError("Could not create the provider instance")
 
@@ -107,64 +397,71 @@ class ProviderCheck(DBHandler, Thread):
         else:
             raise ProviderInstanceError("Could not return logged in provider instance")
 
-    def get_last_reminder_ts(self, provider, username):
-        """ get last reminder timestamp from database
+    def __get_logged_in_provider(self, provider, username, password, renew=False, deadline=None):
+        """ get the logged in provider instance from the session cache or login with a new instance
 
-        :return: last reminder timestamp
+        :param provider: provider name
+        :param username: username
+        :param password: password
+        :param renew: discard the cached instance and login again
+        :param deadline: monotonic deadline of all requests of the instance
+        :return: logged in provider instance
         """
+        if self.session_cache is not None:
+            if renew:
+                self.session_cache.invalidate(provider=provider, username=username)
+            else:
+                cached_provider = self.session_cache.get(provider=provider, username=username, password=password)
+                if cached_provider is not None:
+                    cached_provider.set_deadline(deadline=deadline)
+                    return cached_provider
 
-        reminder_sql = "select last_reminder from {} where provider = %s and username = %s".format(self.database_table)
+        provider_instance = self.__create_provider_instance(provider=provider)
+        provider_instance.set_deadline(deadline=deadline)
+        logged_in_provider = self.__login_provider(provider=provider_instance, username=username, password=password)
 
-        try:
-            last_reminder = self.dbfetcher.all(sql=reminder_sql, data=(provider, username))
-            last_reminder = last_reminder[0][0]
+        if self.session_cache is not None:
+            self.session_cache.put(provider=provider, username=username, password=password,
+                                   instance=logged_in_provider)
+        if self.cookie_store is not None:
+            self.__save_session(provider=provider, username=username, instance=logged_in_provider)
 
-            if last_reminder is not None:
-                return last_reminder
-            else:
-                return last_reminder
-        except Exception as e:
-            self.logger.error("Internal Database Error. {}".format(e))
-            return None
+        return logged_in_provider
 
-    def set_last_reminder_ts(self, provider, username):
-        """ sets the last reminder timestamp in database table
+    def get_last_reminder_ts(self, account):
+        """ get last reminder timestamp of the account
 
-        :param provider: provider name
-        :param username: username
+        :param account: Account record
+        :return: last reminder timestamp
+        """
+        return account.last_reminder
+
+    def set_last_reminder_ts(self, account):
+        """ sets the last reminder timestamp in database table and on the account record
+
+        :param account: Account record
         """
         update_reminder_sql = "update {} set last_reminder = %s where provider = %s and username = %s".format(self.database_table)
 
         now_ts = time()
         try:
-            self.dbinserter.row(sql=update_reminder_sql, data=(now_ts, provider, username))
+            self.dbinserter.row(sql=update_reminder_sql, data=(now_ts, account.provider, account.username))
+            account.last_reminder = now_ts
         except Exception as ex:
             self.logger.error(ex)
 
-    def get_reminder_delay(self, provider, username):
-        """
+    def get_reminder_delay(self, account):
+        """ get the reminder delay of the account
 
-        :return:
+        :param account: Account record
+        :return: reminder delay
         """
-        reminder_delay_sql = "select reminder_delay from {} where provider = %s and username = %s".format(self.database_table)
-
-        try:
-            reminder_delay = self.dbfetcher.all(sql=reminder_delay_sql, data=(provider, username))
-            reminder_delay = reminder_delay[0][0]
-
-            if reminder_delay is not None:
-                print(reminder_delay)
-                print(type(reminder_delay))
-                pass
-            else:
-                pass
-        except Exception as e:
-            self.logger.error("Internal Database Error. {}".format(e))
+        return account.reminder_delay
 
     def get_consumption_data(self, provider):
-        """ get the consumption data dict from given provider
+        """ get the Consumption record from given provider
 
-        :return: consumption data dict
+        :return: Consumption record
         """
         return provider.current_consumption()
 
@@ -175,32 +472,23 @@ class ProviderCheck(DBHandler, Thread):
         """
         return provider.data_usage_overview()
 
-    def is_creditbalance_under_min(self, provider, username, consumption):
+    def is_creditbalance_under_min(self, account, consumption):
         """ checks if the creditbalance has reached the database minimum balance
 
+        :param account: Account record
+        :param consumption: Consumption record
         :return: True if minimum was reached, else False
         """
-
-        min_balance_sql = "Select min_balance from {} where provider = %s and username = %s".format(self.database_table)
-
-        try:
-            min_balance = self.dbfetcher.all(sql=min_balance_sql, data=(provider, username))
-            min_balance = min_balance[0][0]
-        except Exception as ex:
-            self.logger.error("Internal Database Error. {}".format(ex))
+        min_balance = account.min_balance
+        if min_balance is None:
             return False
 
-        current_creditbalance = consumption['creditbalance']
-        if "€" in current_creditbalance:
-            current_creditbalance = current_creditbalance.replace("€", "")
-        if "," in current_creditbalance:
-            current_creditbalance = current_creditbalance.replace(",", ".")
-
-        if float(current_creditbalance) <= min_balance:
-            return True
-        else:
+        # the provider did not report a balance
+        if consumption.balance_cents is None:
             return False
 
+        return consumption.balance_cents <= round(min_balance * 100)
+
     def prepare_creditbalance_min_mail(self, consumption):
         """ prepares the creditbalance minimum mail with consumption data
 
@@ -226,13 +514,10 @@ class ProviderCheck(DBHandler, Thread):
             consumption['total_volume'], consumption['end_date'])
         data_usage_str = "\n\n"
         for data_usage_month in data_usage['table_body']:
-            data_usage_month_str = "{}: {}\n{}: {}\n{}: {}\n{}: {}\n{}: {}\n\n".format(
-                data_usage['table_head'][0], data_usage_month[0],
-                data_usage['table_head'][1], data_usage_month[1],
-                data_usage['table_head'][2], data_usage_month[2],
-                data_usage['table_head'][3], data_usage_month[3],
-                data_usage['table_head'][4], data_usage_month[4])
-            data_usage_str += data_usage_month_str
+            # the providers deliver tables with different numbers of columns
+            data_usage_month_str = "".join("{}: {}\n".format(head, cell)
+                                           for head, cell in zip(data_usage['table_head'], data_usage_month))
+            data_usage_str += data_usage_month_str + "\n"
 
         return consumption_str + data_usage_str
 
@@ -244,62 +529,272 @@ class ProviderCheck(DBHandler, Thread):
         :param notification_str: notification str for email
         """
         receiver_list = receivers.split(';')
-        for receiver in receiver_list:
-            self.logger.info("Send Mail to {}".format(receiver))
-            self.mail.new_message()
-            self.mail.set_subject(subject_str)
-            self.mail.set_body(str(notification_str))
-            self.mail.send(username=self.sender, password=self.password, receiver=receiver)
+        with self._mail_lock:
+            for receiver in receiver_list:
+                self.logger.info("Send Mail to {}".format(receiver))
+                self.mail.new_message()
+                self.mail.set_subject(subject_str)
+                self.mail.set_body(str(notification_str))
+                self.mail.send(username=self.sender, password=self.password, receiver=receiver)
+
+    def __forget_removed_accounts(self, accounts):
+        """ forgets the check times and the sessions of accounts which are no longer registered
+
+        :param accounts: list with all registered Account records
+        """
+        account_keys = set(account.key for account in accounts)
+        for key in list(self._next_check):
+            if key not in account_keys:
+                del self._next_check[key]
+                self.__forget_session(provider=key[0], username=key[1])
+
+    def check_accounts(self, accounts, notify=False):
+        """ checks the given accounts with the configured engine, accounts already in a check are skipped
+
+        :param accounts: list with Account records
+        :param notify: send the consumption overview mails
+        :return: list with True for every successful check, else False
+        """
+        registered_provider_list = self.__acquire_accounts(accounts=accounts)
+        cycle_deadline = monotonic() + self.cycle_timeout
+        results = list()
+        try:
+            if self.engine == 'asyncio':
+                results = self.check_data_async(registered_provider_list=registered_provider_list, notify=notify)
+            elif self.executor is not None:
+                futures = {self.executor.submit(self.check_provider, account, notify, cycle_deadline): account
+                           for account in registered_provider_list}
+                for future in as_completed(futures):
+                    account = futures[future]
+                    try:
+                        results.append(future.result())
+                    except Exception as ex:
+                        results.append(False)
+                        self.logger.exception("Check for provider {} and username {} failed: {}"
+                                              .format(account.provider, account.username, ex))
+            else:
+                for account in registered_provider_list:
+                    try:
+                        results.append(self.check_provider(account=account, notify=notify,
+                                                           cycle_deadline=cycle_deadline))
+                    except Exception as ex:
+                        results.append(False)
+                        self.logger.exception("Check for provider {} and username {} failed: {}"
+                                              .format(account.provider, account.username, ex))
+        finally:
+            self.__release_accounts(accounts=registered_provider_list)
+
+        self.logger.info("Checked {} accounts, {} failed".format(len(results), results.count(False)))
+
+        for host, stats in HostLimiter.get_all_stats().items():
+            self.logger.debug("Host {}: {} requests, {} in flight, queue wait avg {:.2f}s max {:.2f}s"
+                              .format(host, stats['requests'], stats['in_flight'], stats['wait_avg'],
+                                      stats['wait_max']))
+
+        return results
+
+    def check_data_async(self, registered_provider_list, notify=False):
+        """ fetches the data of all registered providers on the asyncio engine and evaluates the results
+
+        :param registered_provider_list: list of Account records
+        :param notify: send the consumption overview mail
+        """
+        # the accounts of providers with an open circuit breaker are skipped
+        allowed_list = [account for account in registered_provider_list
+                        if self.get_circuit_breaker(provider=account.provider).allow()]
+        checked = [False] * (len(registered_provider_list) - len(allowed_list))
 
-    def check_data_from_providers(self, notify=False):
-        """ checks data from registered database providers
+        accounts = [(account.provider, account.username, account.password) for account in allowed_list]
+        try:
+            results = self.async_check.run(accounts=accounts, usage=notify, cycle_timeout=self.cycle_timeout)
+        finally:
+            for account in allowed_list:
+                self.get_circuit_breaker(provider=account.provider).release()
+
+        for account, result in zip(allowed_list, results):
+            breaker = self.get_circuit_breaker(provider=account.provider)
+            if isinstance(result, ProviderInstanceError):
+                self.logger.error("ProviderInstanceError: {}".format(result))
+            elif isinstance(result, ProviderLoginError):
+                self.logger.error("ProviderLoginError: {}".format(result))
+            elif isinstance(result, ProviderSessionError):
+                self.logger.error("ProviderSessionError: {}".format(result))
+            elif isinstance(result, (AttributeError, TypeError)):
+                self.logger.error("Could not parse the page of provider {} for username {}: {}"
+                                  .format(account.provider, account.username, result))
+            elif isinstance(result, ProviderTimeoutError):
+                self.logger.error("ProviderTimeoutError: {}".format(result))
+                breaker.record_failure()
+            elif isinstance(result, Exception):
+                self.logger.error("Check for provider {} and username {} failed: {}"
+                                  .format(account.provider, account.username, result))
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+                consumption, data_usage = result
+                try:
+                    self.evaluate_provider_data(account=account, consumption=consumption, data_usage=data_usage,
+                                                notify=notify)
+                except Exception as ex:
+                    self.logger.exception("Check for provider {} and username {} failed: {}"
+                                          .format(account.provider, account.username, ex))
+                else:
+                    checked.append(True)
+                    continue
+            checked.append(False)
+
+        return checked
+
+    def is_check_due(self, account):
+        """ checks if the next check of the account is due
+
+        :param account: Account record
+        :return: True if the account must be checked, else False
+        """
+        # the slot of the account is visited once per check interval and the next check time is stamped after the
+        # fetch, so the account is checked at the visit closest to its next check time
+        return monotonic() + self.provider_check_interval / 2 >= self._next_check.get(account.key, 0)
 
+    def schedule_next_check(self, account, consumption):
+        """ computes the next check time of the account from its consumption data
+
+        :param account: Account record
+        :param consumption: Consumption record
         """
-        # get all registered providers from database
-        registered_provider_list = self.__get_registered_providers()
+        interval = self.check_interval.next(consumption=consumption, min_balance=account.min_balance)
+        self._next_check[account.key] = monotonic() + interval
+        self.logger.debug("Next check for provider {} and username {} in {:.0f}s"
+                          .format(account.provider, account.username, interval))
+
+    def check_provider(self, account, notify=False, cycle_deadline=None):
+        """ checks the data of one registered database provider
+
+        :param account: Account record
+        :param notify: send the consumption overview mail
+        :param cycle_deadline: monotonic deadline of the whole check, the account is skipped once it is exceeded
+        :return: True if the check was successful, else False
+        """
+        now = monotonic()
+        if cycle_deadline is not None and now >= cycle_deadline:
+            self.logger.error("Check for provider {} and username {} aborted, the cycle deadline is exceeded"
+                              .format(account.provider, account.username))
+            return False
 
-        if len(registered_provider_list) > 0:
-            for registered_provider in registered_provider_list:
-                try:
-                    provider_instance = self.__create_provider_instance(provider=registered_provider[0])
-                    logged_in_provider = self.__login_provider(provider=provider_instance,
-                                                               username=registered_provider[1],
-                                                               password=registered_provider[2])
-                    # get data from providers
-                    consumption = self.get_consumption_data(provider=logged_in_provider)
-                    data_usage = self.get_data_usage_overview(provider=logged_in_provider)
-
-                    # send mail if creditbalance minimum reached
-                    if self.is_creditbalance_under_min(provider=registered_provider[0], username=registered_provider[1],
-                                                       consumption=consumption):
-                        self.logger.info("Creditbalance under minimum for provider {} and username {} with usage: {}"
-                                         .format(registered_provider[0], registered_provider[1], registered_provider[4]))
-
-                        # TODO check reminder delay for sending email
-                        last_ts = self.get_last_reminder_ts(provider=registered_provider[0], username=registered_provider[1])
-
-                        creditbalance_str = self.prepare_creditbalance_min_mail(consumption=consumption)
-
-                        # set last reminder timestamp
-                        self.set_last_reminder_ts(provider=registered_provider[0], username=registered_provider[1])
-
-                        self.send_notification_mail(receivers=registered_provider[5],
-                                                    subject_str="Creditbalance minimum reached for {}".format(registered_provider[4]),
-                                                    notification_str=creditbalance_str)
-                    # send weekly reminder mails to receivers
-                    if notify:
-                        self.logger.info("Weekly reminder for {} with usage: {}".format(registered_provider[1],
-                                                                                      registered_provider[4]))
-                        notification_str = self.prepare_notification_mail(consumption=consumption, data_usage=data_usage)
-                        self.send_notification_mail(receivers=registered_provider[5],
-                                                    subject_str="Consumption Overview for {}".format(registered_provider[4]),
-                                                    notification_str=notification_str)
-
-                except ProviderInstanceError as ex:
-                    self.logger.error("ProviderInstanceError: {}".format(ex))
-                except ProviderLoginError as ex:
-                    self.logger.error("ProviderLoginError: {}".format(ex))
-        else:
-            self.logger.error("Registered provider list from database is empty!")
+        breaker = self.get_circuit_breaker(provider=account.provider)
+        if not breaker.allow():
+            self.logger.debug("Skip provider {} and username {}, the circuit breaker is open"
+                              .format(account.provider, account.username))
+            return False
 
+        # login and fetch of the account share one deadline, which never exceeds the cycle deadline
+        deadline = now + self.account_timeout
+        if cycle_deadline is not None:
+            deadline = min(deadline, cycle_deadline)
+
+        logged_in_provider = None
+        try:
+            logged_in_provider = self.__get_logged_in_provider(provider=account.provider, username=account.username,
+                                                               password=account.password, deadline=deadline)
+            # get data from providers, an expired cached session needs a new login
+            try:
+                consumption = self.get_consumption_data(provider=logged_in_provider)
+            except ProviderSessionError as ex:
+                self.logger.info("{}, login again".format(ex))
+                logged_in_provider = self.__get_logged_in_provider(provider=account.provider,
+                                                                   username=account.username,
+                                                                   password=account.password, renew=True,
+                                                                   deadline=deadline)
+                consumption = self.get_consumption_data(provider=logged_in_provider)
+
+            # the data usage overview is an extra page load and only needed for the notification mail
+            if notify:
+                data_usage = self.get_data_usage_overview(provider=logged_in_provider)
+            else:
+                data_usage = None
 
+            breaker.record_success()
+
+            # the portal may have renewed the session cookies during the fetch
+            if self.cookie_store is not None:
+                self.__save_session(provider=account.provider, username=account.username,
+                                    instance=logged_in_provider)
+
+        except ProviderInstanceError as ex:
+            self.logger.error("ProviderInstanceError: {}".format(ex))
+            return False
+        except ProviderLoginError as ex:
+            self.logger.error("ProviderLoginError: {}".format(ex))
+            return False
+        except ProviderSessionError as ex:
+            self.logger.error("ProviderSessionError: {}".format(ex))
+            self.__forget_session(provider=account.provider, username=account.username)
+            return False
+        except ProviderQueueTimeoutError as ex:
+            # the deadline ran out in the own request queue, this is not counted against the provider
+            self.logger.error("ProviderQueueTimeoutError: Check for provider {} and username {} aborted: {}"
+                              .format(account.provider, account.username, ex))
+            return False
+        except ProviderTimeoutError as ex:
+            self.logger.error("ProviderTimeoutError: Check for provider {} and username {} aborted: {}"
+                              .format(account.provider, account.username, ex))
+            breaker.record_failure()
+            return False
+        except ProviderUnavailableError as ex:
+            self.logger.error("ProviderUnavailableError: Check for provider {} and username {} failed: {}"
+                              .format(account.provider, account.username, ex))
+            breaker.record_failure()
+            return False
+        except requests.RequestException as ex:
+            self.logger.error("RequestException: Check for provider {} and username {} failed: {}"
+                              .format(account.provider, account.username, ex))
+            breaker.record_failure()
+            return False
+        except (AttributeError, TypeError) as ex:
+            # the page did not contain the expected elements, this is not counted against the whole provider
+            self.logger.error("Could not parse the page of provider {} for username {}: {}"
+                              .format(account.provider, account.username, ex))
+            if self.session_cache is not None:
+                self.session_cache.invalidate(provider=account.provider, username=account.username)
+            return False
+        finally:
+            breaker.release()
+            if logged_in_provider is not None:
+                logged_in_provider.set_deadline(deadline=None)
+
+        self.evaluate_provider_data(account=account, consumption=consumption, data_usage=data_usage, notify=notify)
+        return True
+
+    def evaluate_provider_data(self, account, consumption, data_usage, notify=False):
+        """ evaluates the fetched data of one registered provider and sends the notification mails
+
+        :param account: Account record
+        :param consumption: Consumption record
+        :param data_usage: data usage dict, only fetched if notify is True
+        :param notify: send the consumption overview mail
+        """
+        self.schedule_next_check(account=account, consumption=consumption)
+
+        # send mail if creditbalance minimum reached
+        if self.is_creditbalance_under_min(account=account, consumption=consumption):
+            self.logger.info("Creditbalance under minimum for provider {} and username {} with usage: {}"
+                             .format(account.provider, account.username, account.usage))
+
+            # TODO check reminder delay for sending email
+            last_ts = self.get_last_reminder_ts(account=account)
+
+            creditbalance_str = self.prepare_creditbalance_min_mail(consumption=consumption)
+
+            # set last reminder timestamp
+            self.set_last_reminder_ts(account=account)
+
+            self.send_notification_mail(receivers=account.notifyer,
+                                        subject_str="Creditbalance minimum reached for {}".format(account.usage),
+                                        notification_str=creditbalance_str)
+        # send weekly reminder mails to receivers
+        if notify:
+            self.logger.info("Weekly reminder for {} with usage: {}".format(account.username,
+                                                                          account.usage))
+            notification_str = self.prepare_notification_mail(consumption=consumption, data_usage=data_usage)
+            self.send_notification_mail(receivers=account.notifyer,
+                                        subject_str="Consumption Overview for {}".format(account.usage),
+                                        notification_str=notification_str)
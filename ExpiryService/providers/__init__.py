@@ -1,3 +1,5 @@
 from ExpiryService.providers.provider import Provider
 from ExpiryService.providers.aldi_talk import AldiTalk
 from ExpiryService.providers.netzclub import Netzclub
+from ExpiryService.providers.congstar import Congstar
+from ExpiryService.providers.async_provider import AsyncProvider, AsyncAldiTalk, AsyncNetzclub, AsyncCongstar
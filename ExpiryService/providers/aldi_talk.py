@@ -1,6 +1,9 @@
+import re
 import logging
-from bs4 import BeautifulSoup
+from time import monotonic
+from ExpiryService.consumption import Consumption
 from ExpiryService.providers import Provider
+from ExpiryService.providers.parser import PageParser, ContainerStrainer
 
 
 class AldiTalk(Provider):
@@ -11,17 +14,37 @@ class AldiTalk(Provider):
             alditalk.login(username, password)
 
     """
-    def __init__(self):
+    # seconds a fetched csrf token is reused for further logins
+    token_ttl = 900
+
+    # containers of the pages which hold the data, the rest of the pages is not parsed
+    login_containers = ContainerStrainer(names=('input',))
+    consumption_containers = ContainerStrainer(ids=('ajaxReplaceQuickInfoBoxBalanceId', 'ajaxReplaceAreaId-32956'),
+                                               classes=('table',))
+    data_usage_containers = ContainerStrainer(ids=('ajaxReplaceAreaId-20701',))
+
+    # the start page serves the login form with the csrf token instead of the data if the session has expired
+    login_form = re.compile(rb'<input[^>]+name=["\']_csrf_token["\']')
+
+    # the ajaxReplace containers are candidates for separately loadable fragments, the endpoints are not known yet,
+    # e.g. {'consumption': ['?fragment=balance', ...], 'data_usage': [...]}
+    fragment_urls = dict()
+
+    def __init__(self, url="https://www.alditalk-kundenbetreuung.de/de/"):
         self.logger = logging.getLogger('ExpiryService')
         self.logger.info('create class AldiTalk')
 
         # init base class
         super().__init__()
 
-        self.aldi_url = "https://www.alditalk-kundenbetreuung.de/de/"
-        self.csrf_token = self.__get_csrf_token()
+        self.aldi_url = url
+        self.login_url = url + 'login'
+
+        # the csrf token is fetched on demand by login()
+        self.csrf_token = None
+        self.csrf_token_ts = None
 
-        self.aldi_data = dict()
+        self.aldi_data = None
 
     def __str__(self):
         """ string representation
@@ -38,10 +61,25 @@ class AldiTalk(Provider):
         self.logger.info("Get csrf token from AldiTalk web page")
 
         token_resp = self.session.get(self.aldi_url)
-        bs = BeautifulSoup(token_resp.text, 'html.parser')
-        token = bs.find('input', type="hidden", attrs={'name': '_csrf_token'}).get('value')
 
-        return token
+        return self.parse_page(self.parse_csrf_token, token_resp)
+
+    @staticmethod
+    def parse_csrf_token(html):
+        """ parses the csrf token from the login page
+
+        :param html: html string of the login page
+        :return: csrf token
+        """
+        bs = PageParser.parse(html, parse_only=AldiTalk.login_containers)
+        return bs.find('input', type="hidden", attrs={'name': '_csrf_token'}).get('value')
+
+    def __is_csrf_token_valid(self):
+        """ checks if the csrf token was fetched and is younger than the token ttl
+
+        :return: True if the csrf token can be used, else False
+        """
+        return self.csrf_token is not None and monotonic() - self.csrf_token_ts < self.token_ttl
 
     def login(self, username, password):
         """ login to alditalk web page
@@ -51,6 +89,9 @@ class AldiTalk(Provider):
 
         :return: True if login was successful else False
         """
+        if not self.__is_csrf_token_valid():
+            self.csrf_token = self.__get_csrf_token()
+            self.csrf_token_ts = monotonic()
 
         login_form = {
             '_csrf_token': self.csrf_token,
@@ -64,16 +105,26 @@ class AldiTalk(Provider):
             return True
         else:
             self.logger.error("Login to AldiTalk failed!")
+            # the token may be the reason, fetch a new one for the next login
+            self.csrf_token = None
             return False
 
     def current_consumption(self):
         """ get current consumption from AldiTalk web page
 
-        :return: consumption dict
+        :return: Consumption record
+        """
+        self.aldi_data = self.fetch_data(kind='consumption', url=self.aldi_url, parse=self.parse_consumption)
+        return self.aldi_data
+
+    @staticmethod
+    def parse_consumption(html):
+        """ parses the current consumption from the AldiTalk start page
+
+        :param html: html string of the start page
+        :return: Consumption record
         """
-        resp = self.session.get(url=self.aldi_url)
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        #print(soup)
+        soup = PageParser.parse(html, parse_only=AldiTalk.consumption_containers)
         credit_balance_box = soup.find("div", {"id": "ajaxReplaceQuickInfoBoxBalanceId"})
 
         credit_balance = ''
@@ -82,24 +133,18 @@ class AldiTalk(Provider):
 
         table_data = soup.find("div", {"class": "table"})
 
-        remaining_data, total_data, end_date = self.__parse_table_data(table=table_data)
+        remaining_data, total_data, end_date = AldiTalk.parse_table_data(table=table_data)
 
         name_number_data = soup.find("div", {"id": "ajaxReplaceAreaId-32956"})
 
         name = name_number_data.find('p').text
         number = name_number_data.find('h3').text
 
-        self.aldi_data.update({
-            'name': name,
-            'number': number,
-            'creditbalance': credit_balance,
-            'remaining_volume': remaining_data,
-            'total_volume': total_data,
-            'end_date': end_date
-        })
-        return self.aldi_data
+        return Consumption(name=name, number=number, creditbalance=credit_balance, remaining_volume=remaining_data,
+                           total_volume=total_data, end_date=end_date)
 
-    def __parse_table_data(self, table):
+    @staticmethod
+    def parse_table_data(table):
         """ parses the table data which contains the current consumption
 
         :param table: bs table element
@@ -123,15 +168,24 @@ class AldiTalk(Provider):
             total_data = usage_total + ' ' + usage_total_unit
             return remaining_data, total_data, end_date
         else:
-            self.logger.error("length of table data is less than 5! Can not parse remaining data")
+            logging.getLogger('ExpiryService').error("length of table data is less than 5! Can not parse remaining data")
 
     def data_usage_overview(self):
         """ parses the data usage overview from the alditalk webpage
 
         :return: table dict
         """
-        resp = self.session.get(url=self.aldi_url + 'konto/kontoubersicht')
-        soup = BeautifulSoup(resp.text, 'html.parser')
+        return self.fetch_data(kind='data_usage', url=self.aldi_url + 'konto/kontoubersicht',
+                               parse=self.parse_data_usage)
+
+    @staticmethod
+    def parse_data_usage(html):
+        """ parses the data usage table from the AldiTalk account overview page
+
+        :param html: html string of the account overview page
+        :return: table dict
+        """
+        soup = PageParser.parse(html, parse_only=AldiTalk.data_usage_containers)
 
         data_usage = soup.find("div", {"id": "ajaxReplaceAreaId-20701"})
 
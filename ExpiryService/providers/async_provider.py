@@ -0,0 +1,385 @@
+import asyncio
+import logging
+from time import monotonic
+from urllib.parse import urlsplit
+from abc import ABC, abstractmethod
+
+from ExpiryService.providers.provider import Provider
+from ExpiryService.providers.aldi_talk import AldiTalk
+from ExpiryService.providers.netzclub import Netzclub
+from ExpiryService.providers.congstar import Congstar
+from ExpiryService.providers.limiter import AsyncHostLimiter
+from ExpiryService.exceptions import ProviderSessionError, ProviderUnavailableError
+try:
+    import aiohttp
+    is_aiohttp_importable = True
+except ImportError:
+    is_aiohttp_importable = False
+
+
+class AsyncProvider(ABC):
+    """ Base class AsyncProvider to define asyncio counterparts of the Provider methods
+
+    The pages are parsed with the static parse methods of the synchronous provider classes, so both engines
+    return the same data. The requests go through the async limiter of the target host with the limits and the
+    retry policy of the synchronous provider class.
+
+    USAGE:
+            async with AsyncAldiTalk(connector=connector) as alditalk:
+                await alditalk.login(username, password)
+                await alditalk.current_consumption()
+
+    """
+    # synchronous provider class with the limits, the retry policy and the login form of the portal
+    sync_provider = Provider
+
+    def __init__(self, connector=None):
+        self.logger = logging.getLogger('ExpiryService')
+
+        if not is_aiohttp_importable:
+            raise ImportError("aiohttp is required for the asyncio provider engine")
+
+        # every account gets its own cookie jar, the connection pool can be shared between accounts
+        self.session = aiohttp.ClientSession(connector=connector, connector_owner=connector is None,
+                                             headers=Provider.headers, cookie_jar=aiohttp.CookieJar(unsafe=True),
+                                             timeout=aiohttp.ClientTimeout(sock_connect=Provider.connect_timeout,
+                                                                           sock_read=Provider.read_timeout))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """ closes the client session
+
+        """
+        await self.session.close()
+
+    def get_limiter(self, url):
+        """ get the shared async limiter of the url host
+
+        :param url: url string
+        :return: AsyncHostLimiter
+        """
+        provider = self.sync_provider
+        return AsyncHostLimiter.for_host(host=urlsplit(url).netloc, max_in_flight=provider.max_in_flight,
+                                         requests_per_second=provider.requests_per_second,
+                                         min_in_flight=provider.min_in_flight,
+                                         initial_in_flight=provider.initial_in_flight,
+                                         latency_target=provider.latency_target)
+
+    @staticmethod
+    def is_healthy(resp):
+        """ checks if the response shows a healthy portal
+
+        :param resp: response object
+        :return: False for 429 and 5xx responses
+        """
+        return resp.status != 429 and resp.status < 500
+
+    async def _request(self, method, url, **kwargs):
+        """ sends the request through the host limiter and retries idempotent requests after transient failures
+
+        :param method: http method
+        :param url: url string
+        :return: tuple of response object and body bytes
+        """
+        limiter = self.get_limiter(url=url)
+        retry = self.sync_provider.retry
+
+        attempt = 0
+        while True:
+            try:
+                async with limiter.limit():
+                    started = monotonic()
+                    try:
+                        async with self.session.request(method, url, **kwargs) as resp:
+                            body = await resp.read()
+                    except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                        limiter.record(latency=monotonic() - started, ok=False, started=started)
+                        raise
+                    limiter.record(latency=monotonic() - started, ok=self.is_healthy(resp=resp), started=started)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if not retry.is_retryable(method=method, attempt=attempt):
+                    raise
+            else:
+                if self.is_healthy(resp=resp):
+                    return resp, body
+                if not retry.is_retryable(method=method, attempt=attempt):
+                    raise ProviderUnavailableError("Request to {} failed with status {}".format(url, resp.status))
+
+            await asyncio.sleep(retry.delay(attempt=attempt))
+            attempt += 1
+
+    async def _get_text(self, url):
+        """ requests the given url
+
+        :param url: url string
+        :return: response text
+        """
+        resp, body = await self._request('GET', url)
+        return await resp.text()
+
+    async def _get_page(self, url):
+        """ requests a page which needs a logged in session
+
+        :param url: url string
+        :return: response text
+        """
+        resp, body = await self._request('GET', url)
+        if self.sync_provider.is_login_page(content=body):
+            raise ProviderSessionError("Session of provider {} has expired, the login form was served"
+                                       .format(self))
+        return await resp.text()
+
+    async def _get_json(self, url):
+        """ requests the given json api
+
+        :param url: url string
+        :return: decoded json data
+        """
+        resp, body = await self._request('GET', url)
+        if resp.status in (401, 403):
+            raise ProviderSessionError("Session of provider {} has expired".format(self))
+        resp.raise_for_status()
+        return await resp.json(content_type=None)
+
+    async def _post_status(self, url, data):
+        """ posts the form data to the given url
+
+        :param url: url string
+        :param data: form dict
+        :return: response status code
+        """
+        resp, body = await self._request('POST', url, data=data, allow_redirects=True)
+        return resp.status
+
+    @abstractmethod
+    async def login(self, username, password):
+        """ login method for the provider web page
+
+        :return: True if login was successful
+        """
+        pass
+
+    @abstractmethod
+    async def current_consumption(self):
+        """ get current consumption from provider web page
+
+        :return: Consumption record
+        """
+        pass
+
+    @abstractmethod
+    async def data_usage_overview(self):
+        """ get data usage overview from provider web page
+
+        :return: data usage dict
+        """
+        pass
+
+
+class AsyncAldiTalk(AsyncProvider):
+    """ class AsyncAldiTalk to parse consumption data from AldiTalk web page on an event loop
+
+    USAGE:
+            alditalk = AsyncAldiTalk()
+            await alditalk.login(username, password)
+
+    """
+    sync_provider = AldiTalk
+
+    def __init__(self, connector=None, url="https://www.alditalk-kundenbetreuung.de/de/"):
+        super().__init__(connector=connector)
+
+        self.aldi_url = url
+
+    def __str__(self):
+        """ string representation
+
+        :return: str
+        """
+        return "AldiTalk"
+
+    async def login(self, username, password):
+        """ login to alditalk web page
+
+        :param username: username
+        :param password: password
+
+        :return: True if login was successful else False
+        """
+        csrf_token = AldiTalk.parse_csrf_token(await self._get_text(self.aldi_url))
+
+        login_form = {
+            '_csrf_token': csrf_token,
+            'form[username]': username,
+            'form[password]': password,
+        }
+
+        if await self._post_status(self.aldi_url + 'login_check', data=login_form) == 200:
+            self.logger.info("Login to AldiTalk was successful")
+            return True
+        else:
+            self.logger.error("Login to AldiTalk failed!")
+            return False
+
+    async def current_consumption(self):
+        """ get current consumption from AldiTalk web page
+
+        :return: Consumption record
+        """
+        return AldiTalk.parse_consumption(await self._get_page(self.aldi_url))
+
+    async def data_usage_overview(self):
+        """ parses the data usage overview from the alditalk webpage
+
+        :return: table dict
+        """
+        return AldiTalk.parse_data_usage(await self._get_page(self.aldi_url + 'konto/kontoubersicht'))
+
+
+class AsyncNetzclub(AsyncProvider):
+    """ class AsyncNetzclub to parse consumption data from Netzclub web page on an event loop
+
+    USAGE:
+            netzclub = AsyncNetzclub()
+            await netzclub.login(username, password)
+
+    """
+    sync_provider = Netzclub
+
+    def __init__(self, connector=None, url="https://www.netzclub.net/"):
+        super().__init__(connector=connector)
+
+        self.netzclub_login = url + "login/"
+        self.netzclub_home = url + "selfcare/"
+        self.netzclub_billing = url + "meine-abrechnung/"
+
+        self.session.headers.update(Netzclub.netzclub_headers)
+
+    def __str__(self):
+        """ string representation
+
+        :return: str
+        """
+        return "Netzclub"
+
+    async def login(self, username, password):
+        """ login to netzclub web page
+
+        :param username: username
+        :param password: password
+        :return: True if login was successful else False
+        """
+        csrf_token, sid, reload_token = Netzclub.parse_login_tokens(await self._get_text(self.netzclub_login))
+
+        login_form = {
+            '__hidden_loginForm': 'exists',
+            'sid': sid,
+            '__reload_token_loginForm__': reload_token,
+            'csrfToken': csrf_token,
+            'txtMobile': username,
+            'txtPassword': password,
+            'btnLogin': '',
+            'hidAnchor': ''
+        }
+
+        if await self._post_status(self.netzclub_login, data=login_form) == 200:
+            self.logger.info("Login to Netzclub was successful")
+            return True
+        else:
+            self.logger.error("Login to Netzclub failed!")
+            return False
+
+    async def current_consumption(self):
+        """ get current consumption from Netzclub web page
+
+        :return: Consumption record
+        """
+        return Netzclub.parse_consumption(await self._get_text(self.netzclub_home))
+
+    async def data_usage_overview(self):
+        """ parses the data usage overview from the netzclub webpage
+
+        :return: table dict
+        """
+        return Netzclub.parse_data_usage(await self._get_text(self.netzclub_billing))
+
+
+class AsyncCongstar(AsyncProvider):
+    """ class AsyncCongstar to read consumption data from the Congstar JSON API on an event loop
+
+    USAGE:
+            congstar = AsyncCongstar()
+            await congstar.login(username, password)
+
+    """
+    sync_provider = Congstar
+
+    def __init__(self, connector=None, url="https://www.congstar.de/"):
+        super().__init__(connector=connector)
+
+        self.congstar_url = url
+        self.contract = None
+
+        self.session.headers.update(Congstar.congstar_headers)
+
+    def __str__(self):
+        """ string representation
+
+        :return: str
+        """
+        return "Congstar"
+
+    async def login(self, username, password):
+        """ login to congstar api
+
+        :param username: username
+        :param password: password
+        :return: True if login was successful else False
+        """
+        login_form = {
+            'username': username,
+            'password': password,
+            'defaultRedirectUrl': "/meincongstar",
+            'targetPageUrlOrId': ""
+        }
+
+        resp, body = await self._request('POST', self.congstar_url + Congstar.login_api, data=login_form,
+                                         allow_redirects=True)
+        if resp.status == 200 and Congstar.parse_login(data=body):
+            self.logger.info("Login to Congstar was successful")
+            return True
+        else:
+            self.logger.error("Login to Congstar failed!")
+            return False
+
+    async def get_contract(self):
+        """ get the first contract of the account
+
+        :return: contract dict
+        """
+        if self.contract is None:
+            self.contract = Congstar.parse_contracts(await self._get_json(self.congstar_url + Congstar.contracts_api))
+        return self.contract
+
+    async def current_consumption(self):
+        """ get current consumption from the congstar api
+
+        :return: Consumption record
+        """
+        contract = await self.get_contract()
+        api = Congstar.consumption_api.format(contract_id=contract['contractId'])
+        return Congstar.parse_consumption(contract=contract, data=await self._get_json(self.congstar_url + api))
+
+    async def data_usage_overview(self):
+        """ get the data usage overview from the congstar api
+
+        :return: table dict
+        """
+        contract = await self.get_contract()
+        api = Congstar.usage_api.format(contract_id=contract['contractId'])
+        return Congstar.parse_data_usage(data=await self._get_json(self.congstar_url + api))
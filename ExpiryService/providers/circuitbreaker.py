@@ -0,0 +1,91 @@
+import logging
+import threading
+from time import monotonic
+
+
+class CircuitBreaker:
+    """ class CircuitBreaker to stop the checks of a provider while its portal is down
+
+    The breaker opens after failure_threshold consecutive failures and rejects all checks for recovery_timeout
+    seconds. Then it lets a single probe through (half open), a successful probe closes the breaker again and a
+    failed probe opens it for another recovery_timeout.
+
+    USAGE:
+            breaker = CircuitBreaker(name='alditalk', failure_threshold=5, recovery_timeout=300)
+            if breaker.allow():
+                ...
+                breaker.record_success()
+
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=5, recovery_timeout=300):
+        self.logger = logging.getLogger('ExpiryService')
+        self.logger.info('Create class CircuitBreaker for {}'.format(name))
+
+        if failure_threshold < 1:
+            raise ValueError("'failure_threshold' must be a positive number")
+
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """ checks if a request to the provider may be sent
+
+        :return: True if the breaker is closed or the caller is the half open probe
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN:
+                if monotonic() - self.opened_at < self.recovery_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self.logger.info("Circuit breaker of {} is half open, send a probe".format(self.name))
+
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        """ records a successful request, closes the breaker
+
+        """
+        with self._lock:
+            if self.state != self.CLOSED:
+                self.logger.info("Circuit breaker of {} is closed".format(self.name))
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """ records a failed request, opens the breaker after failure_threshold failures or a failed probe
+
+        """
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.logger.error("Circuit breaker of {} is open after {} failures, skip its accounts for {}s"
+                                      .format(self.name, self.failures, self.recovery_timeout))
+                self.state = self.OPEN
+                self.opened_at = monotonic()
+            self._probe_in_flight = False
+
+    def release(self):
+        """ releases the probe without a result, e.g. if the probe failed for an account specific reason
+
+        """
+        with self._lock:
+            self._probe_in_flight = False
@@ -1,48 +1,84 @@
+import json
 import logging
+from datetime import date
+from ExpiryService.consumption import Consumption
 from ExpiryService.providers import Provider
+from ExpiryService.exceptions import ProviderLoginError, ProviderSessionError
 
 
 class Congstar(Provider):
-    """ class Congstar to parse consumption data from Congstar web page
+    """ class Congstar to read consumption data from the Congstar JSON API
+
+    The data is read from the JSON responses of the meincongstar API, no page is parsed. The api paths are
+    relative to the url and can be changed on the class if the API moves.
 
     USAGE:
             congstar = Congstar()
             congstar.login(username, password)
 
     """
-    def __init__(self):
+    congstar_headers = {
+        "Accept": "application/json, text/plain, */*",
+        "Accept-Language": "de-DE,de;q=0.9,en-US;q=0.8,en;q=0.7",
+        "Accept-Encoding": "gzip, deflate, br",
+        "Connection": "keep-alive",
+        "Origin": "https://www.congstar.de",
+        "Sec-Fetch-Mode": "cors",
+        "Sec-Fetch-Site": "same-origin",
+        "X-Requested-With": "XMLHttpRequest"
+    }
+
+    login_api = 'api/auth/login'
+    contracts_api = 'api/contracts'
+    consumption_api = 'api/contracts/{contract_id}/consumption'
+    usage_api = 'api/contracts/{contract_id}/usage-history'
+
+    units = (('GB', 1024 ** 3), ('MB', 1024 ** 2), ('KB', 1024))
+
+    def __init__(self, url="https://www.congstar.de/"):
         self.logger = logging.getLogger('ExpiryService')
         self.logger.info('create class Congstar')
 
         # init base class
         super().__init__()
 
-        self.congstar_login = "https://www.congstar.de/api/auth/login"
-        self.congstar_home = "https://www.congstar.de/meincongstar/"
-        self.session.headers.update({
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "de-DE,de;q=0.9,en-US;q=0.8,en;q=0.7",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive",
-            "Host": "www.congstar.de",
-            "Origin": "https://www.congstar.de/",
-            #"Referer": "https://www.congstar.de/login/",
-            #"Content-Type": "application/json, text/plain, */*",
-            "Sec-Fetch-Mode": "cors",
-            "Sec-Fetch-Site": "same-origin",
-            "X-Requested-With": "XMLHttpRequest"
-        })
-
-        self.congstar_data = dict()
+        self.congstar_url = url
+        self.session.headers.update(self.congstar_headers)
+
+        # contract of the logged in account, read on demand from the contracts api
+        self.contract = None
+
+        self.congstar_data = None
+
+    def __str__(self):
+        """ string representation
+
+        :return: str
+        """
+        return "Congstar"
+
+    def get_json(self, api):
+        """ requests the api which needs a logged in session
+
+        :param api: api path relative to the url
+        :return: decoded json data
+        """
+        resp = self.session.get(url=self.congstar_url + api)
+
+        if resp.status_code in (401, 403):
+            self.contract = None
+            raise ProviderSessionError("Session of provider {} has expired".format(self))
+        resp.raise_for_status()
+
+        return resp.json()
 
     def login(self, username, password):
-        """ login to congstar web page
+        """ login to congstar api
 
         :param username: username
         :param password: password
         :return: True if login was successful else False
         """
-
         self.logger.info("Login to Congstar web page")
 
         login_form = {
@@ -52,27 +88,156 @@ class Congstar(Provider):
             'targetPageUrlOrId': ""
         }
 
-        login_resp = self.session.post(url=self.congstar_login, data=login_form, allow_redirects=True)
-        print(login_resp.status_code)
-        #print(login_resp.text)
+        login_resp = self.session.post(url=self.congstar_url + self.login_api, data=login_form, allow_redirects=True)
 
         if login_resp.status_code == 200:
+            # a rejected login is answered with 200 as well, only the success field of the response tells
+            self.parse_login(data=login_resp.content)
             self.logger.info("Login to Congstar was successful")
+            self.contract = None
             return True
         else:
             self.logger.error("Login to Congstar failed!")
             return False
 
+    def get_contract(self):
+        """ get the first contract of the account
+
+        :return: contract dict
+        """
+        if self.contract is None:
+            self.contract = self.parse_contracts(self.get_json(api=self.contracts_api))
+        return self.contract
+
     def current_consumption(self):
+        """ get current consumption from the congstar api
+
+        :return: Consumption record
+        """
+        contract = self.get_contract()
+        data = self.get_json(api=self.consumption_api.format(contract_id=contract['contractId']))
+
+        self.congstar_data = self.parse_consumption(contract=contract, data=data)
+        return self.congstar_data
+
+    def data_usage_overview(self):
+        """ get the data usage overview from the congstar api
+
+        :return: table dict
+        """
+        contract = self.get_contract()
+        data = self.get_json(api=self.usage_api.format(contract_id=contract['contractId']))
+
+        return self.parse_data_usage(data=data)
+
+    @staticmethod
+    def parse_login(data):
+        """ checks the success field of the login response
+
+        :param data: body of the login api response
+        :return: True if the login was accepted
+        """
+        try:
+            response = json.loads(data)
+        except ValueError:
+            raise ProviderLoginError("Congstar login response is no json")
+
+        if not isinstance(response, dict) or not response.get('success'):
+            raise ProviderLoginError("Congstar rejected the login")
+        return True
+
+    @staticmethod
+    def parse_contracts(data):
+        """ parses the contract of the account from the contracts response
+
+        :param data: decoded json of the contracts api
+        :return: contract dict
         """
+        contracts = data.get('contracts', data) if isinstance(data, dict) else data
+        if not contracts:
+            raise ProviderLoginError("No contract found for the Congstar account")
+        return contracts[0]
+
+    @staticmethod
+    def format_amount(amount):
+        """ formats an amount like the portals, e.g. '12,34 €'
+
+        :param amount: amount as number or None
+        :return: amount string, empty if the amount is unknown
+        """
+        if amount is None:
+            return ''
+        return "{:.2f} €".format(amount).replace('.', ',')
+
+    @staticmethod
+    def format_volume(volume):
+        """ formats a volume in bytes like the portals, e.g. '1,5 GB'
 
-        :return:
+        :param volume: volume in bytes or None
+        :return: volume string, empty if the volume is unknown
         """
-        resp = self.session.get(url="https://www.congstar.de/meincongstar/meine-produkte/tarife/mein-vertrag/?contractId=BvWF_IP1DdTcQg%3D%3D")
-        #print(self.session.cookies)
-        print(resp.text)
-
-if __name__ == '__main__':
-    congstar = Congstar()
-    if congstar.login(username="", password=""):
-        congstar.current_consumption()
+        if volume is None:
+            return ''
+        for unit, size in Congstar.units:
+            if volume >= size:
+                return "{:g} {}".format(round(volume / size, 2), unit).replace('.', ',')
+        return "{} B".format(volume)
+
+    @staticmethod
+    def format_date(date_str):
+        """ formats an iso date like the portals, e.g. '2026-11-01' to '01.11.2026'
+
+        :param date_str: iso date string or None
+        :return: date string, empty if the date is unknown
+        """
+        if not date_str:
+            return ''
+        year, month, day = date_str[:10].split('-')
+        return "{}.{}.{}".format(day, month, year)
+
+    @staticmethod
+    def parse_consumption(contract, data):
+        """ parses the current consumption from the contract and the consumption response
+
+        :param contract: contract dict
+        :param data: decoded json of the consumption api
+        :return: Consumption record
+        """
+        balance = data.get('balance') or dict()
+        volume = data.get('dataVolume') or dict()
+
+        amount = balance.get('amount')
+        valid_until = data.get('validUntil')
+
+        # the api delivers the numbers, so the strings are only formatted for the mails
+        return Consumption(name=contract.get('name', ''),
+                           number=contract.get('msisdn', ''),
+                           creditbalance=Congstar.format_amount(amount),
+                           remaining_volume=Congstar.format_volume(volume.get('remaining')),
+                           total_volume=Congstar.format_volume(volume.get('total')),
+                           end_date=Congstar.format_date(valid_until),
+                           balance_cents=round(amount * 100) if amount is not None else None,
+                           remaining_bytes=volume.get('remaining'),
+                           total_bytes=volume.get('total'),
+                           expiry_date=date.fromisoformat(valid_until[:10]) if valid_until else None)
+
+    @staticmethod
+    def parse_data_usage(data):
+        """ parses the data usage table from the usage history response
+
+        :param data: decoded json of the usage history api
+        :return: table dict
+        """
+        table_body_list = list()
+        for period in data.get('periods', list()):
+            table_body_list.append([
+                "{} - {}".format(Congstar.format_date(period.get('from')), Congstar.format_date(period.get('to'))),
+                Congstar.format_volume(period.get('total')),
+                Congstar.format_volume(period.get('used')),
+                Congstar.format_volume(period.get('remaining')),
+            ])
+
+        return {
+            'table_head': ['Zeitraum', 'Volumen', 'Verbraucht', 'Rest'],
+            'table_body': table_body_list
+        }
@@ -0,0 +1,349 @@
+import asyncio
+import logging
+import threading
+from time import monotonic, sleep
+from contextlib import contextmanager, asynccontextmanager
+
+from ExpiryService.exceptions import ProviderQueueTimeoutError
+
+
+class TokenBucket:
+    """ class TokenBucket to limit the request rate, the bucket holds up to capacity tokens and is refilled with
+    rate tokens per second
+
+    USAGE:
+            bucket = TokenBucket(rate=2.0, capacity=2)
+            bucket.acquire()
+
+    """
+    def __init__(self, rate, capacity=None):
+
+        if rate <= 0:
+            raise ValueError("'rate' must be a positive number")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.last_refill = monotonic()
+
+        self._lock = threading.Lock()
+
+    def __refill(self, now):
+        """ adds the tokens of the elapsed time
+
+        :param now: current monotonic timestamp
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def try_acquire(self):
+        """ takes one token if a token is available
+
+        :return: 0 if a token was taken, else seconds until the next token is available
+        """
+        with self._lock:
+            self.__refill(now=monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, timeout=None):
+        """ takes one token, blocks until a token is available
+
+        :param timeout: seconds to wait at most, None for no limit
+        :return: seconds waited for the token
+        """
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if delay == 0:
+                return waited
+            if timeout is not None and waited + delay > timeout:
+                raise ProviderQueueTimeoutError("No request token within {:.2f}s".format(max(timeout, 0)))
+            sleep(delay)
+            waited += delay
+
+
+class AIMDController:
+    """ class AIMDController to adapt the concurrency limit of a host to its health
+
+    Every healthy response raises the limit by increase / limit, so the limit grows by about increase per round
+    trip. A timeout, a 429 or a 5xx response multiplies the limit by decrease. Failures of requests which were
+    started before the last decrease do not decrease the limit again.
+
+    USAGE:
+            controller = AIMDController(initial=4, min_limit=1, max_limit=16, latency_target=5.0)
+            controller.on_response(latency=0.3, ok=True, started=start)
+
+    """
+    def __init__(self, initial=4, min_limit=1, max_limit=16, increase=1.0, decrease=0.5, latency_target=None):
+
+        if not min_limit <= initial <= max_limit:
+            raise ValueError("'initial' must be between 'min_limit' and 'max_limit'")
+
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+
+        # responses slower than the target neither raise nor lower the limit, None accepts every latency
+        self.latency_target = latency_target
+
+        self.last_decrease = None
+
+    def on_response(self, latency, ok, started):
+        """ adapts the limit to the result of one request
+
+        :param latency: response time in seconds
+        :param ok: False for timeouts, 429 and 5xx responses
+        :param started: monotonic timestamp of the request start
+        :return: True if the limit was changed
+        """
+        if not ok:
+            if self.last_decrease is not None and started < self.last_decrease:
+                return False
+            self.limit = max(self.min_limit, self.limit * self.decrease)
+            self.last_decrease = monotonic()
+            return True
+
+        if self.latency_target is not None and latency > self.latency_target:
+            return False
+
+        if self.limit < self.max_limit:
+            self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+            return True
+        return False
+
+    @property
+    def in_flight_limit(self):
+        """ current number of allowed in-flight requests
+
+        :return: int
+        """
+        return int(self.limit)
+
+
+class HostLimiter:
+    """ class HostLimiter to limit the in-flight requests and the request rate to one host
+
+    All provider sessions share one limiter per host from the registry, the limits are taken from the first
+    provider class which requests the limiter of a host. The in-flight limit adapts between min_in_flight and
+    max_in_flight to the measured responses of the host.
+
+    USAGE:
+            limiter = HostLimiter.for_host('www.netzclub.net', max_in_flight=16, requests_per_second=2.0)
+            with limiter.limit():
+                started = monotonic()
+                resp = session.get(url)
+            limiter.record(latency=monotonic() - started, ok=resp.ok, started=started)
+
+    """
+    _registry = dict()
+    _registry_lock = threading.Lock()
+
+    def __init__(self, host, max_in_flight=16, requests_per_second=None, min_in_flight=1, initial_in_flight=4,
+                 latency_target=None):
+        self.logger = logging.getLogger('ExpiryService')
+        self.logger.info('Create class HostLimiter for host {}'.format(host))
+
+        if min_in_flight < 1:
+            raise ValueError("'min_in_flight' must be a positive number")
+
+        self.host = host
+        self.requests_per_second = requests_per_second
+
+        self.controller = AIMDController(initial=min(max(initial_in_flight, min_in_flight), max_in_flight),
+                                         min_limit=min_in_flight, max_limit=max_in_flight,
+                                         latency_target=latency_target)
+        self._cv = threading.Condition(threading.Lock())
+        self._bucket = TokenBucket(rate=requests_per_second) if requests_per_second else None
+
+        self._stats = {'requests': 0, 'in_flight': 0, 'failures': 0, 'wait_total': 0.0, 'wait_max': 0.0}
+
+    @classmethod
+    def for_host(cls, host, **limits):
+        """ get the shared limiter of the host, creates it on the first request
+
+        :param host: host name
+        :param limits: keyword arguments of the constructor, used if the limiter is created
+        :return: HostLimiter
+        """
+        with cls._registry_lock:
+            limiter = cls._registry.get(host)
+            if limiter is None:
+                limiter = cls._registry[host] = cls(host=host, **limits)
+            return limiter
+
+    @classmethod
+    def get_all_stats(cls):
+        """ get the stats of all registered hosts
+
+        :return: dict with host as key and the stats dict as value
+        """
+        with cls._registry_lock:
+            limiters = list(cls._registry.values())
+        return {limiter.host: limiter.get_stats() for limiter in limiters}
+
+    @classmethod
+    def clear(cls):
+        """ removes all limiters from the registry
+
+        """
+        with cls._registry_lock:
+            cls._registry.clear()
+
+    @contextmanager
+    def limit(self, timeout=None):
+        """ waits for a free request slot and a rate token and holds the slot until the block is left
+
+        :param timeout: seconds to wait at most for the slot and the token, None for no limit
+        """
+        start = monotonic()
+        deadline = start + timeout if timeout is not None else None
+        with self._cv:
+            while self._stats['in_flight'] >= self.controller.in_flight_limit:
+                if deadline is None:
+                    self._cv.wait()
+                    continue
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    raise ProviderQueueTimeoutError("No free request slot for {} within {:.2f}s"
+                                                    .format(self.host, max(timeout, 0)))
+                self._cv.wait(timeout=remaining)
+            self._stats['in_flight'] += 1
+        try:
+            if self._bucket is not None:
+                self._bucket.acquire(timeout=deadline - monotonic() if deadline is not None else None)
+            wait = monotonic() - start
+
+            with self._cv:
+                self._stats['requests'] += 1
+                self._stats['wait_total'] += wait
+                self._stats['wait_max'] = max(self._stats['wait_max'], wait)
+
+            if wait > 1:
+                self.logger.debug("Request to {} waited {:.2f}s in the queue".format(self.host, wait))
+            yield
+        finally:
+            with self._cv:
+                self._stats['in_flight'] -= 1
+                self._cv.notify()
+
+    def record(self, latency, ok, started):
+        """ feeds the result of a request into the adaptive in-flight limit
+
+        :param latency: response time in seconds
+        :param ok: False for timeouts, 429 and 5xx responses
+        :param started: monotonic timestamp of the request start
+        """
+        with self._cv:
+            if not ok:
+                self._stats['failures'] += 1
+            if self.controller.on_response(latency=latency, ok=ok, started=started):
+                if not ok:
+                    self.logger.info("Lower the in-flight limit of {} to {}"
+                                     .format(self.host, self.controller.in_flight_limit))
+                self._cv.notify_all()
+
+    def get_stats(self):
+        """ get the request and queue wait stats of the host
+
+        :return: dict with requests, in_flight, failures, limit, wait_total, wait_max and wait_avg
+        """
+        with self._cv:
+            stats = dict(self._stats)
+            stats['limit'] = self.controller.in_flight_limit
+        stats['wait_avg'] = stats['wait_total'] / stats['requests'] if stats['requests'] else 0.0
+        return stats
+
+
+class AsyncHostLimiter(HostLimiter):
+    """ class AsyncHostLimiter to limit the in-flight requests and the request rate to one host on an event loop
+
+    The limits, the adaptive in-flight limit and the stats work like those of the HostLimiter, but a waiting
+    request yields to the event loop instead of blocking the thread. The async limiters have their own registry,
+    the AIMD state of a host is kept across the event loops of the check cycles.
+
+    USAGE:
+            limiter = AsyncHostLimiter.for_host('www.netzclub.net', max_in_flight=16, requests_per_second=2.0)
+            async with limiter.limit():
+                started = monotonic()
+                resp = await session.get(url)
+            limiter.record(latency=monotonic() - started, ok=resp.status < 500, started=started)
+
+    """
+    _registry = dict()
+    _registry_lock = threading.Lock()
+
+    def __init__(self, host, **limits):
+        super().__init__(host=host, **limits)
+
+        # set whenever a slot is released or the limit changes, bound to the event loop of the current cycle
+        self._loop = None
+        self._changed = None
+
+    def __get_changed_event(self):
+        """ get the change event of the running event loop
+
+        :return: asyncio.Event
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._changed = asyncio.Event()
+        return self._changed
+
+    def __try_enter(self):
+        """ takes a request slot if the in-flight limit allows it
+
+        :return: True if the slot was taken
+        """
+        with self._cv:
+            if self._stats['in_flight'] >= self.controller.in_flight_limit:
+                return False
+            self._stats['in_flight'] += 1
+            return True
+
+    @asynccontextmanager
+    async def limit(self):
+        """ waits for a free request slot and a rate token and holds the slot until the block is left
+
+        """
+        start = monotonic()
+        changed = self.__get_changed_event()
+        while not self.__try_enter():
+            changed.clear()
+            await changed.wait()
+        try:
+            if self._bucket is not None:
+                delay = self._bucket.try_acquire()
+                while delay > 0:
+                    await asyncio.sleep(delay)
+                    delay = self._bucket.try_acquire()
+            wait = monotonic() - start
+
+            with self._cv:
+                self._stats['requests'] += 1
+                self._stats['wait_total'] += wait
+                self._stats['wait_max'] = max(self._stats['wait_max'], wait)
+
+            if wait > 1:
+                self.logger.debug("Request to {} waited {:.2f}s in the queue".format(self.host, wait))
+            yield
+        finally:
+            with self._cv:
+                self._stats['in_flight'] -= 1
+            changed.set()
+
+    def record(self, latency, ok, started):
+        """ feeds the result of a request into the adaptive in-flight limit
+
+        :param latency: response time in seconds
+        :param ok: False for timeouts, 429 and 5xx responses
+        :param started: monotonic timestamp of the request start
+        """
+        super().record(latency=latency, ok=ok, started=started)
+        if self._changed is not None:
+            self._changed.set()
@@ -1,6 +1,7 @@
 import logging
-from bs4 import BeautifulSoup
+from ExpiryService.consumption import Consumption
 from ExpiryService.providers import Provider
+from ExpiryService.providers.parser import PageParser, ContainerStrainer
 
 
 class Netzclub(Provider):
@@ -11,28 +12,43 @@ class Netzclub(Provider):
             netzclub.login(username, password)
 
     """
-    def __init__(self):
+    netzclub_headers = {
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9",
+        "Accept-Language": "de-DE,de;q=0.9,en-US;q=0.8,en;q=0.7",
+        "Accept-Encoding": "gzip, deflate, br",
+        "Referer": "https://www.netzclub.net/login/",
+        "Connection": "keep-alive",
+        "Origin": "https://www.netzclub.net/",
+        "Content-Type": "application/x-www-form-urlencoded",
+    }
+
+    # containers of the pages which hold the data, the rest of the pages is not parsed
+    login_containers = ContainerStrainer(names=('input',))
+    consumption_containers = ContainerStrainer(classes=('c-button__balance', 'c-user-info', 'c-value-box__amount',
+                                                        'c-value-box__text', 'c-value-box__footnote'))
+    data_usage_containers = ContainerStrainer(ids=('datenverbrauchsuebersicht',))
+
+    # fragments which carry the data of the selfcare and billing page, the endpoints are not known yet
+    fragment_urls = dict()
+
+    def __init__(self, url="https://www.netzclub.net/"):
         self.logger = logging.getLogger('ExpiryService')
         self.logger.info('create class Netzclub')
 
         # init base class
         super().__init__()
 
-        self.netzclub_login = "https://www.netzclub.net/login/"
-        self.netzclub_home = "https://www.netzclub.net/selfcare/"
-        self.csrf_token, self.sid, self.reload_token = self.__get_login_tokens()
+        self.netzclub_login = url + "login/"
+        self.netzclub_home = url + "selfcare/"
+        self.netzclub_billing = url + "meine-abrechnung/"
+        self.login_url = self.netzclub_login
 
-        self.session.headers.update({
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9",
-            "Accept-Language": "de-DE,de;q=0.9,en-US;q=0.8,en;q=0.7",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Referer": "https://www.netzclub.net/login/",
-            "Connection": "keep-alive",
-            "Origin": "https://www.netzclub.net/",
-            "Content-Type": "application/x-www-form-urlencoded",
-        })
+        # the login tokens are fetched on demand by login() and consumed by the login form
+        self.csrf_token, self.sid, self.reload_token = None, None, None
 
-        self.netzclub_data = dict()
+        self.session.headers.update(self.netzclub_headers)
+
+        self.netzclub_data = None
 
     def __str__(self):
         """ string representation
@@ -49,7 +65,17 @@ class Netzclub(Provider):
         self.logger.info("Get csrf token from Netzclub web page")
 
         token_resp = self.session.get(self.netzclub_login)
-        bs = BeautifulSoup(token_resp.text, 'html.parser')
+
+        return self.parse_page(self.parse_login_tokens, token_resp)
+
+    @staticmethod
+    def parse_login_tokens(html):
+        """ parses the csrf token, sid and reload token from the login page
+
+        :param html: html string of the login page
+        :return: csrf token, sid, reload token
+        """
+        bs = PageParser.parse(html, parse_only=Netzclub.login_containers)
         csrf_token = bs.find('input', type="hidden", attrs={'name': 'csrfToken'}).get('value')
         sid = bs.find('input', type="hidden", attrs={'name': 'sid'}).get('value')
         reload_token = bs.find('input', type="hidden", attrs={'name': '__reload_token_loginForm__'}).get('value')
@@ -63,6 +89,8 @@ class Netzclub(Provider):
         :param password: password
         :return: True if login was successful else False
         """
+        if self.reload_token is None:
+            self.csrf_token, self.sid, self.reload_token = self.__get_login_tokens()
 
         login_form = {
             '__hidden_loginForm': 'exists',
@@ -77,6 +105,9 @@ class Netzclub(Provider):
 
         login_resp = self.session.post(url=self.netzclub_login, data=login_form, allow_redirects=True)
 
+        # the reload token is only valid for one form submission
+        self.csrf_token, self.sid, self.reload_token = None, None, None
+
         if login_resp.status_code == 200:
             self.logger.info("Login to Netzclub was successful")
             return True
@@ -87,11 +118,19 @@ class Netzclub(Provider):
     def current_consumption(self):
         """ get current consumption from Netzclub web page
 
-        :return: consumption dict
+        :return: Consumption record
         """
-        netzclub_home = self.session.get(url="https://www.netzclub.net/selfcare/")
+        self.netzclub_data = self.fetch_data(kind='consumption', url=self.netzclub_home, parse=self.parse_consumption)
+        return self.netzclub_data
 
-        soup = BeautifulSoup(netzclub_home.text, 'html.parser')
+    @staticmethod
+    def parse_consumption(html):
+        """ parses the current consumption from the Netzclub selfcare page
+
+        :param html: html string of the selfcare page
+        :return: Consumption record
+        """
+        soup = PageParser.parse(html, parse_only=Netzclub.consumption_containers)
 
         credit_balance = soup.find("span", {"class": "c-button__balance"}).text
 
@@ -111,24 +150,24 @@ class Netzclub(Provider):
         end_date = soup.find("small", {"class": "c-value-box__footnote"}).text
         end_date = end_date.strip().replace('\n', '')
 
-        self.netzclub_data.update({
-            'name': name,
-            'number': number,
-            'creditbalance': credit_balance,
-            'remaining_volume': remaining_data,
-            'total_volume': total_data,
-            'end_date': end_date
-        })
-        return self.netzclub_data
+        return Consumption(name=name, number=number, creditbalance=credit_balance, remaining_volume=remaining_data,
+                           total_volume=total_data, end_date=end_date)
 
     def data_usage_overview(self):
         """ parses the data usage overview from the netzclub webpage
 
         :return: table dict
         """
-        netzclub_home = self.session.get(url="https://www.netzclub.net/meine-abrechnung/")
+        return self.fetch_data(kind='data_usage', url=self.netzclub_billing, parse=self.parse_data_usage)
 
-        soup = BeautifulSoup(netzclub_home.text, 'html.parser')
+    @staticmethod
+    def parse_data_usage(html):
+        """ parses the data usage table from the Netzclub billing page
+
+        :param html: html string of the billing page
+        :return: table dict
+        """
+        soup = PageParser.parse(html, parse_only=Netzclub.data_usage_containers)
 
         data_usage = soup.find("div", {"id": "datenverbrauchsuebersicht"})
 
@@ -0,0 +1,94 @@
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from ExpiryService.providers.parser import PageParser
+
+
+def _init_worker(backend, targeted):
+    """ applies the parser settings of the main process in a new worker process
+
+    """
+    PageParser.backend = backend
+    PageParser.targeted = targeted
+
+
+def _parse_in_worker(parse, content, encoding):
+    """ decodes the response body and runs the parse method in the worker process
+
+    :param parse: static parse method of a provider
+    :param content: response body as bytes
+    :param encoding: encoding of the response, None lets the parser detect it
+    :return: the parsed data
+    """
+    html = content.decode(encoding, errors='replace') if encoding else content
+    return parse(html)
+
+
+class ParsePool:
+    """ class ParsePool to run the static parse methods of the providers in worker processes
+
+    The fetch threads only send the raw response body to the pool and get the small parsed dicts back, so the
+    parsing is not serialized on the GIL. Without a started pool the pages are parsed in the calling thread.
+
+    USAGE:
+            ParsePool.start(processes=4)
+            consumption = ParsePool.parse(AldiTalk.parse_consumption, resp.content, resp.encoding)
+            ParsePool.shutdown()
+
+    """
+    _executor = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def start(cls, processes=None):
+        """ starts the worker processes, the parser settings are taken over from the main process
+
+        :param processes: number of worker processes, None for the number of cpus
+        """
+        with cls._lock:
+            if cls._executor is not None:
+                return
+
+            logging.getLogger('ExpiryService').info("Start parse pool with {} processes"
+                                                    .format(processes or multiprocessing.cpu_count()))
+
+            # spawned workers do not inherit the locks of the threads which are running in the main process
+            cls._executor = ProcessPoolExecutor(max_workers=processes,
+                                                mp_context=multiprocessing.get_context('spawn'),
+                                                initializer=_init_worker,
+                                                initargs=(PageParser.backend, PageParser.targeted))
+
+    @classmethod
+    def shutdown(cls, wait=True):
+        """ stops the worker processes
+
+        :param wait: wait for the running parse calls
+        """
+        with cls._lock:
+            executor, cls._executor = cls._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    @classmethod
+    def is_running(cls):
+        """ checks if the worker processes are started
+
+        :return: True if the pool is started
+        """
+        return cls._executor is not None
+
+    @classmethod
+    def parse(cls, parse, content, encoding=None):
+        """ parses the response body with the given static parse method in a worker process
+
+        :param parse: static parse method of a provider, it must be importable by its qualified name
+        :param content: response body as bytes
+        :param encoding: encoding of the response, None lets the parser detect it
+        :return: the parsed data
+        """
+        executor = cls._executor
+        if executor is None:
+            return _parse_in_worker(parse=parse, content=content, encoding=encoding)
+        return executor.submit(_parse_in_worker, parse, content, encoding).result()
@@ -0,0 +1,114 @@
+import logging
+from bs4 import BeautifulSoup, SoupStrainer
+try:
+    import lxml
+    is_lxml_importable = True
+except ImportError:
+    is_lxml_importable = False
+
+
+class ContainerStrainer(SoupStrainer):
+    """ class ContainerStrainer to build only the containers of a page which hold the provider data
+
+    A top level element is kept with its whole subtree if its tag name, its id or one of its classes is listed,
+    everything else of the page is skipped while parsing.
+
+    USAGE:
+            strainer = ContainerStrainer(ids=('datenverbrauchsuebersicht',), classes=('table',))
+            soup = BeautifulSoup(html, 'html.parser', parse_only=strainer)
+
+    """
+    def __init__(self, ids=(), classes=(), names=()):
+
+        # init base class
+        super().__init__()
+
+        self.ids = frozenset(ids)
+        self.classes = frozenset(classes)
+        self.names = frozenset(names)
+
+    def is_container(self, name, attrs):
+        """ checks if the element is one of the containers
+
+        :param name: tag name
+        :param attrs: dict with the attributes of the tag
+        :return: True if the element and its subtree are parsed
+        """
+        if name in self.names:
+            return True
+        if not attrs:
+            return False
+        if attrs.get('id') in self.ids:
+            return True
+
+        classes = attrs.get('class')
+        if isinstance(classes, str):
+            classes = classes.split()
+        return bool(classes) and not self.classes.isdisjoint(classes)
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        """ filter hook of beautifulsoup4 >= 4.13
+
+        """
+        return self.is_container(name=name, attrs=attrs)
+
+    def allow_string_creation(self, string):
+        """ filter hook of beautifulsoup4 >= 4.13, strings outside of the containers are skipped
+
+        """
+        return False
+
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        """ filter hook of beautifulsoup4 < 4.13
+
+        """
+        if self.is_container(name=markup_name, attrs=markup_attrs):
+            return markup_name
+        return None
+
+
+class PageParser:
+    """ class PageParser to parse the provider pages with the configured BeautifulSoup backend
+
+    The backend is 'lxml' if it is installed, else the pure python 'html.parser'. With targeted parsing only the
+    containers given by the provider are built, the rest of the page is skipped.
+
+    USAGE:
+            PageParser.set_backend(backend='html.parser', targeted=True)
+            soup = PageParser.parse(html, parse_only=ContainerStrainer(ids=('datenverbrauchsuebersicht',)))
+
+    """
+    backends = ('html.parser', 'lxml')
+
+    backend = 'lxml' if is_lxml_importable else 'html.parser'
+    targeted = True
+
+    @classmethod
+    def set_backend(cls, backend=None, targeted=None):
+        """ sets the parser backend for all providers
+
+        :param backend: 'html.parser' or 'lxml', None keeps the current backend
+        :param targeted: parse only the containers of the pages, None keeps the current setting
+        """
+        if backend is not None:
+            if backend not in cls.backends:
+                raise ValueError("Unknown parser backend {}".format(backend))
+            if backend == 'lxml' and not is_lxml_importable:
+                raise ImportError("lxml is required for the lxml parser backend")
+            cls.backend = backend
+
+        if targeted is not None:
+            cls.targeted = targeted
+
+        logging.getLogger('ExpiryService').info("Parse provider pages with {}{}"
+                                                .format(cls.backend, ' (targeted)' if cls.targeted else ''))
+
+    @classmethod
+    def parse(cls, html, parse_only=None):
+        """ parses the html page
+
+        :param html: html string
+        :param parse_only: strainer with the containers of the page, used if targeted parsing is enabled
+        :return: BeautifulSoup
+        """
+        return BeautifulSoup(html, cls.backend, parse_only=parse_only if cls.targeted else None)
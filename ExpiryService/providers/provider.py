@@ -1,21 +1,141 @@
 import logging
-import requests
+from time import monotonic
+from urllib.parse import urljoin
 from abc import ABC, abstractmethod
 
+from ExpiryService.exceptions import ProviderSessionError, ProviderTimeoutError, ProviderUnavailableError
+from ExpiryService.providers.session import ProviderSession
+from ExpiryService.providers.retry import RetryPolicy
+from ExpiryService.providers.parsepool import ParsePool
+
 
 class Provider(ABC):
     """ Base class Provider to define methods for specific Mobile Phone Providers
 
     """
+    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                             "Chrome/73.0.3683.75 Safari/537.36"}
+
+    # limits of all requests to the provider host, shared by all sessions of the provider class. The in-flight
+    # limit starts at initial_in_flight and adapts between min_in_flight and max_in_flight to the portal health
+    max_in_flight = 16
+    min_in_flight = 1
+    initial_in_flight = 4
+    requests_per_second = 2.0
+    latency_target = 5.0
+
+    # seconds to establish a connection and to wait for data of every request
+    connect_timeout = 5
+    read_timeout = 20
+
+    # retries of failed page loads, the login form is never sent twice
+    retry = RetryPolicy(retries=2, backoff=0.5, max_backoff=8.0)
+
+    # urls of the page fragments which carry the data of a full page, relative to the page url. A kind maps to a
+    # list of fragments whose contents are parsed together, a kind without fragments loads the full page
+    fragment_urls = dict()
+
+    # seconds a failed fragment is not requested again, the full page is loaded instead
+    fragment_retry = 3600
+
+    # monotonic timestamp of the last failure per provider class and kind
+    _fragment_failures = dict()
+
+    # compiled bytes pattern of the login form, a page with the login form means the session has expired
+    login_form = None
+
     def __init__(self):
         self.logger = logging.getLogger('ExpiryService')
         self.logger.info('create class Provider')
 
-        self.session = requests.Session()
-        self.headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
-                                      "Chrome/73.0.3683.75 Safari/537.36"}
+        self.session = ProviderSession(max_in_flight=self.max_in_flight, requests_per_second=self.requests_per_second,
+                                       min_in_flight=self.min_in_flight, initial_in_flight=self.initial_in_flight,
+                                       latency_target=self.latency_target,
+                                       timeout=(self.connect_timeout, self.read_timeout), retry=self.retry)
         self.session.headers.update(self.headers)
 
+        # url of the login page, a redirect to this url means the session has expired
+        self.login_url = None
+
+    def set_deadline(self, deadline):
+        """ sets the deadline of all following requests, a request after the deadline raises ProviderTimeoutError
+
+        :param deadline: monotonic timestamp, None removes the deadline
+        """
+        self.session.deadline = deadline
+
+    def get_page(self, url):
+        """ requests a page which needs a logged in session
+
+        :param url: url string
+        :return: response object
+        """
+        resp = self.session.get(url=url)
+
+        if resp.history and self.login_url is not None and resp.url.split('?')[0] == self.login_url:
+            raise ProviderSessionError("Session of provider {} has expired".format(self))
+        if self.is_login_page(content=resp.content):
+            raise ProviderSessionError("Session of provider {} has expired, the login form was served".format(self))
+
+        return resp
+
+    @classmethod
+    def is_login_page(cls, content):
+        """ checks if the page contains the login form
+
+        :param content: page as bytes
+        :return: True if the login form was served instead of the page
+        """
+        return cls.login_form is not None and cls.login_form.search(content) is not None
+
+    @staticmethod
+    def parse_page(parse, resp):
+        """ parses the response with the static parse method, in the parse pool if it is started
+
+        :param parse: static parse method of the provider
+        :param resp: response object or list of response objects which are parsed as one page
+        :return: the parsed data
+        """
+        if isinstance(resp, list):
+            html = ''.join(fragment.text for fragment in resp)
+            if ParsePool.is_running():
+                return ParsePool.parse(parse, html.encode('utf-8'), 'utf-8')
+            return parse(html)
+
+        if ParsePool.is_running():
+            return ParsePool.parse(parse, resp.content, resp.encoding)
+        return parse(resp.text)
+
+    def fetch_data(self, kind, url, parse):
+        """ fetches and parses the data from the page fragments of the kind, falls back to the full page
+
+        :param kind: kind of the data, key of fragment_urls
+        :param url: url of the full page
+        :param parse: static parse method of the full page
+        :return: the parsed data
+        """
+        fragments = self.fragment_urls.get(kind)
+        failure_key = (type(self).__name__, kind)
+        failed_ts = self._fragment_failures.get(failure_key)
+
+        if fragments and (failed_ts is None or monotonic() - failed_ts > self.fragment_retry):
+            try:
+                responses = list()
+                for fragment in fragments:
+                    resp = self.get_page(url=urljoin(url, fragment))
+                    resp.raise_for_status()
+                    responses.append(resp)
+                return self.parse_page(parse, responses)
+            except (ProviderTimeoutError, ProviderSessionError, ProviderUnavailableError):
+                # an expired session, the deadline or an unavailable portal is no failure of the fragments
+                raise
+            except Exception as ex:
+                self.logger.info("Could not load the {} fragments of {}, load the full page: {}".format(kind, self,
+                                                                                                       ex))
+                self._fragment_failures[failure_key] = monotonic()
+
+        return self.parse_page(parse, self.get_page(url=url))
+
     @abstractmethod
     def login(self, username, password):
         """ login method for the provider web page
@@ -28,7 +148,7 @@ class Provider(ABC):
     def current_consumption(self):
         """ get current consumption from provider web page
 
-        :return: consumption data dict
+        :return: Consumption record
         """
         pass
 
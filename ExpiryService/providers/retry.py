@@ -0,0 +1,42 @@
+import random
+
+
+class RetryPolicy:
+    """ class RetryPolicy to retry idempotent requests with jittered exponential backoff
+
+    The delay before retry n is drawn uniformly between 0 and min(max_backoff, backoff * 2 ** n), so retries of
+    many accounts do not hit a recovering portal at the same time.
+
+    USAGE:
+            retry = RetryPolicy(retries=2, backoff=0.5, max_backoff=8)
+            if retry.is_retryable(method='GET', attempt=0):
+                sleep(retry.delay(attempt=0))
+
+    """
+    methods = frozenset(('GET', 'HEAD', 'OPTIONS'))
+
+    def __init__(self, retries=2, backoff=0.5, max_backoff=8.0):
+
+        if retries < 0:
+            raise ValueError("'retries' must not be negative")
+
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def is_retryable(self, method, attempt):
+        """ checks if a failed request may be sent again
+
+        :param method: http method
+        :param attempt: number of the failed attempt, starting at 0
+        :return: True if the request may be retried
+        """
+        return method.upper() in self.methods and attempt < self.retries
+
+    def delay(self, attempt):
+        """ get the backoff delay before the next attempt
+
+        :param attempt: number of the failed attempt, starting at 0
+        :return: delay in seconds
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
@@ -0,0 +1,179 @@
+import logging
+import requests
+from time import monotonic, sleep
+from urllib.parse import urlsplit
+from requests.cookies import create_cookie
+
+from ExpiryService.exceptions import ProviderTimeoutError, ProviderUnavailableError
+from ExpiryService.providers.limiter import HostLimiter
+from ExpiryService.providers.retry import RetryPolicy
+from ExpiryService.providers.transport import ConnectionPools
+
+
+class ProviderSession(requests.Session):
+    """ class ProviderSession to send all requests of a provider through the limiter of the target host
+
+    The response time and status of every request are fed back into the limiter, which adapts the in-flight limit
+    of the host. Every request gets the connect and read timeout, both are shortened to the time left until the
+    deadline of the session, a deadline which ends in the queue of the limiter raises ProviderQueueTimeoutError.
+    Idempotent requests which time out, fail to connect or get a 429 or 5xx response are retried with the backoff
+    of the retry policy as long as the deadline allows it, a 429 or 5xx response which is not retried raises
+    ProviderUnavailableError. The connections are taken from the pool of the host which is shared with the
+    sessions of all other accounts, the cookies are not.
+
+    USAGE:
+            session = ProviderSession(max_in_flight=16, requests_per_second=2.0, timeout=(5, 20))
+            session.deadline = monotonic() + 60
+            session.get(url)
+
+    """
+    def __init__(self, max_in_flight=16, requests_per_second=None, min_in_flight=1, initial_in_flight=4,
+                 latency_target=None, timeout=(5, 20), retry=None):
+        self.logger = logging.getLogger('ExpiryService')
+
+        # init base class
+        super().__init__()
+
+        self.limits = dict(max_in_flight=max_in_flight, requests_per_second=requests_per_second,
+                           min_in_flight=min_in_flight, initial_in_flight=initial_in_flight,
+                           latency_target=latency_target)
+
+        # connect and read timeout of every request
+        self.timeout = timeout
+
+        # monotonic deadline of all following requests, None for no deadline
+        self.deadline = None
+
+        self.retry = retry if retry is not None else RetryPolicy(retries=0)
+
+    def dump_cookies(self):
+        """ get the cookies of the session in a serializable form
+
+        :return: list of cookie dicts
+        """
+        return [{'name': cookie.name, 'value': cookie.value, 'domain': cookie.domain, 'path': cookie.path,
+                 'expires': cookie.expires, 'secure': cookie.secure,
+                 'rest': {'HttpOnly': None} if cookie.has_nonstandard_attr('HttpOnly') else {}}
+                for cookie in self.cookies]
+
+    def load_cookies(self, cookies):
+        """ sets the dumped cookies on the session, expired cookies are dropped
+
+        :param cookies: list of cookie dicts
+        """
+        for cookie in cookies:
+            self.cookies.set_cookie(create_cookie(**cookie))
+        self.cookies.clear_expired_cookies()
+
+    def get_adapter(self, url):
+        """ get the shared connection pool of the url host
+
+        :param url: url string
+        :return: HostAdapter
+        """
+        if urlsplit(url).scheme.lower() not in ('http', 'https'):
+            return super().get_adapter(url)
+        return ConnectionPools.get_adapter(url=url, pool_maxsize=self.limits['max_in_flight'])
+
+    def get_limiter(self, url):
+        """ get the shared limiter of the url host
+
+        :param url: url string
+        :return: HostLimiter
+        """
+        return HostLimiter.for_host(host=urlsplit(url).netloc, **self.limits)
+
+    @staticmethod
+    def is_healthy(resp):
+        """ checks if the response shows a healthy portal
+
+        :param resp: response object
+        :return: False for 429 and 5xx responses
+        """
+        return resp.status_code != 429 and resp.status_code < 500
+
+    def get_timeout(self, timeout=None):
+        """ get the request timeout, limited by the time left until the deadline
+
+        :param timeout: timeout of the request, None for the session timeout
+        :return: timeout in seconds or tuple of connect and read timeout
+        """
+        if timeout is None:
+            timeout = self.timeout
+        if self.deadline is None:
+            return timeout
+
+        remaining = self.deadline - monotonic()
+        if remaining <= 0:
+            raise ProviderTimeoutError("Deadline exceeded before the request")
+
+        if isinstance(timeout, tuple):
+            return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def __wait_for_retry(self, method, url, attempt):
+        """ waits the backoff delay if the failed request may be retried within the deadline
+
+        :param method: http method
+        :param url: url string
+        :param attempt: number of the failed attempt, starting at 0
+        :return: True if the request should be sent again
+        """
+        if not self.retry.is_retryable(method=method, attempt=attempt):
+            return False
+
+        delay = self.retry.delay(attempt=attempt)
+        if self.deadline is not None and monotonic() + delay >= self.deadline:
+            return False
+
+        self.logger.debug("Retry request to {} in {:.2f}s".format(url, delay))
+        sleep(delay)
+        return True
+
+    def __send(self, method, url, *args, **kwargs):
+        """ sends the request once the host limiter grants a slot, redirects are followed within the same slot
+
+        :param method: http method
+        :param url: url string
+        :return: response object
+        """
+        limiter = self.get_limiter(url=url)
+
+        # the wait for a slot and a rate token ends at the deadline, too
+        queue_timeout = self.deadline - monotonic() if self.deadline is not None else None
+        with limiter.limit(timeout=queue_timeout):
+            kwargs['timeout'] = self.get_timeout(timeout=kwargs.get('timeout'))
+
+            started = monotonic()
+            try:
+                resp = super().request(method, url, *args, **kwargs)
+            except requests.Timeout as ex:
+                limiter.record(latency=monotonic() - started, ok=False, started=started)
+                raise ProviderTimeoutError("Request to {} timed out: {}".format(url, ex)) from ex
+            except requests.ConnectionError:
+                limiter.record(latency=monotonic() - started, ok=False, started=started)
+                raise
+
+            limiter.record(latency=monotonic() - started, ok=self.is_healthy(resp=resp), started=started)
+            return resp
+
+    def request(self, method, url, *args, **kwargs):
+        """ sends the request through the host limiter and retries it after transient failures
+
+        :param method: http method
+        :param url: url string
+        :return: response object
+        """
+        attempt = 0
+        while True:
+            try:
+                resp = self.__send(method, url, *args, **kwargs)
+            except (ProviderTimeoutError, requests.ConnectionError):
+                if not self.__wait_for_retry(method=method, url=url, attempt=attempt):
+                    raise
+            else:
+                if self.is_healthy(resp=resp):
+                    return resp
+                if not self.__wait_for_retry(method=method, url=url, attempt=attempt):
+                    raise ProviderUnavailableError("Request to {} failed with status {}".format(url, resp.status_code))
+            attempt += 1
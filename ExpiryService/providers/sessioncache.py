@@ -0,0 +1,115 @@
+import logging
+import threading
+from time import monotonic
+from collections import OrderedDict
+
+
+class ProviderSessionCache:
+    """ class ProviderSessionCache to keep logged in provider instances alive across check cycles
+
+    The instances are keyed by (provider, username) and evicted when the cache exceeds maxsize (least recently
+    used first) or when an instance was not used for ttl seconds.
+
+    USAGE:
+            cache = ProviderSessionCache(maxsize=1000, ttl=3600)
+            cache.put(provider='alditalk', username=username, password=password, instance=alditalk)
+            alditalk = cache.get(provider='alditalk', username=username, password=password)
+
+    """
+    def __init__(self, maxsize=1000, ttl=3600):
+        self.logger = logging.getLogger('ExpiryService')
+        self.logger.info('Create class ProviderSessionCache')
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        """ number of cached provider instances
+
+        :return: int
+        """
+        return len(self._entries)
+
+    def get(self, provider, username, password):
+        """ get the logged in provider instance for the given account
+
+        :param provider: provider name
+        :param username: username
+        :param password: password, a changed password invalidates the cached instance
+        :return: provider instance or None
+        """
+        key = (provider, username)
+        now = monotonic()
+
+        with self._lock:
+            self.__evict_idle(now=now)
+
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            instance, cached_password, _ = entry
+            if cached_password != password:
+                del self._entries[key]
+                return None
+
+            self._entries[key] = (instance, cached_password, now)
+            self._entries.move_to_end(key)
+            return instance
+
+    def put(self, provider, username, password, instance):
+        """ puts a logged in provider instance into the cache
+
+        :param provider: provider name
+        :param username: username
+        :param password: password used for the login
+        :param instance: logged in provider instance
+        """
+        key = (provider, username)
+
+        with self._lock:
+            self._entries[key] = (instance, password, monotonic())
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self.logger.debug("Evict provider session {}".format(evicted_key))
+
+    def items(self):
+        """ get all cached provider instances
+
+        :return: list of (provider, username, instance) tuples
+        """
+        with self._lock:
+            return [(provider, username, instance) for (provider, username), (instance, _, _) in self._entries.items()]
+
+    def invalidate(self, provider, username):
+        """ removes the provider instance of the given account
+
+        :param provider: provider name
+        :param username: username
+        """
+        with self._lock:
+            self._entries.pop((provider, username), None)
+
+    def clear(self):
+        """ removes all cached provider instances
+
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __evict_idle(self, now):
+        """ removes all entries which were not used within the ttl, the oldest entries are at the front
+
+        :param now: current monotonic timestamp
+        """
+        while self._entries:
+            key, (_, _, last_used) = next(iter(self._entries.items()))
+            if now - last_used <= self.ttl:
+                break
+            del self._entries[key]
+            self.logger.debug("Evict idle provider session {}".format(key))
@@ -0,0 +1,79 @@
+import socket
+import logging
+import threading
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+
+class HostAdapter(HTTPAdapter):
+    """ class HostAdapter to keep the connections to one host open for the sessions of all accounts
+
+    The adapter only holds the connection pool, cookies stay in the jar of every session. Idle connections are
+    kept alive with tcp keepalive probes, so a warm connection survives the pause between two check slots.
+
+    USAGE:
+            adapter = HostAdapter(pool_maxsize=16)
+            session.mount('https://www.netzclub.net', adapter)
+
+    """
+    socket_options = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+
+    def __init__(self, pool_maxsize=16):
+
+        # one adapter serves one host, so the pool manager needs a single pool
+        super().__init__(pool_connections=1, pool_maxsize=pool_maxsize)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        """ creates the pool manager with the keepalive socket options
+
+        """
+        pool_kwargs.setdefault('socket_options', self.socket_options)
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+
+class ConnectionPools:
+    """ class ConnectionPools to share one connection pool per host between all provider sessions
+
+    The pool of a host holds up to max_in_flight connections, the in-flight limit of the host limiter never lets
+    more requests run at the same time. Connections are returned to the pool after every request and reused by
+    the next account of the same provider.
+
+    USAGE:
+            adapter = ConnectionPools.get_adapter('https://www.netzclub.net/selfcare/', pool_maxsize=16)
+            ConnectionPools.clear()
+
+    """
+    _adapters = dict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_adapter(cls, url, pool_maxsize=16):
+        """ get the shared adapter of the url host, creates it on the first request
+
+        :param url: url string
+        :param pool_maxsize: number of connections kept to the host, used if the adapter is created
+        :return: HostAdapter
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme.lower(), parts.netloc.lower())
+
+        with cls._lock:
+            adapter = cls._adapters.get(key)
+            if adapter is None:
+                logging.getLogger('ExpiryService').info("Create connection pool for {}://{} with {} connections"
+                                                        .format(key[0], key[1], pool_maxsize))
+                adapter = cls._adapters[key] = HostAdapter(pool_maxsize=pool_maxsize)
+            return adapter
+
+    @classmethod
+    def clear(cls):
+        """ closes the connections of all hosts and removes the adapters
+
+        """
+        with cls._lock:
+            adapters = list(cls._adapters.values())
+            cls._adapters.clear()
+        for adapter in adapters:
+            adapter.close()
@@ -1,149 +1,346 @@
 import logging
 import heapq
 import functools
+import itertools
 import threading
+from time import monotonic, time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 
 class Scheduler:
-    """ class Scheduler to schedule threaded tasks
+    """ class Scheduler to schedule threaded tasks on a bounded worker pool
+
+    The tasks are kept on a heap ordered by their monotonic deadline, so wall-clock jumps do not affect them.
+    Cancelled and rescheduled tasks leave a stale heap entry behind which is skipped when it reaches the top
+    and removed by a compaction once the stale entries make up half of the heap.
+
+    With a job store, periodic jobs with a job_id persist their next run time and continue their cadence after
+    a restart. Runs missed while the application was down collapse into a single run.
 
     USAGE:
-            scheduler = Scheduler()
+            scheduler = Scheduler(max_workers=4, max_queue=100, jobstore=DBJobStore())
             scheduler.schedule(func, startts, *args)
-            scheduler.periodic(5, test, 'test_message')
+            scheduler.schedule_in(60, func, *args)
+            scheduler.periodic(5, test, 'test_message', job_id='test')
     """
 
-    @functools.total_ordering
     class _Task:
         """A scheduled task"""
 
-        def __init__(self, func, startts, *args):
-            """Create task that will run fn at or after the datetime start."""
+        def __init__(self, scheduler, func, deadline, *args, interval=None, skip_if_running=False, job_id=None,
+                     **kwargs):
+            """Create task that will run fn at or after the monotonic deadline."""
+            self.scheduler = scheduler
             self.func = func
-            self.start = startts
+            self.deadline = deadline
             self.args = args
+            self.kwargs = kwargs
+            self.interval = interval
+            self.skip_if_running = skip_if_running
+            self.job_id = job_id
             self.cancelled = False
-
-        def __le__(self, other):
-            # Tasks compare according to their start time.
-            return self.start <= other.start
+            self.running = False
+            # heap entry [deadline, sequence, task], the task slot is cleared when the entry becomes stale
+            self.entry = None
 
         @property
         def timeout(self):
             """Return time remaining in seconds before task should start."""
-            return (self.start - datetime.now()).total_seconds()
+            return self.deadline - monotonic()
 
         def cancel(self):
             """Cancel task if it has not already started running."""
-            self.cancelled = True
+            self.scheduler.cancel(self)
 
-    def __init__(self):
-        self.logger = logging.getLogger('ComunioScore')
+        def reschedule(self, delay):
+            """Move the task to run delay seconds from now."""
+            self.scheduler.reschedule(self, delay)
+
+    def __init__(self, max_workers=4, max_queue=100, jobstore=None):
+        self.logger = logging.getLogger('ExpiryService')
         self.logger.info('Create class Scheduler')
 
         cv = self._cv = threading.Condition(threading.Lock())
         tasks = self._tasks = []
+        self._sequence = itertools.count()
+        self._stale = 0
+
+        # bounded worker pool, at most max_queue tasks wait for a free worker
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='SchedulerWorker')
+
+        self._stats_lock = threading.Lock()
+        self._stats = {'queued': 0, 'running': 0, 'rejected': 0, 'skipped': 0, 'completed': 0, 'failed': 0}
 
-        self._lock = threading.Lock()
-        self._timer = None
-        self.function = None
-        self.interval = None
-        self.args = None
-        self.kwargs = None
-        self._stopped = True
+        self._periodic_tasks = []
+        self._stopped = False
+
+        # optional store for the next run time of periodic jobs
+        self.jobstore = jobstore
 
         def run():
             while True:
                 with cv:
                     while True:
+                        if self._stopped:
+                            return
                         timeout = None
-                        while tasks and tasks[0].cancelled:
+                        while tasks and tasks[0][2] is None:
                             heapq.heappop(tasks)
+                            self._stale -= 1
                         if tasks:
-                            timeout = tasks[0].timeout
+                            timeout = tasks[0][0] - monotonic()
                             if timeout <= 0:
-                                task = heapq.heappop(tasks)
+                                task = heapq.heappop(tasks)[2]
+                                task.entry = None
+                                if task.interval is not None:
+                                    # periodic tasks keep their cadence independent of the run duration
+                                    now = monotonic()
+                                    task.deadline += task.interval
+                                    while task.deadline <= now:
+                                        task.deadline += task.interval
+                                    self._push_entry(task)
                                 break
 
                         cv.wait(timeout=timeout)
-                # self.logger.info("Starting new task thread")
-                threading.Thread(target=task.func, args=task.args).start()
+                self._dispatch(task)
+                if task.job_id is not None and task.interval is not None:
+                    self._save_job(task)
+
+        # the scheduler thread must not keep the process alive after a shutdown request
+        self._thread = threading.Thread(target=run, name='Scheduler', daemon=True)
+        self._thread.start()
+
+    def _dispatch(self, task):
+        """ submits the task to the worker pool if the queue depth and the skip policy allow it
+
+        :param task: task object
+        """
+        with self._stats_lock:
+            if task.skip_if_running and task.running:
+                self.logger.info("Skip task {}, it is still running".format(task.func))
+                self._stats['skipped'] += 1
+                return
+            if self._stats['queued'] >= self.max_queue:
+                self.logger.error("Reject task {}, the scheduler queue is full".format(task.func))
+                self._stats['rejected'] += 1
+                return
+
+            task.running = True
+            self._stats['queued'] += 1
 
-        threading.Thread(target=run, name='Scheduler').start()
+        self._executor.submit(self._execute, task)
 
-    def schedule(self, func, startts, *args):
+    def _execute(self, task):
+        """ runs the task function in a worker thread
+
+        :param task: task object
+        """
+        with self._stats_lock:
+            self._stats['queued'] -= 1
+            self._stats['running'] += 1
+        result = 'failed'
+        try:
+            task.func(*task.args, **task.kwargs)
+            result = 'completed'
+        except Exception as ex:
+            self.logger.exception("Task {} failed: {}".format(task.func, ex))
+        finally:
+            with self._stats_lock:
+                self._stats['running'] -= 1
+                self._stats[result] += 1
+                task.running = False
+
+    def schedule(self, func, startts, *args, skip_if_running=False, **kwargs):
         """Schedule a task that will run fn at or after start (which must be a datetime object) and return an
         object representing that task.
 
         """
+        delay = (startts - datetime.now()).total_seconds()
+        return self.schedule_in(delay, func, *args, skip_if_running=skip_if_running, **kwargs)
+
+    def schedule_in(self, delay, func, *args, skip_if_running=False, **kwargs):
+        """ schedules a task that will run func after delay seconds
+
+        :param delay: delay in seconds
+        :param func: function handler
+        :param skip_if_running: skip the run if the task is still running
+        :return: task object
+        """
+        task = self._Task(self, functools.partial(func), monotonic() + delay, *args,
+                          skip_if_running=skip_if_running, **kwargs)
+        self._push(task)
+        return task
 
-        task = self._Task(functools.partial(func), startts, *args)
+    def _push(self, task):
+        """ pushes the task on the heap and wakes up the scheduler thread
+
+        :param task: task object
+        """
         with self._cv:
-            heapq.heappush(self._tasks, task)
+            self._push_entry(task)
+            self._cv.notify()
+
+    def _push_entry(self, task):
+        """ pushes a new heap entry for the task, the caller holds the condition lock
+
+        :param task: task object
+        """
+        task.entry = [task.deadline, next(self._sequence), task]
+        heapq.heappush(self._tasks, task.entry)
+
+    def _remove_entry(self, task):
+        """ marks the heap entry of the task as stale and compacts the heap if needed
+
+        :param task: task object
+        """
+        if task.entry is not None:
+            task.entry[2] = None
+            task.entry = None
+            self._stale += 1
+
+            if self._stale > 64 and self._stale * 2 > len(self._tasks):
+                self._tasks[:] = [entry for entry in self._tasks if entry[2] is not None]
+                heapq.heapify(self._tasks)
+                self._stale = 0
+
+    def cancel(self, task):
+        """ cancels the task if it has not already started running
+
+        :param task: task object
+        """
+        with self._cv:
+            task.cancelled = True
+            self._remove_entry(task)
+
+    def reschedule(self, task, delay):
+        """ moves the task to run delay seconds from now
+
+        :param task: task object
+        :param delay: delay in seconds
+        """
+        with self._cv:
+            self._remove_entry(task)
+            task.cancelled = False
+            task.deadline = monotonic() + delay
+            self._push_entry(task)
             self._cv.notify()
-        return task
 
     def get_tasks(self):
         """ get the tasks list
 
         :return: list with all open tasks
         """
-        return self._tasks
+        with self._cv:
+            return [entry[2] for entry in self._tasks if entry[2] is not None]
+
+    def get_stats(self):
+        """ get the counters of the worker pool
+
+        :return: dict with the queued, running, rejected, skipped, completed and failed tasks
+        """
+        with self._stats_lock:
+            return dict(self._stats)
 
     def is_tasks_empty(self):
         """ checks if the tasks list is empty
 
         :return: True if tasks list is empty, else False
         """
-        if len(self._tasks) == 0:
+        if len(self._tasks) - self._stale == 0:
             return True
         else:
             return False
 
-    def periodic(self, interval, function, *args, **kwargs):
-        """ schedules a periodic task
+    def periodic(self, interval, function, *args, skip_if_running=True, job_id=None, misfire_grace_time=None,
+                 **kwargs):
+        """ schedules a periodic task, the first run is after one interval or at the stored next run time
 
-        :param interval: interval
+        :param interval: interval in seconds
         :param function: function handler
+        :param skip_if_running: skip a run while the previous run is still in progress
+        :param job_id: unique job id to persist the next run time in the job store
+        :param misfire_grace_time: seconds a missed run may be late and still run once at startup, None for no limit
         :param args: args
         :param kwargs: kwargs
+        :return: task object
         """
+        delay = self._restore_delay(job_id=job_id, interval=interval, misfire_grace_time=misfire_grace_time)
 
-        self.interval = interval
-        self.function = function
-        self.args = args
-        self.kwargs = kwargs
+        task = self._Task(self, function, monotonic() + delay, *args, interval=interval,
+                          skip_if_running=skip_if_running, job_id=job_id, **kwargs)
+        self._periodic_tasks.append(task)
+        self._push(task)
 
-        # start the periodic task
-        self._start_periodic()
+        if job_id is not None:
+            self._save_job(task)
+        return task
 
-    def _start_periodic(self, from_run=False):
-        """ starts the periodic task through the Timer object
+    def _restore_delay(self, job_id, interval, misfire_grace_time=None):
+        """ computes the delay of the first run from the job store
 
-        :param from_run: from run boolean
+        :param job_id: unique job id
+        :param interval: interval in seconds
+        :param misfire_grace_time: seconds a missed run may be late and still run once
+        :return: delay in seconds
         """
-        self._lock.acquire()
-        if from_run or self._stopped:
-            self._stopped = False
-            self._timer = threading.Timer(self.interval, self._run)
-            self._timer.start()
-            self._lock.release()
+        if self.jobstore is None or job_id is None:
+            return interval
+
+        try:
+            next_run = self.jobstore.load(job_id=job_id)
+        except Exception as ex:
+            self.logger.error("Could not load job {} from the job store: {}".format(job_id, ex))
+            return interval
+
+        if next_run is None:
+            return interval
+
+        now = time()
+        if next_run >= now:
+            return min(next_run - now, interval)
+
+        late = now - next_run
+        if misfire_grace_time is None or late <= misfire_grace_time:
+            # all missed runs are coalesced into one run right now
+            self.logger.info("Job {} missed its run by {:.0f}s, run it once now".format(job_id, late))
+            return 0
+        else:
+            # too late, skip the missed runs and continue at the next regular run time
+            self.logger.info("Job {} missed its run by {:.0f}s, skip to the next run".format(job_id, late))
+            return interval - (late % interval)
 
-    def _run(self):
-        """ runs the function handler
+    def _save_job(self, task):
+        """ saves the next run time of the periodic task in the job store
 
+        :param task: task object
         """
-        self._start_periodic(from_run=True)
-        self.function(*self.args, **self.kwargs)
+        if self.jobstore is None:
+            return
+
+        try:
+            self.jobstore.save(job_id=task.job_id, next_run=time() + task.timeout)
+        except Exception as ex:
+            self.logger.error("Could not save job {} in the job store: {}".format(task.job_id, ex))
 
-    def stop_periodic(self):
-        """ stops the periodic task
+    def stop_periodic(self, task=None):
+        """ stops the given periodic task or all periodic tasks
 
+        :param task: task object from periodic()
         """
-        self._lock.acquire()
-        self._stopped = True
-        self._timer.cancel()
-        self._lock.release()
+        for periodic_task in list(self._periodic_tasks):
+            if task is None or periodic_task is task:
+                periodic_task.cancel()
+                self._periodic_tasks.remove(periodic_task)
 
+    def shutdown(self, wait=True):
+        """ stops the scheduler thread and the worker pool
 
+        :param wait: wait for the running tasks
+        """
+        with self._cv:
+            self._stopped = True
+            self._cv.notify()
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,75 @@
+import unittest
+from ExpiryService.db.cookiestore import DBCookieStore, is_cryptography_importable
+from ExpiryService.db.creator import DBCreator, Table, Column
+from ExpiryService.db.connector import DBConnector
+
+
+@unittest.skipUnless(is_cryptography_importable, "cryptography is not installed")
+class TestDBCookieStore(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        # set up DBConnector instance
+        DBConnector().connect_sqlite(path=":memory:")
+        self.creator = DBCreator()
+        self.creator.build(obj=Table("cookies", Column(name="session_key", type="text", prim_key=True),
+                                                Column(name="provider", type="text"),
+                                                Column(name="username", type="text"),
+                                                Column(name="cookies", type="text"),
+                                                Column(name="saved", type="real")))
+        self.key = DBCookieStore.generate_key()
+        self.cookiestore = DBCookieStore(key=self.key, table="cookies")
+        self.cookies = [{'name': 'SID', 'value': 'abc', 'domain': 'www.netzclub.net', 'path': '/',
+                         'expires': None, 'secure': True, 'rest': {}}]
+
+    def test_load_missing(self):
+
+        self.assertIsNone(self.cookiestore.load(provider="netzclub", username="missing"),
+                          msg="unknown account must return None")
+
+    def test_save(self):
+
+        self.cookiestore.save(provider="netzclub", username="0176", cookies=[])
+        self.cookiestore.save(provider="netzclub", username="0176", cookies=self.cookies)
+
+        self.assertEqual(self.cookiestore.load(provider="netzclub", username="0176"), self.cookies,
+                         msg="save must update the cookies")
+        self.assertEqual(self.cookiestore.load_all(), {("netzclub", "0176"): self.cookies},
+                         msg="load_all must return the cookies per account")
+
+    def test_encrypted(self):
+
+        self.cookiestore.save(provider="netzclub", username="0176", cookies=self.cookies)
+
+        row = self.cookiestore.dbfetcher.one(sql="select cookies from cookies")
+        self.assertNotIn('abc', row[0], msg="cookies must not be stored in plain text")
+
+        other = DBCookieStore(key=DBCookieStore.generate_key(), table="cookies")
+        self.assertIsNone(other.load(provider="netzclub", username="0176"), msg="another key must not decrypt")
+
+    def test_bound_to_account(self):
+
+        self.cookiestore.save(provider="netzclub", username="0176", cookies=self.cookies)
+        self.cookiestore.dbinserter.row(sql="update cookies set session_key = %s, username = %s",
+                                        data=("netzclub:0177", "0177"))
+
+        self.assertIsNone(self.cookiestore.load(provider="netzclub", username="0177"),
+                          msg="cookies of another account must not be restored")
+
+    def test_delete(self):
+
+        self.cookiestore.save(provider="netzclub", username="0176", cookies=self.cookies)
+        self.cookiestore.delete(provider="netzclub", username="0176")
+
+        self.assertIsNone(self.cookiestore.load(provider="netzclub", username="0176"),
+                          msg="deleted cookies must return None")
+
+    def tearDown(self) -> None:
+
+        DBConnector.connection.close()
+        DBConnector.connection = None
+        DBConnector.is_sqlite = False
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from ExpiryService.db.jobstore import DBJobStore
+from ExpiryService.db.creator import DBCreator, Table, Column
+from ExpiryService.db.connector import DBConnector
+
+
+class TestDBJobStore(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        # set up DBConnector instance
+        DBConnector().connect_sqlite(path=":memory:")
+        self.creator = DBCreator()
+        self.creator.build(obj=Table("jobs", Column(name="job_id", type="text", prim_key=True),
+                                             Column(name="next_run", type="real")))
+        self.jobstore = DBJobStore(table="jobs")
+
+    def test_load_missing(self):
+
+        self.assertIsNone(self.jobstore.load(job_id="missing"), msg="unknown job must return None")
+
+    def test_save(self):
+
+        self.jobstore.save(job_id="check", next_run=100.0)
+        self.jobstore.save(job_id="check", next_run=200.0)
+
+        self.assertEqual(self.jobstore.load(job_id="check"), 200.0, msg="save must update the next run")
+
+    def test_delete(self):
+
+        self.jobstore.save(job_id="check", next_run=100.0)
+        self.jobstore.delete(job_id="check")
+
+        self.assertIsNone(self.jobstore.load(job_id="check"), msg="deleted job must return None")
+
+    def tearDown(self) -> None:
+
+        DBConnector.connection.close()
+        DBConnector.connection = None
+        DBConnector.is_sqlite = False
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from ExpiryService.asyncprovidercheck import AsyncProviderCheck
+from ExpiryService.providers import Netzclub
+from ExpiryService.test.providers.portal import StubPortal
+
+
+def check_sync(url, username):
+    """ checks one account with the requests based provider
+
+    """
+    netzclub = Netzclub(url=url)
+    netzclub.login(username=username, password='pw')
+    return netzclub.current_consumption()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the provider engines against a local stand-in portal")
+    parser.add_argument('--accounts', type=int, default=200, help='Number of accounts to check')
+    parser.add_argument('--latency',  type=float, default=0.05, help='Response latency of the stand-in portal')
+    parser.add_argument('--workers',  type=int, default=16, help='Worker threads of the threads engine')
+    args = parser.parse_args()
+
+    usernames = [str(i) for i in range(args.accounts)]
+
+    # the benchmark measures the engines, not the host limits of the real portal
+    Netzclub.max_in_flight = Netzclub.initial_in_flight = args.workers
+    Netzclub.requests_per_second = None
+
+    with StubPortal(latency=args.latency) as portal:
+        url = portal.url + '/netzclub/'
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            list(executor.map(lambda username: check_sync(url, username), usernames))
+        print("threads ({} workers): {:.2f}s".format(args.workers, time.perf_counter() - start))
+
+        check = AsyncProviderCheck(concurrency=args.accounts, urls={'netzclub': url})
+        start = time.perf_counter()
+        check.run(accounts=[('netzclub', username, 'pw') for username in usernames])
+        print("asyncio: {:.2f}s".format(time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+import gc
+import os
+import time
+import argparse
+import statistics
+import tracemalloc
+
+from ExpiryService.providers import AldiTalk, Netzclub
+from ExpiryService.providers.parser import PageParser, is_lxml_importable
+from ExpiryService.test.providers.portal import FIXTURES
+
+# parse method, fixture and the containers the method parses
+CASES = [
+    (AldiTalk.parse_csrf_token,   'alditalk_login.html',    AldiTalk.login_containers),
+    (AldiTalk.parse_consumption,  'alditalk_home.html',     AldiTalk.consumption_containers),
+    (AldiTalk.parse_data_usage,   'alditalk_overview.html', AldiTalk.data_usage_containers),
+    (Netzclub.parse_login_tokens, 'netzclub_login.html',    Netzclub.login_containers),
+    (Netzclub.parse_consumption,  'netzclub_selfcare.html', Netzclub.consumption_containers),
+    (Netzclub.parse_data_usage,   'netzclub_billing.html',  Netzclub.data_usage_containers),
+]
+
+FILLER = '<div class="teaser"><a href="/angebote/{0}">Angebot {0}</a><p>Jetzt buchen und sparen</p></div>\n'
+
+
+def load_page(fixture, size):
+    """ loads the fixture and pads it with navigation markup to the given size, the stored fixtures only contain
+    the parts of the real pages which are parsed
+
+    :param fixture: fixture file name
+    :param size: page size in KiB, 0 for the plain fixture
+    :return: html string
+    """
+    with open(os.path.join(FIXTURES, fixture), encoding='utf-8') as f:
+        html = f.read()
+
+    filler = list()
+    i = 0
+    while len(html) + sum(len(part) for part in filler) < size * 1024:
+        filler.append(FILLER.format(i))
+        i += 1
+
+    # half of the filler in front of the data, half behind it
+    half = len(filler) // 2
+    html = html.replace('<body>', '<body>\n' + ''.join(filler[:half]), 1)
+    return html.replace('</body>', ''.join(filler[half:]) + '</body>', 1)
+
+
+def measure(parse, html, strainer, iterations):
+    """ measures one parse method with the current parser backend
+
+    :return: tuple of mean and p95 latency in ms, peak memory of one call in KiB, blocks and KiB of the parse tree
+    """
+    parse(html)
+
+    latencies = list()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        parse(html)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    # the parse trees are cyclic, collect them now so they are not freed within the measurement
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        parse(html)
+        _, peak = tracemalloc.get_traced_memory()
+
+        snapshot = tracemalloc.take_snapshot()
+        soup = PageParser.parse(html, parse_only=strainer)
+        tree = tracemalloc.take_snapshot().compare_to(snapshot, 'filename')
+        del soup
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+
+    blocks = sum(stat.count_diff for stat in tree)
+    size = sum(stat.size_diff for stat in tree)
+    return (statistics.mean(latencies), latencies[int(len(latencies) * 0.95) - 1], (peak - before) / 1024,
+            blocks, size / 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the provider parse methods against the stored fixtures")
+    parser.add_argument('--iterations', type=int, default=50, help='Timed calls per parse method and backend')
+    parser.add_argument('--page-size',  type=int, default=150, help='Pad the fixtures to this size in KiB, 0 to '
+                                                                     'parse the plain fixtures')
+    args = parser.parse_args()
+
+    backends = [backend for backend in PageParser.backends if backend != 'lxml' or is_lxml_importable]
+    default_backend, default_targeted = PageParser.backend, PageParser.targeted
+
+    print("{:<30} {:<12} {:>8} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        'method', 'backend', 'targeted', 'mean ms', 'p95 ms', 'peak KiB', 'blocks', 'tree KiB'))
+    try:
+        for parse, fixture, strainer in CASES:
+            html = load_page(fixture=fixture, size=args.page_size)
+            for backend in backends:
+                for targeted in (False, True):
+                    PageParser.set_backend(backend=backend, targeted=targeted)
+                    mean, p95, peak, blocks, size = measure(parse=parse, html=html, strainer=strainer,
+                                                            iterations=args.iterations)
+                    print("{:<30} {:<12} {:>8} {:>10.3f} {:>10.3f} {:>10.1f} {:>10} {:>10.1f}".format(
+                        parse.__qualname__, backend, str(targeted), mean, p95, peak, blocks, size))
+    finally:
+        PageParser.backend, PageParser.targeted = default_backend, default_targeted
+
+
+if __name__ == '__main__':
+    main()
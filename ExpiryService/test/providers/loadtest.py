@@ -0,0 +1,139 @@
+import logging
+import argparse
+from time import perf_counter
+
+from ExpiryService.account import Account
+from ExpiryService.providercheck import ProviderCheck
+from ExpiryService.providers import Provider
+from ExpiryService.providers.limiter import HostLimiter, AsyncHostLimiter
+from ExpiryService.providers.transport import ConnectionPools
+from ExpiryService.test.providers.portal import StubPortal
+
+# path of the provider pages below the url of the stand-in portal
+PATHS = {'alditalk': '/alditalk/de/', 'netzclub': '/netzclub/', 'congstar': '/congstar/'}
+
+
+class TimedProviderCheck(ProviderCheck):
+    """ class TimedProviderCheck to measure the check time of every account of the threads engine
+
+    USAGE:
+            providercheck = TimedProviderCheck(**params)
+            providercheck.check_accounts(accounts=accounts)
+            providercheck.latencies
+
+    """
+    def __init__(self, **params):
+        super().__init__(**params)
+
+        self.latencies = list()
+
+    def check_provider(self, account, notify=False, cycle_deadline=None):
+        """ checks the account and records the time of the check
+
+        """
+        start = perf_counter()
+        try:
+            return super().check_provider(account=account, notify=notify, cycle_deadline=cycle_deadline)
+        finally:
+            self.latencies.append(perf_counter() - start)
+
+
+def percentile(values, p):
+    """ get the p-th percentile of the values
+
+    :param values: sorted list of numbers
+    :param p: percentile between 0 and 100
+    :return: number
+    """
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test a full check cycle of ProviderCheck against local "
+                                                 "stand-in portals")
+    parser.add_argument('--accounts',    type=int, default=1000, help='Number of accounts per provider')
+    parser.add_argument('--providers',   type=str, nargs='+', choices=sorted(PATHS), default=sorted(PATHS),
+                        help='Providers to check')
+    parser.add_argument('--latency',     type=float, default=0.05, help='Response latency of the portals')
+    parser.add_argument('--error-rate',  type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--engine',      type=str, choices=['threads', 'asyncio'], default='threads',
+                        help='Provider fetch engine')
+    parser.add_argument('--workers',     type=int, default=32, help='Worker threads of the threads engine')
+    parser.add_argument('--concurrency', type=int, default=200, help='Accounts in flight for the asyncio engine')
+    parser.add_argument('--max-in-flight', type=int, default=64, help='Maximum in-flight requests per portal')
+    parser.add_argument('--requests-per-second', type=float, help='Request rate per portal, default unlimited')
+    parser.add_argument('--cycles',      type=int, default=2, help='Check cycles, the first one logs in')
+    parser.add_argument('--seed',        type=int, default=1, help='Seed of the error draws')
+    parser.add_argument('--verbose',     action='store_true', help='Show the log of the provider check')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger('ExpiryService').setLevel(logging.CRITICAL)
+
+    # the limits of the real portals are replaced by the limits under test
+    Provider.max_in_flight = args.max_in_flight
+    Provider.initial_in_flight = min(Provider.initial_in_flight, args.max_in_flight)
+    Provider.requests_per_second = args.requests_per_second
+
+    # every provider gets its own portal, so the host limiters and connection pools are separated like in production
+    portals = {provider: StubPortal(latency=args.latency, error_rate=args.error_rate, accounts=args.accounts,
+                                    seed=args.seed)
+               for provider in args.providers}
+    for portal in portals.values():
+        portal.start()
+
+    try:
+        params = {
+            'database': {'path': ':memory:'},
+            'mail': dict(),
+            'providercheck': {
+                'engine': args.engine, 'workers': args.workers, 'concurrency': args.concurrency,
+                'session_cache_size': args.accounts * len(args.providers),
+                'cycle_timeout': 24 * 3600,
+                'provider_urls': {provider: portal.url + PATHS[provider] for provider, portal in portals.items()},
+            }
+        }
+        providercheck = TimedProviderCheck(**params)
+
+        accounts = [Account(provider=provider, username=str(i), password='pw')
+                    for i in range(args.accounts) for provider in args.providers]
+
+        print("{} accounts, engine {}, portal latency {:.3f}s, error rate {:.1%}"
+              .format(len(accounts), args.engine, args.latency, args.error_rate))
+        for cycle in range(args.cycles):
+            requests = sum(portal.requests for portal in portals.values())
+            providercheck.latencies = list()
+
+            start = perf_counter()
+            results = providercheck.check_accounts(accounts=accounts)
+            seconds = perf_counter() - start
+
+            print("cycle {}: {:.2f}s, {:.1f} accounts/s, {} failed, {} requests"
+                  .format(cycle + 1, seconds, len(results) / seconds, results.count(False),
+                          sum(portal.requests for portal in portals.values()) - requests))
+
+            latencies = sorted(providercheck.latencies)
+            if latencies:
+                print("  account latency p50 {:.3f}s p95 {:.3f}s p99 {:.3f}s max {:.3f}s"
+                      .format(percentile(latencies, 50), percentile(latencies, 95), percentile(latencies, 99),
+                              latencies[-1]))
+
+        for provider, portal in portals.items():
+            print("{}: {} requests, {} errors, {} connections"
+                  .format(provider, portal.requests, portal.errors, portal.connections))
+        limiter = AsyncHostLimiter if args.engine == 'asyncio' else HostLimiter
+        for host, stats in limiter.get_all_stats().items():
+            print("{}: in-flight limit {}, queue wait avg {:.3f}s max {:.3f}s"
+                  .format(host, stats['limit'], stats['wait_avg'], stats['wait_max']))
+
+        providercheck.scheduler.shutdown()
+        if providercheck.executor is not None:
+            providercheck.executor.shutdown()
+    finally:
+        ConnectionPools.clear()
+        for portal in portals.values():
+            portal.stop()
+
+
+if __name__ == '__main__':
+    main()
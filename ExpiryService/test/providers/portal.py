@@ -0,0 +1,248 @@
+import os
+import time
+import random
+import argparse
+import threading
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+class StubPortal:
+    """ class StubPortal to serve the stored provider pages from a local http server
+
+    The portal imitates the AldiTalk, Netzclub and Congstar pages. Every response is delayed by latency seconds
+    and answered with 503 at the given error rate. With a number of accounts only the usernames '0' to
+    accounts - 1 can login, without every username is accepted.
+
+    USAGE:
+            portal = StubPortal(latency=0.05, error_rate=0.01, accounts=1000)
+            portal.start()
+            alditalk = AldiTalk(url=portal.url + '/alditalk/de/')
+            portal.stop()
+    """
+    pages = {
+        ('GET',  '/alditalk/de/'):                     'alditalk_home.html',
+        ('POST', '/alditalk/de/login_check'):          'alditalk_home.html',
+        ('GET',  '/alditalk/de/konto/kontoubersicht'): 'alditalk_overview.html',
+        ('GET',  '/alditalk/de/login'):                'alditalk_login.html',
+        ('GET',  '/netzclub/login/'):                  'netzclub_login.html',
+        ('POST', '/netzclub/login/'):                  'netzclub_selfcare.html',
+        ('GET',  '/netzclub/selfcare/'):               'netzclub_selfcare.html',
+        ('GET',  '/netzclub/selfcare/consumption'):    'netzclub_selfcare_fragment.html',
+        ('GET',  '/netzclub/meine-abrechnung/'):       'netzclub_billing.html',
+        ('POST', '/congstar/api/auth/login'):          'congstar_login.json',
+        ('GET',  '/congstar/api/contracts'):           'congstar_contracts.json',
+        ('GET',  '/congstar/api/contracts/BvWF_IP1DdTcQg/consumption'):   'congstar_consumption.json',
+        ('GET',  '/congstar/api/contracts/BvWF_IP1DdTcQg/usage-history'): 'congstar_usage.json',
+    }
+
+    # json apis behind the login, answered with 401 while the session is expired
+    protected_apis = ('/congstar/api/contracts',)
+
+    # username field of the login forms
+    login_fields = {
+        '/alditalk/de/login_check': 'form[username]',
+        '/netzclub/login/':         'txtMobile',
+        '/congstar/api/auth/login': 'username',
+    }
+
+    # pages which serve the login form instead of their content without a session cookie
+    login_pages = {
+        '/alditalk/de/': '/alditalk/de/login',
+    }
+
+    # pages behind the login, redirected to the login page while the session is expired
+    protected = {
+        '/alditalk/de/konto/kontoubersicht': '/alditalk/de/login',
+        '/netzclub/selfcare/':               '/netzclub/login/',
+        '/netzclub/selfcare/consumption':    '/netzclub/login/',
+        '/netzclub/meine-abrechnung/':       '/netzclub/login/',
+    }
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, error_rate=0.0, accounts=None, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.accounts = accounts
+        self.requests = 0
+        self.connections = 0
+        self.errors = 0
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.expired = False
+
+        self.contents = dict()
+        for route, fixture in self.pages.items():
+            with open(os.path.join(FIXTURES, fixture), 'rb') as f:
+                self.contents[route] = f.read()
+
+        self.server = ThreadingHTTPServer((host, port), self.__handler())
+        self.server.daemon_threads = True
+        self.server.request_queue_size = 1024
+        self.thread = None
+
+    @property
+    def url(self):
+        """ base url of the stand-in server
+
+        :return: url string
+        """
+        return "http://{}:{}".format(*self.server.server_address)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def is_account(self, username):
+        """ checks if the username belongs to one of the accounts of the portal
+
+        :param username: username string
+        :return: True if the login is accepted
+        """
+        if self.accounts is None:
+            return True
+        return username.isdigit() and int(username) < self.accounts
+
+    def is_error(self):
+        """ draws if the current request fails
+
+        :return: True if the request is answered with 503
+        """
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def start(self):
+        """ starts the server thread
+
+        """
+        self.thread = threading.Thread(target=self.server.serve_forever, name='StubPortal', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """ stops the server thread
+
+        """
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __handler(self):
+        """ creates the request handler class bound to this portal
+
+        :return: request handler class
+        """
+        portal = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                with portal._lock:
+                    portal.connections += 1
+                super().setup()
+
+            def respond(self, method):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length) if length else b''
+
+                with portal._lock:
+                    portal.requests += 1
+                if portal.latency:
+                    time.sleep(portal.latency)
+
+                if portal.is_error():
+                    with portal._lock:
+                        portal.errors += 1
+                    self.send_status(503)
+                    return
+
+                path = self.path.split('?')[0]
+                if method == 'POST' and path in portal.login_fields:
+                    form = parse_qs(body.decode('utf-8', errors='replace'))
+                    if not portal.is_account(username=form.get(portal.login_fields[path], [''])[0]):
+                        self.send_status(401)
+                        return
+                    session_cookie = True
+                else:
+                    session_cookie = False
+
+                if method == 'GET' and path in portal.login_pages and \
+                        (portal.expired or 'stub_session=' not in self.headers.get('Cookie', '')):
+                    path = portal.login_pages[path]
+
+                if portal.expired and path in portal.protected:
+                    self.send_response(302)
+                    self.send_header('Location', portal.protected[path])
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                if portal.expired and path.startswith(portal.protected_apis):
+                    self.send_status(401)
+                    return
+
+                content = portal.contents.get((method, path))
+                if content is None:
+                    self.send_response(404)
+                    content = b''
+                else:
+                    self.send_response(200)
+                if session_cookie:
+                    self.send_header('Set-Cookie', 'stub_session=1; Path=/')
+                if path.startswith('/congstar/api/'):
+                    self.send_header('Content-Type', 'application/json')
+                else:
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def send_status(self, status):
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_GET(self):
+                self.respond('GET')
+
+            def do_POST(self):
+                self.respond('POST')
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the stand-in AldiTalk, Netzclub and Congstar portal")
+    parser.add_argument('--host',       type=str, default='127.0.0.1', help='Host to listen on')
+    parser.add_argument('--port',       type=int, default=8080, help='Port to listen on')
+    parser.add_argument('--latency',    type=float, default=0.05, help='Seconds every response is delayed')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--accounts',   type=int, help='Number of accounts which can login, default all')
+    parser.add_argument('--seed',       type=int, help='Seed of the error draws')
+    args = parser.parse_args()
+
+    portal = StubPortal(host=args.host, port=args.port, latency=args.latency, error_rate=args.error_rate,
+                        accounts=args.accounts, seed=args.seed)
+    print("Serving the stand-in portal on {}, provider urls:".format(portal.url))
+    print("  alditalk: {}/alditalk/de/".format(portal.url))
+    print("  netzclub: {}/netzclub/".format(portal.url))
+    print("  congstar: {}/congstar/".format(portal.url))
+    try:
+        portal.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        portal.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import os
+import unittest
+
+from ExpiryService.providers import AldiTalk
+from ExpiryService.exceptions import ProviderSessionError
+from ExpiryService.test.providers.portal import StubPortal, FIXTURES
+
+
+class TestAldiTalk(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.portal = StubPortal()
+        self.portal.start()
+        self.alditalk = AldiTalk(url=self.portal.url + '/alditalk/de/')
+
+    def test_lazy_csrf_token(self):
+
+        self.assertEqual(self.portal.requests, 0, msg="constructor must not request the web page")
+        self.assertIsNone(self.alditalk.csrf_token, msg="csrf token must not be fetched in the constructor")
+
+        self.assertTrue(self.alditalk.login(username='015751234567', password='pw'))
+        self.assertEqual(self.alditalk.csrf_token, 'aldi-csrf-0123456789abcdef', msg="login must fetch the csrf token")
+        self.assertEqual(self.portal.requests, 2, msg="login must fetch the token and post the login form")
+
+    def test_reuse_csrf_token(self):
+
+        self.alditalk.login(username='015751234567', password='pw')
+        self.alditalk.login(username='015751234567', password='pw')
+
+        self.assertEqual(self.portal.requests, 3, msg="valid csrf token must be reused")
+
+    def test_expired_session(self):
+
+        self.alditalk.login(username='015751234567', password='pw')
+        self.assertEqual(self.alditalk.current_consumption()['creditbalance'], '12,34 €',
+                         msg="logged in session must get the start page")
+
+        self.portal.expired = True
+        with self.assertRaises(ProviderSessionError, msg="login form on the start page must raise a session error"):
+            self.alditalk.current_consumption()
+
+        with self.assertRaises(ProviderSessionError, msg="session without login must raise a session error"):
+            AldiTalk(url=self.portal.url + '/alditalk/de/').current_consumption()
+
+    def test_parse_consumption(self):
+
+        with open(os.path.join(FIXTURES, 'alditalk_home.html'), encoding='utf-8') as f:
+            consumption = AldiTalk.parse_consumption(f.read())
+
+        self.assertEqual(consumption, {
+            'name': 'Max Mustermann',
+            'number': '01575 1234567',
+            'creditbalance': '12,34 €',
+            'remaining_volume': '1,23 GB',
+            'total_volume': '5 GB',
+            'end_date': 'Gültig bis 01.11.2026'
+        }, msg="consumption must be parsed from the start page")
+
+    def test_parse_data_usage(self):
+
+        with open(os.path.join(FIXTURES, 'alditalk_overview.html'), encoding='utf-8') as f:
+            data_usage = AldiTalk.parse_data_usage(f.read())
+
+        self.assertEqual(data_usage['table_head'], ['Monat', 'Inland', 'EU', 'Gesamt', 'Tarif'],
+                         msg="table head must be parsed")
+        self.assertEqual(data_usage['table_body'][0], ['Oktober 2026', '1,2 GB', '0,0 GB', '1,2 GB', 'Paket S'],
+                         msg="table rows must be parsed")
+        self.assertEqual(len(data_usage['table_body']), 2, msg="all table rows must be parsed")
+
+    def tearDown(self) -> None:
+
+        self.portal.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
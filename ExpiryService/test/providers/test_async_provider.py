@@ -0,0 +1,89 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from ExpiryService.asyncprovidercheck import AsyncProviderCheck
+from ExpiryService.providers import Provider, AldiTalk, Netzclub, Congstar, AsyncNetzclub
+from ExpiryService.providers.async_provider import is_aiohttp_importable
+from ExpiryService.providers.limiter import AsyncHostLimiter
+from ExpiryService.providers.retry import RetryPolicy
+from ExpiryService.exceptions import ProviderInstanceError, ProviderUnavailableError
+from ExpiryService.test.providers.portal import StubPortal
+
+
+@unittest.skipUnless(is_aiohttp_importable, "aiohttp is not installed")
+class TestAsyncProviderCheck(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        # the stand-in portal needs no request rate limit
+        AsyncHostLimiter.clear()
+        self.rate = mock.patch.object(Provider, 'requests_per_second', None)
+        self.rate.start()
+        self.portal = StubPortal()
+        self.portal.start()
+        self.urls = {'alditalk': self.portal.url + '/alditalk/de/', 'netzclub': self.portal.url + '/netzclub/',
+                     'congstar': self.portal.url + '/congstar/'}
+        self.check = AsyncProviderCheck(concurrency=10, urls=self.urls)
+
+    def test_same_data_as_sync_providers(self):
+
+        results = self.check.run(accounts=[('alditalk', '015751234567', 'pw'), ('netzclub', '01761234567', 'pw'),
+                                           ('congstar', '015112345678', 'pw')], usage=True)
+
+        providers = ((AldiTalk, self.urls['alditalk']), (Netzclub, self.urls['netzclub']),
+                     (Congstar, self.urls['congstar']))
+        for (provider, url), result in zip(providers, results):
+            sync_provider = provider(url=url)
+            self.assertTrue(sync_provider.login(username='user', password='pw'))
+            self.assertEqual(result[0], sync_provider.current_consumption(), msg="consumption must match")
+            self.assertEqual(result[1], sync_provider.data_usage_overview(), msg="data usage must match")
+
+    def test_many_accounts(self):
+
+        accounts = [('netzclub', str(i), 'pw') for i in range(50)]
+        results = self.check.run(accounts=accounts, usage=False)
+
+        self.assertEqual(len(results), 50, msg="every account must have a result")
+        self.assertTrue(all(result[1] is None for result in results), msg="usage must not be fetched")
+
+    def test_in_flight_limit(self):
+
+        check = AsyncProviderCheck(concurrency=50, urls=self.urls)
+        with mock.patch.object(Provider, 'max_in_flight', 4):
+            results = check.run(accounts=[('netzclub', str(i), 'pw') for i in range(50)], usage=False)
+
+        self.assertEqual(len(results), 50, msg="every account must have a result")
+        self.assertLessEqual(self.portal.connections, 4, msg="connections to the portal must be limited")
+
+    def test_retry(self):
+
+        portal = StubPortal(error_rate=1.0)
+        portal.start()
+
+        async def fetch():
+            async with AsyncNetzclub(url=portal.url + '/netzclub/') as netzclub:
+                await netzclub.current_consumption()
+
+        try:
+            with mock.patch.object(Provider, 'retry', RetryPolicy(retries=2, backoff=0.01)):
+                with self.assertRaises(ProviderUnavailableError, msg="503 after the last retry must raise"):
+                    asyncio.run(fetch())
+            self.assertEqual(portal.requests, 3, msg="get must be retried twice")
+        finally:
+            portal.stop()
+
+    def test_unknown_provider(self):
+
+        results = self.check.run(accounts=[('unknown', 'user', 'pw')])
+
+        self.assertIsInstance(results[0], ProviderInstanceError, msg="error must be returned per account")
+
+    def tearDown(self) -> None:
+
+        self.portal.stop()
+        self.rate.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from unittest import mock
+
+from ExpiryService.providers import circuitbreaker
+from ExpiryService.providers.circuitbreaker import CircuitBreaker
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.now = 1000.0
+        patcher = mock.patch.object(circuitbreaker, 'monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.breaker = CircuitBreaker(name='alditalk', failure_threshold=3, recovery_timeout=60)
+
+    def test_open(self):
+
+        for _ in range(2):
+            self.assertTrue(self.breaker.allow(), msg="closed breaker must allow requests")
+            self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED, msg="breaker must stay closed below threshold")
+
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED, msg="success must reset the failures")
+
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN, msg="breaker must open at the threshold")
+        self.assertFalse(self.breaker.allow(), msg="open breaker must reject requests")
+
+    def test_half_open(self):
+
+        for _ in range(3):
+            self.breaker.record_failure()
+
+        self.now += 61
+        self.assertTrue(self.breaker.allow(), msg="breaker must let a probe through after the recovery timeout")
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN, msg="breaker must be half open")
+        self.assertFalse(self.breaker.allow(), msg="half open breaker must only allow one probe")
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN, msg="failed probe must open the breaker")
+        self.assertFalse(self.breaker.allow(), msg="failed probe must restart the recovery timeout")
+
+        self.now += 61
+        self.assertTrue(self.breaker.allow(), msg="breaker must let a probe through after the recovery timeout")
+        self.breaker.release()
+        self.assertTrue(self.breaker.allow(), msg="released probe must let the next probe through")
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED, msg="successful probe must close the breaker")
+        self.assertTrue(self.breaker.allow(), msg="closed breaker must allow requests")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import json
+import unittest
+
+from ExpiryService.providers import Congstar
+from ExpiryService.exceptions import ProviderLoginError, ProviderSessionError
+from ExpiryService.test.providers.portal import StubPortal, FIXTURES
+
+
+class TestCongstar(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.portal = StubPortal()
+        self.portal.start()
+        self.congstar = Congstar(url=self.portal.url + '/congstar/')
+
+    def test_current_consumption(self):
+
+        self.assertTrue(self.congstar.login(username='015112345678', password='pw'))
+
+        self.assertEqual(self.congstar.current_consumption(), {
+            'name': 'Max Mustermann',
+            'number': '015112345678',
+            'creditbalance': '7,50 €',
+            'remaining_volume': '1,5 GB',
+            'total_volume': '3 GB',
+            'end_date': '12.11.2026'
+        }, msg="consumption must be read from the json api")
+
+        requests = self.portal.requests
+        self.congstar.current_consumption()
+        self.assertEqual(self.portal.requests, requests + 1, msg="contract must be read only once")
+
+    def test_data_usage_overview(self):
+
+        self.congstar.login(username='015112345678', password='pw')
+        data_usage = self.congstar.data_usage_overview()
+
+        self.assertEqual(data_usage['table_head'], ['Zeitraum', 'Volumen', 'Verbraucht', 'Rest'],
+                         msg="table head must name the usage columns")
+        self.assertEqual(data_usage['table_body'][1], ['13.09.2026 - 12.10.2026', '3 GB', '3 GB', '0 B'],
+                         msg="table rows must be read from the usage history")
+
+    def test_expired_session(self):
+
+        self.congstar.login(username='015112345678', password='pw')
+        self.portal.expired = True
+
+        with self.assertRaises(ProviderSessionError, msg="401 of the api must raise a session error"):
+            self.congstar.current_consumption()
+
+    def test_rejected_login(self):
+
+        self.portal.contents[('POST', '/congstar/api/auth/login')] = b'{"success": false, "errorCode": "LOGIN_FAILED"}'
+
+        with self.assertRaises(ProviderLoginError, msg="login with success false must raise a login error"):
+            self.congstar.login(username='015112345678', password='wrong')
+
+    def test_parse_contracts(self):
+
+        with open(os.path.join(FIXTURES, 'congstar_contracts.json'), encoding='utf-8') as f:
+            contract = Congstar.parse_contracts(json.load(f))
+
+        self.assertEqual(contract['contractId'], 'BvWF_IP1DdTcQg', msg="first contract must be used")
+
+        with self.assertRaises(ProviderLoginError, msg="account without contract must raise a login error"):
+            Congstar.parse_contracts({'contracts': []})
+
+    def test_format(self):
+
+        self.assertEqual(Congstar.format_amount(12.3), '12,30 €', msg="amount must be formatted like the portals")
+        self.assertEqual(Congstar.format_volume(200 * 1024 ** 2), '200 MB', msg="volume must use the largest unit")
+        self.assertEqual(Congstar.format_date('2026-11-01T00:00:00'), '01.11.2026', msg="date must be german")
+        self.assertEqual(Congstar.format_amount(None), '', msg="unknown values must be empty")
+
+    def tearDown(self) -> None:
+
+        self.portal.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
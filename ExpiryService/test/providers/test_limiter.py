@@ -0,0 +1,173 @@
+import asyncio
+import unittest
+import threading
+from time import monotonic, sleep
+
+from ExpiryService.providers.limiter import TokenBucket, AIMDController, HostLimiter, AsyncHostLimiter
+from ExpiryService.providers.session import ProviderSession
+from ExpiryService.exceptions import ProviderQueueTimeoutError
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_rate(self):
+
+        bucket = TokenBucket(rate=20, capacity=1)
+
+        start = monotonic()
+        for _ in range(5):
+            bucket.acquire()
+        elapsed = monotonic() - start
+
+        self.assertGreaterEqual(elapsed, 0.19, msg="bucket must limit the rate after the burst")
+        self.assertLess(elapsed, 1, msg="bucket must refill with the configured rate")
+
+    def test_timeout(self):
+
+        bucket = TokenBucket(rate=1, capacity=1)
+        bucket.acquire()
+
+        start = monotonic()
+        with self.assertRaises(ProviderQueueTimeoutError, msg="token after the timeout must not be awaited"):
+            bucket.acquire(timeout=0.1)
+        self.assertLess(monotonic() - start, 0.1, msg="bucket must not wait beyond the timeout")
+
+
+class TestAIMDController(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.controller = AIMDController(initial=4, min_limit=1, max_limit=8, latency_target=1.0)
+
+    def test_additive_increase(self):
+
+        for _ in range(5):
+            self.controller.on_response(latency=0.1, ok=True, started=monotonic())
+        self.assertEqual(self.controller.in_flight_limit, 5, msg="limit must grow by one per round trip")
+
+        limit = self.controller.limit
+        self.assertFalse(self.controller.on_response(latency=2.0, ok=True, started=monotonic()))
+        self.assertEqual(self.controller.limit, limit, msg="slow response must hold the limit")
+
+        for _ in range(100):
+            self.controller.on_response(latency=0.1, ok=True, started=monotonic())
+        self.assertEqual(self.controller.in_flight_limit, 8, msg="limit must not exceed max_limit")
+
+    def test_multiplicative_decrease(self):
+
+        started = monotonic()
+        self.assertTrue(self.controller.on_response(latency=0.1, ok=False, started=started))
+        self.assertEqual(self.controller.in_flight_limit, 2, msg="failure must halve the limit")
+
+        self.assertFalse(self.controller.on_response(latency=0.1, ok=False, started=started),
+                         msg="failures of requests started before the decrease must be ignored")
+
+        for _ in range(3):
+            self.controller.on_response(latency=0.1, ok=False, started=monotonic())
+        self.assertEqual(self.controller.in_flight_limit, 1, msg="limit must not fall below min_limit")
+
+
+class TestHostLimiter(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        HostLimiter.clear()
+
+    def test_registry(self):
+
+        limiter = HostLimiter.for_host('portal.local', max_in_flight=2)
+
+        self.assertIs(HostLimiter.for_host('portal.local', max_in_flight=8), limiter,
+                      msg="one limiter must be shared per host")
+        self.assertIsNot(HostLimiter.for_host('other.local'), limiter, msg="every host must get its own limiter")
+        self.assertIs(ProviderSession().get_limiter('http://portal.local/login'), limiter,
+                      msg="session must use the limiter of the url host")
+
+    def test_max_in_flight(self):
+
+        limiter = HostLimiter.for_host('portal.local', max_in_flight=2)
+        peak = []
+
+        def request():
+            with limiter.limit():
+                peak.append(limiter.get_stats()['in_flight'])
+                sleep(0.05)
+
+        threads = [threading.Thread(target=request) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = limiter.get_stats()
+        self.assertLessEqual(max(peak), 2, msg="in-flight requests must not exceed the limit")
+        self.assertEqual(stats['requests'], 6, msg="all requests must be counted")
+        self.assertEqual(stats['in_flight'], 0, msg="all slots must be released")
+        self.assertGreater(stats['wait_max'], 0.05, msg="queue wait time must be reported")
+        self.assertIn('portal.local', HostLimiter.get_all_stats(), msg="host stats must be reported")
+
+    def test_queue_timeout(self):
+
+        limiter = HostLimiter.for_host('portal.local', max_in_flight=1)
+
+        with limiter.limit():
+            start = monotonic()
+            with self.assertRaises(ProviderQueueTimeoutError, msg="slot after the timeout must not be awaited"):
+                with limiter.limit(timeout=0.1):
+                    pass
+            self.assertLess(monotonic() - start, 0.5, msg="queue wait must end at the timeout")
+
+        self.assertEqual(limiter.get_stats()['in_flight'], 0, msg="all slots must be released")
+
+    def test_adaptive_limit(self):
+
+        limiter = HostLimiter.for_host('portal.local', max_in_flight=8, initial_in_flight=4)
+
+        limiter.record(latency=0.1, ok=False, started=monotonic())
+        stats = limiter.get_stats()
+        self.assertEqual(stats['limit'], 2, msg="failed request must lower the in-flight limit")
+        self.assertEqual(stats['failures'], 1, msg="failed request must be counted")
+
+    def tearDown(self) -> None:
+
+        HostLimiter.clear()
+
+
+
+class TestAsyncHostLimiter(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        AsyncHostLimiter.clear()
+
+    def test_max_in_flight(self):
+
+        limiter = AsyncHostLimiter.for_host('portal.local', max_in_flight=2, requests_per_second=50)
+        peak = []
+
+        async def request():
+            async with limiter.limit():
+                peak.append(limiter.get_stats()['in_flight'])
+                await asyncio.sleep(0.05)
+
+        async def requests():
+            await asyncio.gather(*(request() for _ in range(6)))
+
+        # the limiter is kept across the event loops of two cycles
+        asyncio.run(requests())
+        asyncio.run(requests())
+
+        stats = limiter.get_stats()
+        self.assertIsNot(HostLimiter.for_host('portal.local'), limiter, msg="async limiters must have their registry")
+        self.assertLessEqual(max(peak), 2, msg="in-flight requests must not exceed the limit")
+        self.assertEqual(stats['requests'], 12, msg="all requests must be counted")
+        self.assertEqual(stats['in_flight'], 0, msg="all slots must be released")
+
+    def tearDown(self) -> None:
+
+        AsyncHostLimiter.clear()
+        HostLimiter.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import unittest
+
+from ExpiryService.providers import Provider, Netzclub
+from ExpiryService.exceptions import ProviderSessionError
+from ExpiryService.test.providers.portal import StubPortal, FIXTURES
+
+
+class TestNetzclub(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.portal = StubPortal()
+        self.portal.start()
+        self.netzclub = Netzclub(url=self.portal.url + '/netzclub/')
+
+    def test_lazy_login_tokens(self):
+
+        self.assertEqual(self.portal.requests, 0, msg="constructor must not request the web page")
+
+        self.assertTrue(self.netzclub.login(username='01761234567', password='pw'))
+        self.assertEqual(self.portal.requests, 2, msg="login must fetch the tokens and post the login form")
+        self.assertIsNone(self.netzclub.reload_token, msg="reload token must be consumed by the login")
+
+    def test_parse_consumption(self):
+
+        with open(os.path.join(FIXTURES, 'netzclub_selfcare.html'), encoding='utf-8') as f:
+            consumption = Netzclub.parse_consumption(f.read())
+
+        self.assertEqual(consumption, {
+            'name': 'Erika Musterfrau',
+            'number': '01761234567',
+            'creditbalance': '3,50 €',
+            'remaining_volume': '180 MB',
+            'total_volume': 'von 200 MB',
+            'end_date': 'Gültig bis 05.11.2026'
+        }, msg="consumption must be parsed from the selfcare page")
+
+    def test_parse_data_usage(self):
+
+        with open(os.path.join(FIXTURES, 'netzclub_billing.html'), encoding='utf-8') as f:
+            data_usage = Netzclub.parse_data_usage(f.read())
+
+        self.assertEqual(data_usage['table_head'], ['Zeitraum', 'Volumen', 'Verbraucht', 'Rest', 'Kosten'],
+                         msg="table head must be parsed")
+        self.assertEqual(data_usage['table_body'][1], ['01.09.2026 - 30.09.2026', '200 MB', '200 MB', '0 MB', '0,00 €'],
+                         msg="table rows must be parsed")
+
+    def test_fragment(self):
+
+        Netzclub.fragment_urls = {'consumption': ['consumption']}
+        self.netzclub.login(username='01761234567', password='pw')
+
+        self.assertEqual(self.netzclub.current_consumption()['end_date'], 'Gültig bis 05.11.2026',
+                         msg="consumption must be parsed from the fragment")
+        self.assertEqual(self.portal.requests, 3, msg="only the fragment must be loaded")
+
+    def test_fragment_fallback(self):
+
+        Netzclub.fragment_urls = {'consumption': ['unknown']}
+        self.netzclub.login(username='01761234567', password='pw')
+
+        self.assertEqual(self.netzclub.current_consumption()['creditbalance'], '3,50 €',
+                         msg="consumption must be parsed from the full page")
+        self.assertEqual(self.portal.requests, 4, msg="full page must be loaded after the failed fragment")
+
+        self.netzclub.current_consumption()
+        self.assertEqual(self.portal.requests, 5, msg="failed fragment must not be requested again")
+
+    def test_fragment_expired_session(self):
+
+        Netzclub.fragment_urls = {'consumption': ['consumption']}
+        self.netzclub.login(username='01761234567', password='pw')
+        self.portal.expired = True
+
+        with self.assertRaises(ProviderSessionError, msg="expired session must be raised from the fragment"):
+            self.netzclub.current_consumption()
+        self.assertEqual(Provider._fragment_failures, dict(), msg="expired session must not disable the fragments")
+
+    def tearDown(self) -> None:
+
+        Netzclub.fragment_urls = dict()
+        Provider._fragment_failures.clear()
+        self.portal.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
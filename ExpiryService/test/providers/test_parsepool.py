@@ -0,0 +1,53 @@
+import unittest
+
+from ExpiryService.providers import AldiTalk, Netzclub
+from ExpiryService.providers.parsepool import ParsePool
+from ExpiryService.test.providers.portal import StubPortal
+
+
+class TestParsePool(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+
+        ParsePool.start(processes=2)
+
+    def setUp(self) -> None:
+
+        self.portal = StubPortal()
+        self.portal.start()
+
+    def test_parse(self):
+
+        html = '<div id="datenverbrauchsuebersicht"><table><thead><tr><th>Zeitraum</th></tr></thead>' \
+               '<tbody><tr><td>Oktober</td></tr></tbody></table></div>'
+
+        self.assertTrue(ParsePool.is_running(), msg="pool must be started")
+        self.assertEqual(ParsePool.parse(Netzclub.parse_data_usage, html.encode('utf-8'), 'utf-8'),
+                         {'table_head': ['Zeitraum'], 'table_body': [['Oktober']]},
+                         msg="pool must return the parsed data")
+
+    def test_provider(self):
+
+        netzclub = Netzclub(url=self.portal.url + '/netzclub/')
+        self.assertTrue(netzclub.login(username='01761234567', password='pw'), msg="login must parse the tokens")
+        self.assertEqual(netzclub.current_consumption()['creditbalance'], '3,50 €',
+                         msg="consumption must be parsed in the pool")
+
+        alditalk = AldiTalk(url=self.portal.url + '/alditalk/de/')
+        self.assertTrue(alditalk.login(username='015751234567', password='pw'), msg="login must parse the token")
+        self.assertEqual(alditalk.data_usage_overview()['table_head'][0], 'Monat',
+                         msg="data usage must be parsed in the pool")
+
+    def tearDown(self) -> None:
+
+        self.portal.stop()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+
+        ParsePool.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import unittest
+
+from ExpiryService.providers import AldiTalk, Netzclub
+from ExpiryService.providers.parser import PageParser, ContainerStrainer, is_lxml_importable
+from ExpiryService.test.providers.portal import FIXTURES
+
+
+class TestPageParser(unittest.TestCase):
+    """ differential test, every backend must return the same data as the full page parse with html.parser """
+
+    cases = [
+        (AldiTalk.parse_csrf_token,   'alditalk_login.html'),
+        (AldiTalk.parse_consumption,  'alditalk_home.html'),
+        (AldiTalk.parse_data_usage,   'alditalk_overview.html'),
+        (Netzclub.parse_login_tokens, 'netzclub_login.html'),
+        (Netzclub.parse_consumption,  'netzclub_selfcare.html'),
+        (Netzclub.parse_data_usage,   'netzclub_billing.html'),
+    ]
+
+    def setUp(self) -> None:
+
+        self.backend, self.targeted = PageParser.backend, PageParser.targeted
+
+        self.pages = dict()
+        for _, fixture in self.cases:
+            with open(os.path.join(FIXTURES, fixture), encoding='utf-8') as f:
+                self.pages[fixture] = f.read()
+
+        PageParser.set_backend(backend='html.parser', targeted=False)
+        self.expected = [parse(self.pages[fixture]) for parse, fixture in self.cases]
+
+    def assert_backend(self, backend):
+
+        for targeted in (False, True):
+            PageParser.set_backend(backend=backend, targeted=targeted)
+            for (parse, fixture), expected in zip(self.cases, self.expected):
+                self.assertEqual(parse(self.pages[fixture]), expected,
+                                 msg="{} with {} (targeted={}) must return the same data"
+                                 .format(parse.__qualname__, backend, targeted))
+
+    def test_html_parser(self):
+
+        self.assert_backend(backend='html.parser')
+
+    @unittest.skipUnless(is_lxml_importable, "lxml is not installed")
+    def test_lxml(self):
+
+        self.assert_backend(backend='lxml')
+
+    def test_strainer(self):
+
+        strainer = ContainerStrainer(ids=('box',), classes=('table',))
+        PageParser.set_backend(backend='html.parser', targeted=True)
+        soup = PageParser.parse('<div id="box"><p>1</p></div><p>2</p><div class="x table">3</div>', parse_only=strainer)
+
+        self.assertEqual(soup.get_text(), '13', msg="only the containers must be parsed")
+        self.assertRaises(ValueError, PageParser.set_backend, backend='html5')
+
+    def tearDown(self) -> None:
+
+        PageParser.backend, PageParser.targeted = self.backend, self.targeted
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import requests
+
+from ExpiryService.providers import Congstar, Netzclub
+from ExpiryService.test.providers.portal import StubPortal
+
+
+class TestStubPortal(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.portal = StubPortal(accounts=10)
+        self.portal.start()
+
+    def test_accounts(self):
+
+        self.assertTrue(Netzclub(url=self.portal.url + '/netzclub/').login(username='9', password='pw'),
+                        msg="registered account must login")
+        self.assertFalse(Netzclub(url=self.portal.url + '/netzclub/').login(username='10', password='pw'),
+                         msg="unknown account must not login")
+        self.assertFalse(Congstar(url=self.portal.url + '/congstar/').login(username='x', password='pw'),
+                         msg="unknown account must not login")
+
+    def test_error_rate(self):
+
+        self.portal.error_rate = 1.0
+        resp = requests.get(self.portal.url + '/netzclub/login/')
+
+        self.assertEqual(resp.status_code, 503, msg="failing request must be answered with 503")
+        self.assertEqual(self.portal.errors, 1, msg="errors must be counted")
+
+    def tearDown(self) -> None:
+
+        self.portal.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
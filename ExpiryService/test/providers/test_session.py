@@ -0,0 +1,121 @@
+import socket
+import unittest
+import requests
+from time import monotonic
+
+from ExpiryService.exceptions import ProviderTimeoutError, ProviderQueueTimeoutError, ProviderUnavailableError
+from ExpiryService.providers.limiter import HostLimiter
+from ExpiryService.providers.session import ProviderSession
+from ExpiryService.providers.retry import RetryPolicy
+from ExpiryService.test.providers.portal import StubPortal
+
+
+class TestProviderSession(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        HostLimiter.clear()
+        self.portal = StubPortal(latency=0.5)
+        self.portal.start()
+        self.session = ProviderSession(timeout=(1, 2))
+        self.url = self.portal.url + '/netzclub/login/'
+
+    def test_timeout(self):
+
+        self.assertEqual(self.session.get_timeout(), (1, 2), msg="session timeout must be used by default")
+
+        self.session.deadline = monotonic() + 0.5
+        connect, read = self.session.get_timeout()
+        self.assertLessEqual(read, 0.5, msg="timeout must be limited by the deadline")
+
+    def test_read_timeout(self):
+
+        with self.assertRaises(ProviderTimeoutError, msg="slow response must raise ProviderTimeoutError"):
+            self.session.get(self.url, timeout=(1, 0.1))
+
+        self.assertEqual(HostLimiter.get_all_stats()[self.url.split('/')[2]]['failures'], 1,
+                         msg="timeout must be reported to the host limiter")
+
+    def test_deadline(self):
+
+        self.session.deadline = monotonic() - 1
+        with self.assertRaises(ProviderTimeoutError, msg="request after the deadline must not be sent"):
+            self.session.get(self.url)
+        self.assertEqual(self.portal.requests, 0, msg="request after the deadline must not be sent")
+
+        self.session.deadline = monotonic() + 0.2
+        start = monotonic()
+        with self.assertRaises(ProviderTimeoutError, msg="request must be aborted at the deadline"):
+            self.session.get(self.url)
+        self.assertLess(monotonic() - start, 0.45, msg="request must be aborted at the deadline")
+
+    def test_queue_deadline(self):
+
+        session = ProviderSession(max_in_flight=1, initial_in_flight=1)
+        session.deadline = monotonic() + 0.2
+
+        # another session of the host holds the only request slot
+        with session.get_limiter(self.url).limit():
+            start = monotonic()
+            with self.assertRaises(ProviderQueueTimeoutError, msg="deadline in the queue must raise"):
+                session.get(self.url)
+            self.assertLess(monotonic() - start, 0.45, msg="queue wait must end at the deadline")
+        self.assertEqual(self.portal.requests, 0, msg="request must not be sent after the deadline")
+
+    def test_retry(self):
+
+        # a free port without a server refuses every connection
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            url = 'http://127.0.0.1:{}/'.format(sock.getsockname()[1])
+
+        session = ProviderSession(retry=RetryPolicy(retries=2, backoff=0.01))
+        with self.assertRaises(requests.ConnectionError, msg="error must be raised after the last retry"):
+            session.get(url)
+        self.assertEqual(session.get_limiter(url).get_stats()['requests'], 3, msg="get must be retried twice")
+
+        with self.assertRaises(requests.ConnectionError, msg="post must raise the error"):
+            session.post(url)
+        self.assertEqual(session.get_limiter(url).get_stats()['requests'], 4, msg="post must not be retried")
+
+    def test_unavailable(self):
+
+        portal = StubPortal(error_rate=1.0)
+        portal.start()
+        try:
+            session = ProviderSession(retry=RetryPolicy(retries=1, backoff=0.01))
+            with self.assertRaises(ProviderUnavailableError, msg="503 after the last retry must raise"):
+                session.get(portal.url + '/netzclub/login/')
+            self.assertEqual(portal.requests, 2, msg="503 must be retried once")
+        finally:
+            portal.stop()
+
+    def test_retry_policy(self):
+
+        retry = RetryPolicy(retries=2, backoff=1, max_backoff=3)
+
+        self.assertTrue(retry.is_retryable(method='get', attempt=1), msg="get must be retried")
+        self.assertFalse(retry.is_retryable(method='GET', attempt=2), msg="retries must be limited")
+        self.assertFalse(retry.is_retryable(method='POST', attempt=0), msg="post must not be retried")
+        self.assertTrue(all(0 <= retry.delay(attempt=5) <= 3 for _ in range(100)), msg="delay must be capped")
+
+    def test_dump_cookies(self):
+
+        self.session.cookies.set('SID', 'abc', domain='www.netzclub.net', path='/')
+        self.session.cookies.set('old', 'x', domain='www.netzclub.net', path='/', expires=1)
+
+        restored = ProviderSession()
+        restored.load_cookies(cookies=self.session.dump_cookies())
+
+        self.assertEqual(restored.cookies.get('SID', domain='www.netzclub.net'), 'abc',
+                         msg="dumped cookies must be restored")
+        self.assertNotIn('old', restored.cookies, msg="expired cookies must not be restored")
+
+    def tearDown(self) -> None:
+
+        self.portal.stop()
+        HostLimiter.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
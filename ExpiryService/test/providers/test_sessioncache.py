@@ -0,0 +1,78 @@
+import unittest
+from unittest import mock
+
+from ExpiryService.providers import Netzclub
+from ExpiryService.providers.sessioncache import ProviderSessionCache
+from ExpiryService.exceptions import ProviderSessionError
+from ExpiryService.test.providers.portal import StubPortal
+
+
+class TestProviderSessionCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.cache = ProviderSessionCache(maxsize=2, ttl=60)
+
+    def test_get(self):
+
+        instance = object()
+        self.cache.put(provider='netzclub', username='user', password='pw', instance=instance)
+
+        self.assertIs(self.cache.get(provider='netzclub', username='user', password='pw'), instance,
+                      msg="cached instance must be returned")
+        self.assertIsNone(self.cache.get(provider='alditalk', username='user', password='pw'),
+                          msg="key must include the provider")
+
+    def test_changed_password(self):
+
+        self.cache.put(provider='netzclub', username='user', password='pw', instance=object())
+
+        self.assertIsNone(self.cache.get(provider='netzclub', username='user', password='new'),
+                          msg="changed password must invalidate the instance")
+        self.assertEqual(len(self.cache), 0, msg="invalid instance must be removed")
+
+    def test_lru_eviction(self):
+
+        self.cache.put(provider='netzclub', username='a', password='pw', instance=object())
+        self.cache.put(provider='netzclub', username='b', password='pw', instance=object())
+        self.cache.get(provider='netzclub', username='a', password='pw')
+        self.cache.put(provider='netzclub', username='c', password='pw', instance=object())
+
+        self.assertEqual(len(self.cache), 2, msg="cache must be bounded by maxsize")
+        self.assertIsNone(self.cache.get(provider='netzclub', username='b', password='pw'),
+                          msg="least recently used instance must be evicted")
+
+    def test_ttl_eviction(self):
+
+        with mock.patch('ExpiryService.providers.sessioncache.monotonic', return_value=100.0):
+            self.cache.put(provider='netzclub', username='a', password='pw', instance=object())
+
+        with mock.patch('ExpiryService.providers.sessioncache.monotonic', return_value=161.0):
+            self.assertIsNone(self.cache.get(provider='netzclub', username='a', password='pw'),
+                              msg="idle instance must be evicted")
+
+
+class TestProviderSessionExpiry(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.portal = StubPortal()
+        self.portal.start()
+
+    def test_expired_session(self):
+
+        netzclub = Netzclub(url=self.portal.url + '/netzclub/')
+        self.assertTrue(netzclub.login(username='user', password='pw'))
+        netzclub.current_consumption()
+
+        self.portal.expired = True
+        with self.assertRaises(ProviderSessionError):
+            netzclub.current_consumption()
+
+    def tearDown(self) -> None:
+
+        self.portal.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
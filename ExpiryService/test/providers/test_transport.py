@@ -0,0 +1,51 @@
+import unittest
+
+from ExpiryService.providers import Netzclub
+from ExpiryService.providers.session import ProviderSession
+from ExpiryService.providers.transport import ConnectionPools, HostAdapter
+from ExpiryService.test.providers.portal import StubPortal
+
+
+class TestConnectionPools(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        ConnectionPools.clear()
+        self.portal = StubPortal()
+        self.portal.start()
+
+    def test_shared_adapter(self):
+
+        first, second = ProviderSession(max_in_flight=4), ProviderSession(max_in_flight=4)
+
+        adapter = first.get_adapter(self.portal.url + '/netzclub/login/')
+        self.assertIsInstance(adapter, HostAdapter, msg="http urls must use the host adapter")
+        self.assertIs(adapter, second.get_adapter(self.portal.url + '/netzclub/selfcare/'),
+                      msg="sessions must share the adapter of a host")
+        self.assertIsNot(first.cookies, second.cookies, msg="every session must keep its own cookie jar")
+
+    def test_connection_reuse(self):
+
+        for i in range(5):
+            netzclub = Netzclub(url=self.portal.url + '/netzclub/')
+            self.assertTrue(netzclub.login(username=str(i), password='pw'), msg="login must succeed")
+            netzclub.session.close()
+
+        self.assertEqual(self.portal.connections, 1, msg="accounts must reuse the warm connection")
+
+    def test_separate_cookies(self):
+
+        first, second = ProviderSession(), ProviderSession()
+        first.cookies.set('session', 'first')
+
+        second.get(self.portal.url + '/netzclub/login/')
+        self.assertNotIn('session', second.cookies, msg="cookies must not leak between the sessions")
+
+    def tearDown(self) -> None:
+
+        self.portal.stop()
+        ConnectionPools.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
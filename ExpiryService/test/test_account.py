@@ -0,0 +1,27 @@
+import unittest
+from ExpiryService.account import Account
+
+
+class TestAccount(unittest.TestCase):
+
+    def test_from_row(self):
+
+        row = ('alditalk', '015751234567', 'secret', 5.0, 'Handy', 'a@b.de;c@d.de', None, None)
+        account = Account.from_row(row)
+
+        self.assertEqual(account.key, ('alditalk', '015751234567'), msg="key must be provider and username")
+        self.assertEqual(account.min_balance, 5.0, msg="min_balance must be the fourth column")
+        self.assertEqual(account.notifyer, 'a@b.de;c@d.de', msg="notifyer must be the sixth column")
+        self.assertNotIn('secret', repr(account), msg="repr must not contain the password")
+
+    def test_slots(self):
+
+        account = Account(provider='netzclub', username='user', password='pw')
+
+        self.assertFalse(hasattr(account, '__dict__'), msg="Account must not have an instance dict")
+        with self.assertRaises(AttributeError):
+            account.unknown = 1
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from datetime import datetime
+
+from ExpiryService.checkinterval import CheckInterval, CheckSlots
+from ExpiryService.consumption import Consumption
+
+
+class TestCheckInterval(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.interval = CheckInterval(min_interval=600, max_interval=21600)
+        self.now = datetime(2026, 10, 18, 12, 0)
+        self.consumption = {
+            'creditbalance': '12,34 €',
+            'remaining_volume': '5 GB',
+            'total_volume': '5 GB',
+            'end_date': 'Gültig bis 01.11.2026'
+        }
+
+    def test_far_from_thresholds(self):
+
+        seconds = self.interval.next(consumption=Consumption(**self.consumption), min_balance=1.0, now=self.now)
+
+        self.assertEqual(seconds, 21600, msg="account far away from all thresholds must use max_interval")
+
+    def test_close_to_min_balance(self):
+
+        seconds = self.interval.next(consumption=Consumption(**self.consumption), min_balance=12.0, now=self.now)
+
+        self.assertAlmostEqual(seconds, 0.34 * 3600, msg="balance headroom must limit the interval")
+
+    def test_under_min_balance(self):
+
+        seconds = self.interval.next(consumption=Consumption(**self.consumption), min_balance=20.0, now=self.now)
+
+        self.assertEqual(seconds, 600, msg="account under the minimum balance must use min_interval")
+
+    def test_close_to_end_date(self):
+
+        consumption = dict(self.consumption, end_date='Gültig bis 18.10.2026')
+        seconds = self.interval.next(consumption=Consumption(**consumption), min_balance=1.0, now=self.now)
+
+        self.assertEqual(seconds, 600, msg="expiring account must use min_interval")
+
+    def test_low_volume(self):
+
+        consumption = dict(self.consumption, remaining_volume='0,5 GB')
+        seconds = self.interval.next(consumption=Consumption(**consumption), min_balance=1.0, now=self.now)
+
+        self.assertAlmostEqual(seconds, 2160, msg="remaining volume share must limit the interval")
+
+    def test_unparsable_balance(self):
+
+        consumption = dict(self.consumption, creditbalance='')
+        seconds = self.interval.next(consumption=Consumption(**consumption), min_balance=1.0, now=self.now)
+
+        self.assertEqual(seconds, 600, msg="unknown balance must use min_interval")
+
+
+class TestCheckSlots(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.check_slots = CheckSlots(interval=600, slots=60)
+
+    def test_slot_assignment(self):
+
+        slots = [self.check_slots.slot(provider='alditalk', username=str(username)) for username in range(6000)]
+
+        self.assertEqual(slots[:10], [CheckSlots(interval=60, slots=60).slot(provider='alditalk', username=str(username))
+                                      for username in range(10)], msg="slot must only depend on the account key")
+        self.assertTrue(all(0 <= slot < 60 for slot in slots), msg="slot must be within the slot range")
+        counts = [slots.count(slot) for slot in range(60)]
+        self.assertLess(max(counts), 150, msg="accounts must be spread over all slots")
+        self.assertGreater(min(counts), 50, msg="accounts must be spread over all slots")
+
+    def test_due_slots(self):
+
+        self.assertEqual(self.check_slots.slot_interval, 10, msg="slot interval must be interval / slots")
+        self.assertEqual(self.check_slots.due_slots(now=6005), [0], msg="first tick must only return the current slot")
+        self.assertEqual(self.check_slots.due_slots(now=6015), [1], msg="next tick must return the next slot")
+        self.assertEqual(self.check_slots.due_slots(now=6018), [], msg="tick within the same slot must return nothing")
+        self.assertEqual(self.check_slots.due_slots(now=6045), [2, 3, 4], msg="delayed tick must catch up")
+        self.assertEqual(self.check_slots.due_slots(now=16000), [40], msg="long gap must only return the current slot")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import pickle
+import unittest
+from datetime import date
+
+from ExpiryService.consumption import Consumption
+
+
+class TestConsumption(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.consumption = Consumption(name='Erika Musterfrau', number='01761234567', creditbalance='3,50 €',
+                                       remaining_volume='180 MB', total_volume='von 200 MB',
+                                       end_date='Gültig bis 05.11.2026')
+
+    def test_parse(self):
+
+        self.assertEqual(Consumption.parse_amount('12,34\xa0€'), 1234, msg="german amount must be parsed to cents")
+        self.assertEqual(Consumption.parse_amount('1.234,50 €'), 123450, msg="thousands separator must be parsed")
+        self.assertEqual(Consumption.parse_amount('0,29 €'), 29, msg="cents must not be rounded off")
+        self.assertEqual(Consumption.parse_volume('von 200 MB'), 200 * 1024 ** 2, msg="volume must be parsed")
+        self.assertEqual(Consumption.parse_volume('1,5 GB'), int(1.5 * 1024 ** 3), msg="volume must be parsed")
+        self.assertEqual(Consumption.parse_date('Gültig bis 01.11.2026'), date(2026, 11, 1), msg="date must be parsed")
+        self.assertIsNone(Consumption.parse_amount('unbekannt'), msg="missing amount must be None")
+        self.assertIsNone(Consumption.parse_volume(''), msg="missing volume must be None")
+
+    def test_numeric_fields(self):
+
+        self.assertEqual(self.consumption.balance_cents, 350, msg="balance must be parsed once")
+        self.assertEqual(self.consumption.remaining_bytes, 180 * 1024 ** 2, msg="remaining volume must be parsed")
+        self.assertEqual(self.consumption.total_bytes, 200 * 1024 ** 2, msg="total volume must be parsed")
+        self.assertEqual(self.consumption.expiry_date, date(2026, 11, 5), msg="end date must be parsed")
+
+        given = Consumption(creditbalance='7,50 €', balance_cents=751)
+        self.assertEqual(given.balance_cents, 751, msg="given numeric fields must not be parsed")
+
+    def test_dict_access(self):
+
+        self.assertEqual(self.consumption['creditbalance'], '3,50 €', msg="item access must return the string")
+        self.assertEqual(self.consumption.get('end_date'), 'Gültig bis 05.11.2026', msg="get must return the string")
+        self.assertIsNone(self.consumption.get('balance_cents'), msg="numeric fields are no dict keys")
+        with self.assertRaises(KeyError):
+            self.consumption['unknown']
+
+        self.assertEqual(self.consumption, self.consumption.to_dict(), msg="record must equal its dict")
+
+    def test_slots(self):
+
+        self.assertFalse(hasattr(self.consumption, '__dict__'), msg="Consumption must not have an instance dict")
+        self.assertEqual(pickle.loads(pickle.dumps(self.consumption)).balance_cents, 350,
+                         msg="record must be sent from the parse pool")
+
+
+if __name__ == '__main__':
+    unittest.main()
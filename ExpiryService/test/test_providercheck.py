@@ -0,0 +1,270 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from ExpiryService.account import Account
+from ExpiryService.providercheck import ProviderCheck
+from ExpiryService.providers import Congstar, Provider
+from ExpiryService.providers.retry import RetryPolicy
+from ExpiryService.providers.async_provider import is_aiohttp_importable
+from ExpiryService.db.connector import DBConnector
+from ExpiryService.exceptions import ProviderQueueTimeoutError
+from ExpiryService.db.cookiestore import DBCookieStore, is_cryptography_importable
+from ExpiryService.test.providers.portal import StubPortal
+
+
+class TestProviderCheck(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.portal = StubPortal()
+        self.portal.start()
+        self.urls = {'alditalk': self.portal.url + '/alditalk/de/', 'netzclub': self.portal.url + '/netzclub/',
+                     'congstar': self.portal.url + '/congstar/'}
+        self.providercheck = ProviderCheck(database={'path': ':memory:'}, mail=dict(),
+                                           providercheck={'provider_urls': self.urls})
+
+    def test_congstar_digest(self):
+
+        congstar = Congstar(url=self.urls['congstar'])
+        congstar.login(username='015112345678', password='pw')
+
+        digest = self.providercheck.prepare_notification_mail(consumption=congstar.current_consumption(),
+                                                              data_usage=congstar.data_usage_overview())
+
+        self.assertIn("Zeitraum: 13.09.2026 - 12.10.2026\nVolumen: 3 GB\nVerbraucht: 3 GB\nRest: 0 B\n", digest,
+                      msg="digest must contain every column of the congstar usage table")
+
+    def test_serial_isolation(self):
+
+        accounts = [Account(provider='congstar', username='015112345678', password='pw'),
+                    Account(provider='netzclub', username='01761234567', password='pw')]
+
+        with mock.patch.object(self.providercheck, 'evaluate_provider_data',
+                               side_effect=[RuntimeError("smtp failed"), None]) as evaluate:
+            results = self.providercheck.check_accounts(accounts=accounts)
+
+        self.assertEqual(results, [False, True], msg="failing account must not abort the following accounts")
+        self.assertEqual(evaluate.call_count, 2, msg="account after the failing one must be checked")
+
+    def test_parse_error_not_counted(self):
+
+        accounts = [Account(provider='netzclub', username=str(i), password='pw') for i in range(6)]
+
+        with mock.patch.object(self.providercheck, 'get_consumption_data', side_effect=AttributeError("no balance")):
+            results = self.providercheck.check_accounts(accounts=accounts)
+
+        breaker = self.providercheck.get_circuit_breaker(provider='netzclub')
+        self.assertEqual(results, [False] * 6, msg="accounts with unparsable pages must fail")
+        self.assertEqual(breaker.failures, 0, msg="parse errors of accounts must not count against the provider")
+        self.assertEqual(breaker.state, breaker.CLOSED, msg="parse errors must not open the circuit breaker")
+
+    def test_queue_timeout_not_counted(self):
+
+        accounts = [Account(provider='netzclub', username=str(i), password='pw') for i in range(6)]
+
+        with mock.patch.object(self.providercheck, 'get_consumption_data',
+                               side_effect=ProviderQueueTimeoutError("no free request slot")):
+            results = self.providercheck.check_accounts(accounts=accounts)
+
+        breaker = self.providercheck.get_circuit_breaker(provider='netzclub')
+        self.assertEqual(results, [False] * 6, msg="accounts with a deadline in the queue must fail")
+        self.assertEqual(breaker.failures, 0, msg="waits in the own queue must not count against the provider")
+
+    def test_unavailable_opens_breaker(self):
+
+        portal = StubPortal(error_rate=1.0)
+        portal.start()
+        self.providercheck.provider_urls['netzclub'] = portal.url + '/netzclub/'
+        accounts = [Account(provider='netzclub', username=str(i), password='pw') for i in range(10)]
+
+        try:
+            with mock.patch.object(Provider, 'requests_per_second', None), \
+                    mock.patch.object(Provider, 'retry', RetryPolicy(retries=0)):
+                results = self.providercheck.check_accounts(accounts=accounts)
+        finally:
+            portal.stop()
+
+        breaker = self.providercheck.get_circuit_breaker(provider='netzclub')
+        self.assertEqual(results, [False] * 10, msg="accounts of an unavailable portal must fail")
+        self.assertEqual(breaker.state, breaker.OPEN, msg="an unavailable portal must open the circuit breaker")
+        self.assertEqual(portal.requests, self.providercheck.breaker_threshold,
+                         msg="accounts must be skipped while the circuit breaker is open")
+
+    def test_cycle_loads_accounts_once(self):
+
+        for i in range(20):
+            self.providercheck.dbinserter.row(sql="insert into ExpiryService (provider, username, password) "
+                                                  "values (%s, %s, %s)", data=('netzclub', str(i), 'pw'))
+        slots = self.providercheck.check_slots
+
+        checked = list()
+        with mock.patch.object(self.providercheck.dbfetcher, 'all', wraps=self.providercheck.dbfetcher.all) as fetch, \
+                mock.patch.object(self.providercheck, 'check_accounts',
+                                  side_effect=lambda accounts, notify: checked.extend(accounts)):
+            # one tick per slot of a whole interval
+            for tick in range(slots.slots):
+                with mock.patch.object(slots, 'due_slots', return_value=[tick]):
+                    self.providercheck.check_cycle()
+
+        self.assertEqual(fetch.call_count, 1, msg="accounts must be loaded once per interval")
+        self.assertEqual(sorted(account.username for account in checked), sorted(str(i) for i in range(20)),
+                         msg="every account must be checked once in its slot")
+
+    def test_check_due_once_per_interval(self):
+
+        account = Account(provider='netzclub', username='01761234567', password='pw')
+        interval = self.providercheck.provider_check_interval
+
+        for next_interval, visits in ((interval, 1), (3 * interval, 3)):
+            # checked in the slot visit at 1000s, the fetch finishes 20s later
+            with mock.patch.object(self.providercheck.check_interval, 'next', return_value=next_interval), \
+                    mock.patch('ExpiryService.providercheck.monotonic', return_value=1020):
+                self.providercheck.schedule_next_check(account=account, consumption=None)
+
+            due = list()
+            for visit in range(1, 4):
+                with mock.patch('ExpiryService.providercheck.monotonic', return_value=1000 + visit * interval):
+                    due.append(self.providercheck.is_check_due(account=account))
+
+            self.assertEqual(due.index(True) + 1, visits,
+                             msg="account must be due in the slot visit after {}s".format(next_interval))
+
+    def tearDown(self) -> None:
+
+        self.providercheck.scheduler.shutdown()
+        self.portal.stop()
+        DBConnector.connection.close()
+        DBConnector.connection = None
+        DBConnector.is_sqlite = False
+
+
+class TestProviderCheckParallel(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.portal = StubPortal()
+        self.portal.start()
+        self.providercheck = ProviderCheck(database={'path': ':memory:'}, mail=dict(),
+                                           providercheck={'provider_urls': {'netzclub': self.portal.url + '/netzclub/'},
+                                                          'workers': 4})
+
+    def test_parallel_isolation(self):
+
+        accounts = [Account(provider='netzclub', username=str(i), password='pw') for i in range(8)]
+
+        def evaluate(account, consumption, data_usage, notify):
+            if account.username == '3':
+                raise RuntimeError("smtp failed")
+
+        # the request rate limit of the portal would serialize the workers
+        with mock.patch.object(Provider, 'requests_per_second', None), \
+                mock.patch.object(self.providercheck, 'evaluate_provider_data', side_effect=evaluate) as evaluated:
+            results = self.providercheck.check_accounts(accounts=accounts)
+
+        self.assertIsNotNone(self.providercheck.executor, msg="workers must enable the worker pool")
+        self.assertEqual(len(results), len(accounts), msg="worker pool must return one result per account")
+        self.assertEqual(results.count(False), 1, msg="only the failing account must fail")
+        self.assertEqual(evaluated.call_count, len(accounts), msg="every account must be checked")
+
+    def tearDown(self) -> None:
+
+        self.providercheck.scheduler.shutdown()
+        self.providercheck.executor.shutdown()
+        self.portal.stop()
+        DBConnector.connection.close()
+        DBConnector.connection = None
+        DBConnector.is_sqlite = False
+
+
+@unittest.skipUnless(is_aiohttp_importable, "aiohttp is not installed")
+class TestProviderCheckAsync(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.portal = StubPortal()
+        self.portal.start()
+        self.providercheck = ProviderCheck(database={'path': ':memory:'}, mail=dict(),
+                                           providercheck={'provider_urls': {'netzclub': self.portal.url + '/netzclub/'},
+                                                          'engine': 'asyncio'})
+
+    def test_async_isolation(self):
+
+        accounts = [Account(provider='netzclub', username=str(i), password='pw') for i in range(4)]
+
+        def evaluate(account, consumption, data_usage, notify):
+            if account.username == '1':
+                raise RuntimeError("smtp failed")
+
+        with mock.patch.object(self.providercheck, 'evaluate_provider_data', side_effect=evaluate) as evaluated:
+            results = self.providercheck.check_accounts(accounts=accounts)
+
+        self.assertEqual(results, [True, False, True, True], msg="only the failing account must fail")
+        self.assertEqual(evaluated.call_count, len(accounts), msg="accounts after the failing one must be evaluated")
+
+    def tearDown(self) -> None:
+
+        self.providercheck.scheduler.shutdown()
+        self.portal.stop()
+        DBConnector.connection.close()
+        DBConnector.connection = None
+        DBConnector.is_sqlite = False
+
+
+@unittest.skipUnless(is_cryptography_importable, "cryptography is not installed")
+class TestProviderCheckSessions(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.portal = StubPortal()
+        self.portal.start()
+        self.folder = tempfile.mkdtemp()
+        self.params = {
+            'database': {'path': os.path.join(self.folder, 'ExpiryService.db')},
+            'mail': dict(),
+            'providercheck': {'provider_urls': {'netzclub': self.portal.url + '/netzclub/'},
+                              'cookie_key': DBCookieStore.generate_key()}
+        }
+        self.account = Account(provider='netzclub', username='01761234567', password='pw')
+
+    def create_providercheck(self):
+
+        if DBConnector.connection is not None:
+            DBConnector.connection.close()
+        return ProviderCheck(**self.params)
+
+    def test_restore_sessions(self):
+
+        providercheck = self.create_providercheck()
+        providercheck.dbinserter.row(sql="insert into ExpiryService (provider, username, password) values (%s, %s, %s)",
+                                     data=('netzclub', self.account.username, self.account.password))
+        self.assertEqual(providercheck.check_accounts(accounts=[self.account]), [True], msg="check must succeed")
+
+        # the shutdown saves the unchanged cookies again, so the stored session does not expire by its login time
+        with mock.patch.object(providercheck.cookie_store, 'save', wraps=providercheck.cookie_store.save) as save:
+            providercheck.stop()
+        self.assertEqual(save.call_count, 1, msg="stop must save the cached session")
+        providercheck.scheduler._thread.join(timeout=5)
+        self.assertFalse(providercheck.scheduler._thread.is_alive(), msg="stop must end the scheduler thread")
+
+        # a restarted service checks the account with the stored session cookies
+        restarted = self.create_providercheck()
+        restarted.restore_sessions()
+        requests = self.portal.requests
+        self.assertEqual(restarted.check_accounts(accounts=[self.account]), [True], msg="check must succeed")
+        self.assertEqual(self.portal.requests, requests + 1, msg="restored session must not login again")
+        restarted.scheduler.shutdown()
+
+    def tearDown(self) -> None:
+
+        self.portal.stop()
+        DBConnector.connection.close()
+        DBConnector.connection = None
+        DBConnector.is_sqlite = False
+        shutil.rmtree(self.folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
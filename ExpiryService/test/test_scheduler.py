@@ -0,0 +1,119 @@
+import time
+import threading
+import unittest
+from datetime import datetime
+
+from ExpiryService.scheduler import Scheduler
+
+
+class DictJobStore:
+
+    def __init__(self, **jobs):
+        self.jobs = dict(jobs)
+
+    def load(self, job_id):
+        return self.jobs.get(job_id)
+
+    def save(self, job_id, next_run):
+        self.jobs[job_id] = next_run
+
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.scheduler = Scheduler(max_workers=1, max_queue=1)
+
+    def test_schedule(self):
+
+        event = threading.Event()
+        self.scheduler.schedule(event.set, datetime.now())
+
+        self.assertTrue(event.wait(timeout=2), msg="scheduled task must run")
+
+    def test_periodic_skip_if_running(self):
+
+        calls = list()
+        self.scheduler.periodic(0.02, lambda: (calls.append(1), time.sleep(0.2)))
+        time.sleep(0.3)
+        self.scheduler.stop_periodic()
+
+        stats = self.scheduler.get_stats()
+        self.assertLessEqual(len(calls), 2, msg="periodic task must not overlap with itself")
+        self.assertGreater(stats['skipped'], 0, msg="runs of a busy periodic task must be skipped")
+
+    def test_queue_limit(self):
+
+        release = threading.Event()
+        self.scheduler.schedule(release.wait, datetime.now(), 2)
+        time.sleep(0.1)
+        for _ in range(2):
+            self.scheduler.schedule(release.wait, datetime.now(), 2)
+        time.sleep(0.1)
+
+        stats = self.scheduler.get_stats()
+        self.assertEqual(stats['running'], 1, msg="one worker must run one task")
+        self.assertEqual(stats['queued'], 1, msg="queue must be bounded by max_queue")
+        self.assertEqual(stats['rejected'], 1, msg="task beyond the queue limit must be rejected")
+        release.set()
+
+    def test_cancel_many_timers(self):
+
+        tasks = [self.scheduler.schedule_in(3600 + i, print) for i in range(100000)]
+        for task in tasks[:99990]:
+            task.cancel()
+
+        self.assertEqual(len(self.scheduler.get_tasks()), 10, msg="cancelled tasks must not be returned")
+        self.assertLess(len(self.scheduler._tasks), 1000, msg="stale heap entries must be compacted")
+
+    def test_reschedule(self):
+
+        calls = list()
+        task = self.scheduler.schedule_in(3600, calls.append, 1)
+        task.reschedule(0)
+        time.sleep(0.2)
+
+        self.assertEqual(calls, [1], msg="rescheduled task must run once at the new deadline")
+        self.assertTrue(self.scheduler.is_tasks_empty(), msg="stale entry must not count as open task")
+
+    def tearDown(self) -> None:
+
+        self.scheduler.shutdown()
+
+
+class TestSchedulerJobStore(unittest.TestCase):
+
+    def test_restore_next_run(self):
+
+        jobstore = DictJobStore(check=time.time() + 100)
+        scheduler = Scheduler(jobstore=jobstore)
+        task = scheduler.periodic(3600, print, job_id='check')
+        scheduler.shutdown()
+
+        self.assertAlmostEqual(task.timeout, 100, delta=1, msg="stored next run must be kept after a restart")
+
+    def test_missed_runs_coalesce(self):
+
+        calls = list()
+        jobstore = DictJobStore(check=time.time() - 10000)
+        scheduler = Scheduler(jobstore=jobstore)
+        scheduler.periodic(3600, calls.append, 1, job_id='check')
+        time.sleep(0.2)
+        scheduler.shutdown()
+
+        self.assertEqual(calls, [1], msg="missed runs must collapse into one run")
+        self.assertAlmostEqual(jobstore.jobs['check'], time.time() + 3600, delta=5,
+                               msg="next run must be saved after the run")
+
+    def test_misfire_grace_time(self):
+
+        jobstore = DictJobStore(check=time.time() - 1000)
+        scheduler = Scheduler(jobstore=jobstore)
+        task = scheduler.periodic(3600, print, job_id='check', misfire_grace_time=60)
+        scheduler.shutdown()
+
+        self.assertAlmostEqual(task.timeout, 2600, delta=5, msg="too late run must skip to the next regular run")
+
+
+if __name__ == '__main__':
+    unittest.main()